@@ -1,27 +1,57 @@
 import os
 import subprocess
 
-from hyperedit.extract_dialog import get_audio_tracks, extract_dialog
-from hyperedit.transcribe import transcribe
-from hyperedit.srt import PreviewSrt, GetPrimitiveSrtListHash
-from hyperedit.deaggress import deaggress
-from hyperedit.split_video import split_video
+from PySide6.QtCore import QTimer
+
+# backends that load hyperedit or NumPy are imported where they are first used, so the project list
+# shows without waiting on them
+from hyperedit_gui.job.jobs import Job, JobQueue, JOB_QUEUED, JOB_RUNNING
+from hyperedit_gui.media.media_info import MediaInfoCache, ProbeMediaInfo
+from hyperedit_gui.media.preview_player import PreviewPlayer, Prefetch
+from hyperedit_gui.media.transcript_cache import TranscriptCache, GetSharedTranscriptDirectory, GetAudioIdentity
 from hyperedit_gui.model.config import GetConfig
-from hyperedit_gui.model.srt import LoadSrts, GetSrts, SaveEdits
+from hyperedit_gui.model.srt_file import WriteSrtFile
+from hyperedit_gui.model.srt_change import SrtChange, GetRowRanges, CoalesceSrtChanges, SRT_CHANGE_REPLACED, SRT_CHANGE_APPENDED, SRT_CHANGE_ENABLED, SRT_CHANGE_TIMES
+from hyperedit_gui.model.srt import LoadSrts, GetSrts, GetSrtById, EditSrts, UndoEdit, RedoEdit, BeginStreamedSrts, AppendStreamedSrts, \
+    SetSrtDatabase, ExportEdits, IsSrtsEditable, GetLoadedSrtFilePath, GetEditSetNames, GetActiveEditSetName, AddEditSet, SwitchEditSet, \
+    RemoveEditSet, DiffEditSet, ClearSrts
 from hyperedit_gui.model.projects import CreateProject, GetCurrentProject, LoadProject
 from hyperedit_gui.model.recent_projects import RecentProjects
+from hyperedit_gui.model.recent_project_index import ReadRecentProjectEntries
+from hyperedit_gui.render.render_cache import RenderCache, GetRenderKey
+from hyperedit_gui.render.renderer import RenderSrts, RenderSettings, GetDefaultEncoder, RENDER_MODE_ENCODE, RENDER_MODE_FAST_CUT, RENDER_MODE_SMART
+from hyperedit_gui.render.concat_script import WriteConcatScript, BuildPlayCommand
 from pathlib import Path
 
 class Controller:
     def __init__(self):
         self._deaggress_seconds = 0
+        self._deaggress_engine = None
+        self._deaggress_engine_path = None
         self._selected_rows = []
         self._current_project_observers = []
         self._srt_observers = []
+        self._srt_stats_observers = []
+        self._edit_set_observers = []
+        self._pending_srt_changes = []
+        self._srt_flush_scheduled = False
         self._merge_observers = []
+        self._media_info_observers = []
+        self._recent_project_observers = []
+        self._recent_projects_job = None
+        self._media_info = None
+        self._track_scores = None
         self._play_after_render = False # TODO: store in config?
         self._render_preview = True # TODO: store in project
+        self._render_encoder = GetDefaultEncoder()
+        self._render_mode = RENDER_MODE_ENCODE
+        self._render_cache = None
         self._recent_projects = RecentProjects()
+        self._jobs = JobQueue()
+        self._preview_player = PreviewPlayer()
+        self._audition_process = None
+        self._audition_to_play = None
+        self._audition_jobs = {}
 
     def AddProjectChangeObserver(self, observer):
         self._current_project_observers.append(observer)
@@ -32,24 +62,101 @@ class Controller:
     def AddSrtChangeObserver(self, observer):
         self._srt_observers.append(observer)
 
+    def AddSrtStatsObserver(self, observer):
+        self._srt_stats_observers.append(observer)
+
+    def AddEditSetObserver(self, observer):
+        self._edit_set_observers.append(observer)
+
+    def AddMediaInfoObserver(self, observer):
+        self._media_info_observers.append(observer)
+
+    def AddRecentProjectObserver(self, observer):
+        self._recent_project_observers.append(observer)
+
+    def AddJobObserver(self, observer):
+        self._jobs.AddObserver(observer)
+
     def NotifyProjectChangeObservers(self):
-        for observer in self._current_project_observers:
+        # observers may build pages that add observers of their own
+        for observer in list(self._current_project_observers):
             observer.OnProjectChange()
 
     def NotifyMergeObservers(self):
         for observer in self._merge_observers:
             observer.OnMerge()
 
-    def NotifySrtChangeObservers(self):
+    def NotifySrtChangeObservers(self, kind=SRT_CHANGE_REPLACED, rows=()):
+        """
+        Row changes are coalesced and delivered once per pass of the event loop, so a bulk edit costs
+        one repaint. Replaces and appends change the row count, so they are delivered straight away to
+        keep views' row counts in step with the store
+        """
+        if kind == SRT_CHANGE_REPLACED:
+            self._pending_srt_changes.append(SrtChange(kind))
+        else:
+            self._pending_srt_changes += [SrtChange(kind, first, last) for first, last in GetRowRanges(rows)]
+        if kind in (SRT_CHANGE_REPLACED, SRT_CHANGE_APPENDED):
+            self._FlushSrtChanges()
+        elif not self._srt_flush_scheduled:
+            self._srt_flush_scheduled = True
+            QTimer.singleShot(0, self._FlushSrtChanges)
+
+    def _FlushSrtChanges(self):
+        self._srt_flush_scheduled = False
+        changes = CoalesceSrtChanges(self._pending_srt_changes)
+        self._pending_srt_changes = []
+        if not changes:
+            return
         for observer in self._srt_observers:
-            observer.OnSrtChange()
+            observer.OnSrtChange(changes)
+        self.NotifySrtStatsObservers()
+
+    def NotifySrtStatsObservers(self):
+        for observer in self._srt_stats_observers:
+            observer.OnSrtStatsChange()
+
+    def NotifyEditSetObservers(self):
+        for observer in self._edit_set_observers:
+            observer.OnEditSetChange()
+
+    def NotifyMediaInfoObservers(self):
+        for observer in self._media_info_observers:
+            observer.OnMediaInfoChange()
+
+    def NotifyRecentProjectObservers(self, entry):
+        for observer in self._recent_project_observers:
+            observer.OnRecentProjectRead(entry)
+
+    def _SubmitJob(self, name, work, *args, on_finished=None, on_failed=None, on_partial=None, on_cancelled=None, background=False) -> Job:
+        """
+        Run work(job, *args) on a worker thread. on_finished(result), on_failed(error), on_partial(result) and
+        on_cancelled() are called on the GUI thread
+        """
+        return self._jobs.Submit(Job(name, work, *args, on_finished=on_finished, on_failed=on_failed, on_partial=on_partial,
+                                     on_cancelled=on_cancelled), background)
+
+    def GetJobs(self):
+        return self._jobs.GetJobs()
+
+    def CancelJob(self, job):
+        self._jobs.Cancel(job)
+
+    def Shutdown(self):
+        self._jobs.CancelAll()
+        self._jobs.WaitForDone()
+        self._preview_player.Quit()
+        self.StopTrackPreview()
 
     def create_project(self, video_file_path):
         
         try:
             CreateProject(video_file_path)
+            SetSrtDatabase(GetCurrentProject().database)
             self._recent_projects.add_project(GetCurrentProject().project_path)
             GetConfig().Save()
+            self._LoadMediaInfo()
+            self.NotifySrtChangeObservers()
             self.NotifyProjectChangeObservers()
         except Exception as e:
             print(f"Failed to create project: {e}")
@@ -57,15 +164,103 @@ class Controller:
     
     def load_project(self, project_path):
         LoadProject(project_path)
-        LoadSrts(self.GetSrtFilePath())
+        SetSrtDatabase(GetCurrentProject().database)
+        self._LoadMediaInfo()
+        # without a transcript the SRTs stay cleared by SetSrtDatabase
+        if os.path.exists(self.GetSrtFilePath()):
+            LoadSrts(self.GetSrtFilePath())
+        self.NotifySrtChangeObservers()
         self.NotifyProjectChangeObservers()
+
+    def _LoadMediaInfo(self):
+        """
+        Use the project's cached media info, or probe the video in the background if it is missing or stale
+        """
+        project_directory = os.path.dirname(GetCurrentProject().project_path)
+        video_path = GetCurrentProject().video_path
+        self._media_info = MediaInfoCache(GetCurrentProject().database).Get(video_path)
+        self._track_scores = None
+        if self._media_info is None:
+            self._SubmitJob("Probe video", ProbeMediaInfo, video_path, background=True,
+                            on_finished=lambda info: self._OnMediaInfoProbed(project_directory, info))
+        else:
+            self._LoadTrackScores()
+            self.PrepareTrackPreviews()
+
+    def _OnMediaInfoProbed(self, project_directory, info):
+        if not GetCurrentProject() or os.path.dirname(GetCurrentProject().project_path) != project_directory:
+            # project changed while probing, and its database is closed
+            return
+        MediaInfoCache(GetCurrentProject().database).Put(info)
+        self._media_info = info
+        self.NotifyMediaInfoObservers()
+        self._LoadTrackScores()
+        self.PrepareTrackPreviews()
+
+    def GetMediaInfo(self):
+        return self._media_info
+
+    def _LoadTrackScores(self):
+        """
+        Use the cached track scores, or analyze the tracks if they are missing or stale. Analysis shares
+        the serial queue with merging, as both extract the track WAVs
+        """
+        from hyperedit_gui.media.track_analysis import AnalyzeTracks, TrackScoreCache
+
+        project_directory = os.path.dirname(GetCurrentProject().project_path)
+        wav_directory = os.path.join(project_directory, "WAV")
+        video_path = GetCurrentProject().video_path
+        track_count = len(self._media_info.GetAudioStreams())
+        if track_count == 0:
+            return
+        self._track_scores = TrackScoreCache(wav_directory).Get(video_path, track_count)
+        if self._track_scores is None:
+            self._SubmitJob("Analyze tracks", AnalyzeTracks, video_path, track_count, wav_directory,
+                            on_finished=lambda scores: self._OnTracksAnalyzed(project_directory, scores))
+
+    def _OnTracksAnalyzed(self, project_directory, scores):
+        if not GetCurrentProject() or os.path.dirname(GetCurrentProject().project_path) != project_directory:
+            # project changed while analyzing
+            return
+        self._track_scores = scores
+        tracks = self.GetTracks()
+        if not any(tracks):
+            # first analysis of this video and nothing chosen yet, so pre-select the likely voice tracks
+            for index, score in enumerate(scores):
+                tracks[index] = score.IsLikelyVoice()
+            GetCurrentProject().Save()
+        self.NotifyMediaInfoObservers()
+
+    def GetTrackScore(self, index):
+        if self._track_scores is None or index >= len(self._track_scores):
+            return None
+        return self._track_scores[index]
     
+    def HasProject(self):
+        return GetCurrentProject() is not None
+
     def remove_project(self, project_path):
-        GetConfig().RemoveRecentProject(project_path)
+        self._recent_projects.remove_project(project_path)
         GetConfig().Save()
+        self._recent_projects.SaveIndex()
+        GetConfig().NotifyObservers()
     
     def ReadRecentProjects(self):
-        return self._recent_projects.ReadProjects()
+        """
+        Cached entries straight away. Each is then re-read in the background and recent project
+        observers are told as it resolves
+        """
+        entries = self._recent_projects.GetEntries()
+        if self._recent_projects_job is not None:
+            self.CancelJob(self._recent_projects_job)
+        self._recent_projects_job = self._SubmitJob("Read recent projects", ReadRecentProjectEntries, entries, background=True,
+                                                    on_partial=self._OnRecentProjectRead,
+                                                    on_finished=lambda result: self._recent_projects.SaveIndex())
+        return entries
+
+    def _OnRecentProjectRead(self, entry):
+        self._recent_projects.PutEntry(entry)
+        self.NotifyRecentProjectObservers(entry)
     
     def GetTracksBitmap(self):
         bitmap = 0
@@ -77,44 +272,123 @@ class Controller:
     def GetTracks(self):
         if GetCurrentProject().tracks:
             return GetCurrentProject().tracks
-        GetCurrentProject().tracks = [False for track in get_audio_tracks(GetCurrentProject().video_path)]
+        if self._media_info is None:
+            # still probing, observers are notified when the streams are known
+            return []
+        GetCurrentProject().tracks = [False for track in self._media_info.GetAudioStreams()]
         return GetCurrentProject().tracks
     
     def CanMergeTracks(self):
         if not GetCurrentProject():
             return False
-        return any(GetCurrentProject().tracks)        
+        return any(GetCurrentProject().tracks or [])
     
     def AreTracksMerged(self):
         if not GetCurrentProject():
             return False
-        project_directory = os.path.dirname(GetCurrentProject().project_path)
-        wav_directory = os.path.join(project_directory, "WAV")
-        merge_file = os.path.join(wav_directory, f"{self.GetTracksBitmap()}.wav")
-        return os.path.exists(merge_file)
+        return GetCurrentProject().database.IsTrackSetMerged(self.GetTracksBitmap())
     
     def AreTracksTranscribed(self):
         if not GetCurrentProject():
             return False
-
-        srt_file = self.GetSrtFilePath()
-        return os.path.exists(srt_file)
+        bitmap = self.GetTracksBitmap()
+        return GetCurrentProject().database.IsTranscriptCurrent(f"{bitmap}.srt", bitmap)
     
-    def MergeTracks(self): # TODO: fix bug where transcribe button is not automatically enabled when merge complete
+    def MergeTracks(self):
         project_directory = os.path.dirname(GetCurrentProject().project_path)
         wav_directory = os.path.join(project_directory, "WAV")
         merge_file = os.path.join(wav_directory, f"{self.GetTracksBitmap()}.wav")     
         tracks = [index for index, value in enumerate(self.GetTracks()) if value]   
-        extract_dialog(GetCurrentProject().video_path, tracks, merge_file)
+        bitmap = self.GetTracksBitmap()
+        self._SubmitJob("Merge tracks", self._MergeTracksJob, GetCurrentProject().video_path, len(self.GetTracks()), tracks,
+                        wav_directory, merge_file, on_finished=lambda result: self._OnMerged(project_directory, bitmap, merge_file))
+
+    def _OnMerged(self, project_directory, bitmap, merge_file):
+        if not GetCurrentProject() or os.path.dirname(GetCurrentProject().project_path) != project_directory:
+            # project changed while merging
+            return
+        GetCurrentProject().database.PutTrackSet(bitmap, GetAudioIdentity(merge_file))
+        self.NotifyMergeObservers()
+
+    def _MergeTracksJob(self, job, video_path, track_count, tracks, wav_directory, merge_file):
+        from hyperedit_gui.media.audio_cache import AudioTrackCache
+
+        # every track is demuxed in one pass the first time, after that any combination is just a mix
+        audio_cache = AudioTrackCache(wav_directory)
+        audio_cache.Extract(job, video_path, track_count)
+        audio_cache.Mix(job, tracks, merge_file)
+
+    def TranscribeTracks(self):
+        from hyperedit_gui.media.transcription import TranscribeWithCache
 
-    def TranscribeTracks(self): # TODO: fix bug where SRTs are not automatically selected when transcribe complete (similar to above)
-                                #   workaround is to reload the project
         project_directory = os.path.dirname(GetCurrentProject().project_path)
         srt_file = self.GetSrtFilePath()
         wav_directory = os.path.join(project_directory, "WAV")
-        audio_file_path = os.path.join(wav_directory, f"{self.GetTracksBitmap()}.wav")     
-        transcribe(audio_file_path, srt_file)
-        self.NotifyTranscribeObservers()
+        bitmap = self.GetTracksBitmap()
+        audio_file_path = os.path.join(wav_directory, f"{bitmap}.wav")     
+        stream = BeginStreamedSrts()
+        self.NotifySrtChangeObservers()
+        transcript_caches = [TranscriptCache(os.path.join(project_directory, "SRT", "transcripts"))]
+        if GetConfig().GetShareTranscripts():
+            transcript_caches.append(TranscriptCache(GetSharedTranscriptDirectory()))
+        self._SubmitJob("Transcribe", TranscribeWithCache, audio_file_path, srt_file, GetConfig().GetTranscribeWorkers(), transcript_caches,
+                        on_partial=lambda primitive_srts: self._OnTranscribedChunk(project_directory, stream, primitive_srts),
+                        on_finished=lambda result: self._OnTranscribed(project_directory, srt_file, bitmap, audio_file_path),
+                        on_failed=lambda error: self._OnTranscribeStopped(project_directory, stream, srt_file),
+                        on_cancelled=lambda: self._OnTranscribeStopped(project_directory, stream, srt_file))
+
+    def _OnTranscribedChunk(self, project_directory, stream, primitive_srts):
+        if not GetCurrentProject() or os.path.dirname(GetCurrentProject().project_path) != project_directory:
+            # project changed while transcribing
+            return
+        if GetSrts() is not stream:
+            # a preview or a load replaced the streamed SRTs
+            return
+        first_row = len(GetSrts())
+        AppendStreamedSrts(primitive_srts)
+        self.NotifySrtChangeObservers(SRT_CHANGE_APPENDED, range(first_row, len(GetSrts())))
+
+    def _OnTranscribeStopped(self, project_directory, stream, srt_file):
+        """
+        Put back the transcript the streamed SRTs replaced when a transcription fails or is cancelled
+        """
+        if not GetCurrentProject() or os.path.dirname(GetCurrentProject().project_path) != project_directory:
+            # project changed while transcribing
+            return
+        if GetSrts() is not stream:
+            # a preview or a load replaced the streamed SRTs
+            return
+        self._deaggress_seconds = 0
+        self._deaggress_engine = None
+        if os.path.exists(srt_file):
+            LoadSrts(srt_file)
+        else:
+            ClearSrts()
+        self.NotifySrtChangeObservers()
+
+    def GetTranscribeWorkers(self):
+        return GetConfig().GetTranscribeWorkers()
+
+    def SetTranscribeWorkers(self, workers):
+        GetConfig().SetTranscribeWorkers(workers)
+        GetConfig().Save()
+
+    def GetShareTranscripts(self):
+        return GetConfig().GetShareTranscripts()
+
+    def SetShareTranscripts(self, share):
+        GetConfig().SetShareTranscripts(share)
+        GetConfig().Save()
+
+    def _OnTranscribed(self, project_directory, srt_file, bitmap, audio_file_path):
+        if not GetCurrentProject() or os.path.dirname(GetCurrentProject().project_path) != project_directory:
+            # project changed while transcribing
+            return
+        self._deaggress_seconds = 0
+        self._deaggress_engine = None
+        LoadSrts(srt_file)
+        GetCurrentProject().database.SetTranscriptSource(os.path.basename(srt_file), bitmap, GetAudioIdentity(audio_file_path))
+        self.NotifyMergeObservers()
         self.NotifySrtChangeObservers()
 
     def GetSrtFilePath(self, deaggress_seconds=0):
@@ -141,42 +415,155 @@ class Controller:
     def PreviewSrt(self, index):
         print(f"Previewing srt {index}")
 
-        # subtract 1 because the collection is zero indexed. this may be wrong
-        srt = GetSrts()[int(index)-1]
+        srt = GetSrtById(index)
 
-        video_path = Path(GetCurrentProject().video_path)
-        PreviewSrt(video_path=str(video_path), srt=srt.to_primitive(), player='mpv')
+        video_path = str(Path(GetCurrentProject().video_path))
+        _, start, end, _ = srt.to_primitive()
+        self._preview_player.Play(video_path, start, end)
+        self._PrefetchNeighbours(video_path, srt)
+
+    def _PrefetchNeighbours(self, video_path, srt):
+        if self._media_info is None:
+            return
+        srts = GetSrts()
+        for row in (srt.row - 1, srt.row + 1):
+            if 0 <= row < len(srts):
+                _, start, end, _ = srts.GetPrimitive(row)
+                Prefetch(video_path, self._media_info.GetBitrate(), start, end)
 
     def SetSrtRowEnabled(self, index, enabled):
         print(f"Setting srt row {index} enabled to {enabled}")
-        GetSrts()[int(index)-1].enabled = enabled
-        SaveEdits(self.GetSrtFilePath(self._deaggress_seconds)) # inefficient
+        srt = GetSrtById(index)
+        EditSrts({srt.id: (srt.edited_start_time, srt.edited_end_time, enabled)})
+        self.NotifySrtChangeObservers(SRT_CHANGE_ENABLED, [srt.row])
+
+    def EditSrtRowTimes(self, index, start_time=None, end_time=None):
+        srt = GetSrtById(index)
+        edited_start_time, edited_end_time, enabled = srt.to_edit()
+        if start_time is not None:
+            edited_start_time = start_time
+        if end_time is not None:
+            edited_end_time = end_time
+        EditSrts({srt.id: (edited_start_time, edited_end_time, enabled)})
+        self.NotifySrtChangeObservers(SRT_CHANGE_TIMES, [srt.row])
+
+    def RevertSrtRow(self, index):
+        srt = GetSrtById(index)
+        EditSrts({srt.id: (None, None, srt.enabled)})
+        self.NotifySrtChangeObservers(SRT_CHANGE_TIMES, [srt.row])
+
+    def Undo(self):
+        self._NotifyEditedIds(UndoEdit())
+
+    def Redo(self):
+        self._NotifyEditedIds(RedoEdit())
+
+    def _NotifyEditedIds(self, ids):
+        srts = GetSrts()
+        rows = [srts.GetRow(id) for id in ids if srts.HasId(id)]
+        # an undone edit may have changed either, both coalesce into the same repaint
+        self.NotifySrtChangeObservers(SRT_CHANGE_ENABLED, rows)
+        self.NotifySrtChangeObservers(SRT_CHANGE_TIMES, rows)
+
+    def GetEditSets(self):
+        return GetEditSetNames()
+
+    def GetActiveEditSet(self):
+        return GetActiveEditSetName()
+
+    def CreateEditSet(self, name):
+        """
+        Add an edit set starting from the active one's edits and switch to it
+        """
+        if AddEditSet(name):
+            self.SelectEditSet(name)
+
+    def SelectEditSet(self, name):
+        """
+        Switch edit sets. Only the rows the two sets edit differently are changed and repainted
+        """
+        self._NotifyEditedIds(SwitchEditSet(name))
+        self.NotifyEditSetObservers()
+
+    def DeleteEditSet(self, name):
+        if RemoveEditSet(name):
+            self.NotifyEditSetObservers()
+
+    def CompareEditSet(self, name):
+        """
+        An EditSetDiff of how the named edit set differs from the active one
+        """
+        return DiffEditSet(name)
+
+    def RenderEditSet(self, name):
+        """
+        Render the enabled SRTs of another edit set without switching to it. Clips are cached per
+        segment, so after rendering the active set only the clips in the diff are encoded
+        """
+        diff = DiffEditSet(name)
+        if diff is None:
+            return
+        print(f"Edit set {name} differs in {len(diff)} segments, {len(diff.GetRenderIds())} of them enabled or retimed")
+        self._Render(GetSrts().GetPrimitiveSrtsWithEdits(diff.edits, enabled_only=True))
 
     def SetDeaggressSeconds(self, value):
+        """
+        Preview the deaggressed SRTs in the table without writing them, Deaggress commits them. A value
+        out of range puts back the SRTs being deaggressed
+        """
+        if value <= 0:
+            self.DeaggressZero()
+            return
         self._deaggress_seconds = value
+        if not GetCurrentProject() or not os.path.exists(self.GetSrtFilePath()):
+            return
+        BeginStreamedSrts()
+        AppendStreamedSrts(self._GetDeaggressEngine().GetSrts(value))
+        self.NotifySrtChangeObservers()
 
     def DeaggressZero(self):
         if self._deaggress_seconds == 0:
             return
         self._deaggress_seconds = 0
+        if not GetCurrentProject() or not os.path.exists(self.GetSrtFilePath()):
+            return
         LoadSrts(self.GetSrtFilePath())
         self.NotifySrtChangeObservers()
 
+    def GetSrtStats(self):
+        return GetSrts().GetStats()
+
+    def SearchSrts(self, query):
+        """
+        Rows whose text matches the query, in order
+        """
+        return GetSrts().Search(query)
+
+    def GetEstimatedOutputSize(self, duration):
+        """
+        Bytes of a render of the given duration at the source's average bitrate, None until the media is probed
+        """
+        if self._media_info is None:
+            return None
+        return self._media_info.GetBitrate() * duration
+
     def SetSelectedSrtRows(self, selected_rows):
         self._selected_rows = selected_rows
 
     def _SetSelectedEnabled(self, enabled):
+        edits = {}
         for row in self._selected_rows:
-            GetSrts()[int(row)].enabled = enabled
-        print(f"Computed hash for enabled SRTs: {GetPrimitiveSrtListHash([srt.to_primitive() for srt in GetSrts() if srt.enabled])}")
+            srt = GetSrts()[int(row)]
+            edits[srt.id] = (srt.edited_start_time, srt.edited_end_time, enabled)
+        EditSrts(edits)
 
     def EnableSelected(self):
         self._SetSelectedEnabled(True)
-        self.NotifySrtChangeObservers()
+        self.NotifySrtChangeObservers(SRT_CHANGE_ENABLED, self._selected_rows)
 
     def DisableSelected(self):
         self._SetSelectedEnabled(False)
-        self.NotifySrtChangeObservers()
+        self.NotifySrtChangeObservers(SRT_CHANGE_ENABLED, self._selected_rows)
 
     def SetRenderPreview(self, enabled):
         self._render_preview = enabled
@@ -184,6 +571,26 @@ class Controller:
     def SetPlayAfterRender(self, enabled):
         self._play_after_render = enabled
 
+    def SetRenderMode(self, mode):
+        self._render_mode = mode
+
+    def GetRenderMode(self):
+        return self._render_mode
+
+    def GetRenderWorkers(self):
+        return GetConfig().GetRenderWorkers()
+
+    def SetRenderWorkers(self, workers):
+        GetConfig().SetRenderWorkers(workers)
+        GetConfig().Save()
+
+    def GetRenderThreads(self):
+        return GetConfig().GetRenderThreads()
+
+    def SetRenderThreads(self, threads):
+        GetConfig().SetRenderThreads(threads)
+        GetConfig().Save()
+
     def GetDeaggressSeconds(self):
         return self._deaggress_seconds
 # TODO: deaggress or merge must ignore disabled clips
@@ -191,7 +598,8 @@ class Controller:
 
 
 
-    def _Render(self, srts): # TODO: if any clips are corrupt, this breaks. this can be caused by stopping the app mid split
+    def _Render(self, srts):
+        from hyperedit.srt import GetPrimitiveSrtListHash
 
         if len(srts) == 0:
             print("No SRTs to render")
@@ -199,84 +607,163 @@ class Controller:
 
         project_directory = os.path.dirname(GetCurrentProject().project_path)
         srt_directory = os.path.join(project_directory, "CLIP")
+        video_path = GetCurrentProject().video_path
+
+        settings = self._GetRenderSettings()
+        render_key = GetRenderKey(GetPrimitiveSrtListHash(srts), video_path, settings.GetKey())
+        render_cache = self._GetRenderCache(srt_directory)
+        cached_output = render_cache.Get(render_key)
+        if cached_output:
+            print(f"Render cache hit for {len(srts)} clips")
+            self._OnRendered(cached_output)
+            return
 
-        # split_video(srt_file_path=self.GetSrtFilePath(self._deaggress_seconds),
-        final_output = split_video(srt_file_path=None,
-                    srts=srts,
-                    video_file_path=GetCurrentProject().video_path,
-                    output_directory=srt_directory,
-                    preview=self._render_preview,
-                    overwrite=False,
-                    range=None,
-                    gpu="apple"
-        )
+        output_path = os.path.join(srt_directory, f"render-{render_key[:16]}.part.mp4")
+        self._SubmitJob("Render", RenderSrts, srts, video_path, srt_directory, settings, output_path, self._media_info,
+                        on_finished=lambda final_output: self._OnRenderFinished(project_directory, render_cache, render_key, final_output))
+
+    def _GetRenderSettings(self) -> RenderSettings:
+        mode = self._render_mode
+        if mode in (RENDER_MODE_FAST_CUT, RENDER_MODE_SMART) and (self._media_info is None or not self._media_info.keyframes):
+            print("No keyframe index for this video yet, re-encoding every clip")
+            mode = RENDER_MODE_ENCODE
+        return RenderSettings(mode, self._render_preview, self._render_encoder,
+                              GetConfig().GetRenderWorkers(), GetConfig().GetRenderThreads())
+
+    def _GetRenderCache(self, clip_directory) -> RenderCache:
+        if self._render_cache is None or self._render_cache.clip_directory != clip_directory or self._render_cache.database is not GetCurrentProject().database:
+            self._render_cache = RenderCache(clip_directory, GetCurrentProject().database)
+        return self._render_cache
+
+    def _OnRenderFinished(self, project_directory, render_cache, render_key, final_output):
+        if not GetCurrentProject() or os.path.dirname(GetCurrentProject().project_path) != project_directory:
+            # project changed while rendering, and the cache's database is closed
+            print(f"Rendered {final_output} for a project that is no longer open")
+            return
+        self._OnRendered(render_cache.Put(render_key, final_output))
+
+    def _OnRendered(self, final_output):
+        print(f"Rendered {final_output}")
         if self._play_after_render:
-            subprocess.run(["ffplay", final_output])
+            subprocess.Popen(["ffplay", final_output])
+
+    def PlayEnabled(self):
+        """
+        Play the enabled SRTs straight from the source video through a concat script, without rendering
+        """
+        srts = GetSrts().GetPrimitiveSrts(enabled_only=True)
+        if len(srts) == 0:
+            print("No SRTs to play")
+            return
+        project_directory = os.path.dirname(GetCurrentProject().project_path)
+        script_path = os.path.join(project_directory, "CLIP", "play.ffconcat")
+        os.makedirs(os.path.dirname(script_path), exist_ok=True)
+        WriteConcatScript(script_path, GetCurrentProject().video_path, srts)
+        subprocess.Popen(BuildPlayCommand(script_path))
+
+    def ExportSrts(self):
+        """
+        Write the enabled SRTs with their edited times to an SRT file, and the edits as JSON next to
+        the source SRT, for use with hyperedit
+        """
+        if not IsSrtsEditable():
+            print("No SRT file loaded to export")
+            return
+        srt_file_path = GetLoadedSrtFilePath()
+        output_path = os.path.splitext(srt_file_path)[0] + ".edited.srt"
+        WriteSrtFile(output_path + ".tmp", GetSrts().GetPrimitiveSrts(enabled_only=True))
+        os.replace(output_path + ".tmp", output_path)
+        ExportEdits()
+        print(f"Exported {output_path}")
 
     def RenderAll(self):
-        self._Render([srt.to_primitive() for srt in GetSrts()])
+        self._Render(GetSrts().GetPrimitiveSrts())
 
-    def RenderEnabled(self): # TODO do not re-concatenate if file with hash exists, i.e replaying a render
-        self._Render([srt.to_primitive() for srt in GetSrts() if srt.enabled])
+    def RenderEnabled(self):
+        self._Render(GetSrts().GetPrimitiveSrts(enabled_only=True))
 
     def RenderEnabledSelection(self):
-        srts = []
-        for row in self._selected_rows:
-            srt = GetSrts()[int(row)]
-            if srt.enabled:
-                srts.append(srt.to_primitive())
+        self._Render(GetSrts().GetPrimitiveSrts(rows=self._selected_rows, enabled_only=True))
 
-        self._Render(srts)
+    def _GetDeaggressEngine(self):
+        """
+        The engine for the undeaggressed SRT file, read once and kept until that file changes
+        """
+        from hyperedit.srt import parse_srt
+        from hyperedit_gui.model.deaggress import DeaggressEngine
 
-    def Deaggress(self):
         input_path = self.GetSrtFilePath()
+        if self._deaggress_engine is None or self._deaggress_engine_path != input_path:
+            self._deaggress_engine = DeaggressEngine(parse_srt(input_path))
+            self._deaggress_engine_path = input_path
+        return self._deaggress_engine
+
+    def Deaggress(self):
+        """
+        Write the previewed deaggress to its SRT file and load it for editing
+        """
         output_path = self.GetSrtFilePath(self._deaggress_seconds)
-        if input_path == output_path:
+        if self.GetSrtFilePath() == output_path:
             print("Error: input and output paths are the same")
             return
-        # TODO change deaggress to throw a named exception and handle and continue
-        try:
-            # TODO fix bug: deaggress and merge seems to cut off the first
-            deaggress(input_path, self._deaggress_seconds, True, output_path)
-        except Exception as e:
-            print(f"Error deaggressing (possibly already exists): {e}")
+        # always rewritten, an existing file may be from an older deaggress and differ from the preview
+        WriteSrtFile(output_path + ".tmp", self._GetDeaggressEngine().GetSrts(self._deaggress_seconds))
+        os.replace(output_path + ".tmp", output_path)
         print(f"Deaggressed to {output_path}")
         LoadSrts(output_path)
         self.NotifySrtChangeObservers()
-        
 
     def PreviewTrack(self, index):
+        """
+        Play a track's audition, preparing it in the background first if it is not cached yet
+        """
         print(f"Previewing track {index}")
+        audition_path = self._GetAuditionPath(index)
+        self._audition_to_play = audition_path
+        if os.path.exists(audition_path):
+            self._PlayAudition(audition_path)
+        else:
+            self._PrepareAudition(index, audition_path)
 
-        ffmpeg_cmd = [
-            "ffmpeg",
-            "-y",
-            "-i", GetCurrentProject().video_path,
-            "-map", f"0:a:{index}",
-            "-t", "10",
-            "-af", "acompressor, silenceremove=stop_periods=-1:stop_duration=0.5:stop_threshold=-50dB",
-            "-f", "wav",
-            "-",
-        ]
-
-        ffplay_cmd = [
-            "ffplay",
-            "-autoexit", "-t", "10", # to prevent ffplay continuing to read from the pipe after ffmpeg is done
-            "-nodisp",
-            "-"
-        ]
-
-        GetCurrentProject().video_path
-        # TODO stop button
-        # this works in cmd
-        # ffmpeg -y -i ".\2024-06-16 20-59-05.mkv" -map 0:a:1 -af "acompressor, silenceremove=stop_periods=-1:stop_duration=0.5:stop_threshold=-50dB" -f wav - | ffplay -nodisp -
-        ffmpeg_process = subprocess.Popen(ffmpeg_cmd, stdout=subprocess.PIPE)
-
-        # Second command
-        ffplay_process = subprocess.Popen(ffplay_cmd, stdin=ffmpeg_process.stdout)
-
-        # Ensure the first process's output is passed to the second process
-        ffplay_process.wait()
-
-        # Get the final output
-        output, error = ffplay_process.communicate()
+    def PrepareTrackPreviews(self):
+        """
+        Prepare every track's audition at once on the background pool, once the project's tracks are known
+        """
+        for index in range(len(self.GetTracks())):
+            audition_path = self._GetAuditionPath(index)
+            if not os.path.exists(audition_path):
+                self._PrepareAudition(index, audition_path)
+
+    def StopTrackPreview(self):
+        self._audition_to_play = None
+        if self._audition_process is not None and self._audition_process.poll() is None:
+            self._audition_process.terminate()
+        self._audition_process = None
+
+    def _GetAuditionPath(self, index):
+        from hyperedit_gui.media.audio_cache import GetAuditionPath
+
+        project_directory = os.path.dirname(GetCurrentProject().project_path)
+        return GetAuditionPath(os.path.join(project_directory, "WAV"), GetCurrentProject().video_path, index)
+
+    def _PrepareAudition(self, index, audition_path):
+        from hyperedit_gui.media.audio_cache import RenderAudition
+
+        # auditions are keyed by path, which is per project and per video, so a job queued for another
+        # project never stands in for this one
+        job = self._audition_jobs.get(audition_path)
+        if job is not None and job.state in (JOB_QUEUED, JOB_RUNNING):
+            return
+        os.makedirs(os.path.dirname(audition_path), exist_ok=True)
+        self._audition_jobs[audition_path] = self._SubmitJob(f"Prepare track {index} preview", RenderAudition,
+                                                             GetCurrentProject().video_path, index, audition_path, background=True,
+                                                             on_finished=self._OnAuditionPrepared)
+
+    def _OnAuditionPrepared(self, audition_path):
+        self._audition_jobs.pop(audition_path, None)
+        if self._audition_to_play == audition_path:
+            self._PlayAudition(audition_path)
+
+    def _PlayAudition(self, audition_path):
+        self.StopTrackPreview()
+        self._audition_process = subprocess.Popen(["ffplay", "-nodisp", "-autoexit", "-v", "error", audition_path])
@@ -2,4 +2,16 @@ class ProjectException(Exception):
     """
     Base class for all project exceptions.
     """
-    pass
\ No newline at end of file
+    pass
+
+class JobException(Exception):
+    """
+    Base class for all background job exceptions.
+    """
+    pass
+
+class JobCancelledException(JobException):
+    """
+    Raised inside a job's work function when the job has been cancelled.
+    """
+    pass
@@ -0,0 +1,225 @@
+import subprocess
+import threading
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot
+
+from hyperedit_gui.exception.exceptions import JobCancelledException
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_FINISHED = "finished"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+_MAX_BACKGROUND_JOBS = 4
+
+class JobSignals(QObject):
+    """
+    Signals emitted by a job from its worker thread. Created on the GUI thread, so anything connected
+    to them through a QObject slot is delivered back on the Qt event loop
+    """
+    started = Signal(object)
+    progress = Signal(object, float, str)
+    partial = Signal(object, object)
+    finished = Signal(object, object)
+    failed = Signal(object, str)
+    cancelled = Signal(object)
+
+class Job(QRunnable):
+    """
+    A unit of long running work. The work function is called on a worker thread as work(job, *args)
+    and should call job.SetProgress and job.CheckCancelled between steps
+    """
+    def __init__(self, name, work, *args, on_finished=None, on_failed=None, on_partial=None, on_cancelled=None) -> None:
+        super().__init__()
+        self.setAutoDelete(False)
+
+        self.name = name
+        self.state = JOB_QUEUED
+        self.progress = 0.0
+        self.message = ""
+        self.error = None
+        self.on_finished = on_finished
+        self.on_failed = on_failed
+        self.on_partial = on_partial
+        self.on_cancelled = on_cancelled
+        self.signals = JobSignals()
+
+        self._work = work
+        self._args = args
+        self._cancel_event = threading.Event()
+        self._processes = []
+        self._lock = threading.Lock()
+
+    def run(self):
+        if self.IsCancelled():
+            self.signals.cancelled.emit(self)
+            return
+
+        self.signals.started.emit(self)
+        try:
+            result = self._work(self, *self._args)
+        except JobCancelledException:
+            self.signals.cancelled.emit(self)
+        except Exception as e:
+            self.signals.failed.emit(self, str(e))
+        else:
+            if self.IsCancelled():
+                self.signals.cancelled.emit(self)
+            else:
+                self.signals.finished.emit(self, result)
+
+    def SetProgress(self, fraction, message=""):
+        self.CheckCancelled()
+        self.signals.progress.emit(self, float(fraction), message)
+
+    def EmitPartial(self, result):
+        """
+        Hand part of the result to on_partial on the GUI thread while the job keeps running
+        """
+        self.CheckCancelled()
+        self.signals.partial.emit(self, result)
+
+    def Cancel(self):
+        self._cancel_event.set()
+        with self._lock:
+            processes = list(self._processes)
+        for process in processes:
+            if process.poll() is None:
+                process.terminate()
+
+    def IsCancelled(self):
+        return self._cancel_event.is_set()
+
+    def CheckCancelled(self):
+        if self.IsCancelled():
+            raise JobCancelledException(f"{self.name} was cancelled")
+
+    def Popen(self, cmd, **kwargs) -> subprocess.Popen:
+        """
+        Start a subprocess that is terminated if the job is cancelled
+        """
+        self.CheckCancelled()
+        process = subprocess.Popen(cmd, **kwargs)
+        with self._lock:
+            self._processes.append(process)
+        return process
+
+    def Run(self, cmd, **kwargs):
+        """
+        Run a subprocess to completion, raising JobCancelledException if the job was cancelled while
+        it ran
+        """
+        process = self.Popen(cmd, **kwargs)
+        process.wait()
+        with self._lock:
+            self._processes.remove(process)
+        self.CheckCancelled()
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, cmd)
+        return process.returncode
+
+class JobQueue(QObject):
+    """
+    Runs jobs off the GUI thread. Jobs that read and write project files go through a single worker
+    so they run in the order they were submitted, background jobs (previews, probes) run alongside
+    """
+    def __init__(self, max_background_jobs=_MAX_BACKGROUND_JOBS) -> None:
+        super().__init__()
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._background_pool = QThreadPool(self)
+        self._background_pool.setMaxThreadCount(max_background_jobs)
+        self._jobs = []
+        self.observers = []
+
+    def AddObserver(self, observer):
+        self.observers.append(observer)
+
+    def NotifyObservers(self, job):
+        for observer in self.observers:
+            observer.OnJobChange(job)
+
+    def Submit(self, job: Job, background=False) -> Job:
+        job.signals.started.connect(self._OnStarted)
+        job.signals.progress.connect(self._OnProgress)
+        job.signals.partial.connect(self._OnPartial)
+        job.signals.finished.connect(self._OnFinished)
+        job.signals.failed.connect(self._OnFailed)
+        job.signals.cancelled.connect(self._OnCancelled)
+        self._jobs.append(job)
+
+        if background:
+            self._background_pool.start(job)
+        else:
+            self._pool.start(job)
+        self.NotifyObservers(job)
+        return job
+
+    def GetJobs(self):
+        return list(self._jobs)
+
+    def Cancel(self, job: Job):
+        if self._pool.tryTake(job) or self._background_pool.tryTake(job):
+            # never started, so no signal will arrive from a worker
+            job.Cancel()
+            self._OnCancelled(job)
+        else:
+            job.Cancel()
+
+    def CancelAll(self):
+        for job in self.GetJobs():
+            self.Cancel(job)
+
+    def WaitForDone(self, msecs=-1):
+        return self._pool.waitForDone(msecs) and self._background_pool.waitForDone(msecs)
+
+    def _Remove(self, job):
+        if job in self._jobs:
+            self._jobs.remove(job)
+
+    @Slot(object)
+    def _OnStarted(self, job):
+        job.state = JOB_RUNNING
+        self.NotifyObservers(job)
+
+    @Slot(object, float, str)
+    def _OnProgress(self, job, fraction, message):
+        job.progress = fraction
+        job.message = message
+        self.NotifyObservers(job)
+
+    @Slot(object, object)
+    def _OnPartial(self, job, result):
+        if job.on_partial and job.state != JOB_CANCELLED:
+            job.on_partial(result)
+
+    @Slot(object, object)
+    def _OnFinished(self, job, result):
+        job.state = JOB_FINISHED
+        job.progress = 1.0
+        self._Remove(job)
+        if job.on_finished:
+            job.on_finished(result)
+        self.NotifyObservers(job)
+
+    @Slot(object, str)
+    def _OnFailed(self, job, error):
+        print(f"Job '{job.name}' failed: {error}")
+        job.state = JOB_FAILED
+        job.error = error
+        self._Remove(job)
+        if job.on_failed:
+            job.on_failed(error)
+        self.NotifyObservers(job)
+
+    @Slot(object)
+    def _OnCancelled(self, job):
+        if job.state == JOB_CANCELLED:
+            return
+        print(f"Job '{job.name}' cancelled")
+        job.state = JOB_CANCELLED
+        self._Remove(job)
+        if job.on_cancelled:
+            job.on_cancelled()
+        self.NotifyObservers(job)
@@ -1,31 +1,53 @@
 import sys
 
-from PySide6.QtWidgets import QApplication, QMainWindow, QStackedWidget
+from PySide6.QtWidgets import QApplication, QMainWindow
 
+from hyperedit_gui.view.page_stack import PageStack
 from hyperedit_gui.view.project_window import ProjectWindow
-from hyperedit_gui.view.tracks_window import TracksWindow
-from hyperedit_gui.view.srt_window import SrtWindow
+from hyperedit_gui.view.jobs_widget import JobsWidget
 from hyperedit_gui.controller import Controller
 
 class MainWindow(QMainWindow):
     def __init__(self, controller: Controller):
         super().__init__()
-        
+
+        self.controller = controller
         self.setWindowTitle("HyperEdit")
 
         # 4:3 default
         self.resize(960, 720)
 
-        self.stackedWidget = QStackedWidget()
+        self.stackedWidget = PageStack()
         self.setCentralWidget(self.stackedWidget)
 
+        # only the project list is built before the first paint, the other pages when first shown
         self.projectView = ProjectWindow(self.stackedWidget, controller)
-        self.tracksView = TracksWindow(self.stackedWidget, [], controller)
-        self.srtView = SrtWindow(self.stackedWidget, controller)
-
         self.stackedWidget.addWidget(self.projectView)
-        self.stackedWidget.addWidget(self.tracksView)
-        self.stackedWidget.addWidget(self.srtView)
+        self.stackedWidget.AddPage(self.create_tracks_view)
+        self.stackedWidget.AddPage(self.create_srt_view)
+
+        self.jobsView = JobsWidget(self, controller)
+        self.statusBar().addPermanentWidget(self.jobsView, 1)
+
+    @property
+    def tracksView(self):
+        return self.stackedWidget.GetPage(1)
+
+    @property
+    def srtView(self):
+        return self.stackedWidget.GetPage(2)
+
+    def create_tracks_view(self, parent):
+        from hyperedit_gui.view.tracks_window import TracksWindow
+        return TracksWindow(parent, [], self.controller)
+
+    def create_srt_view(self, parent):
+        from hyperedit_gui.view.srt_window import SrtWindow
+        return SrtWindow(parent, self.controller)
+
+    def closeEvent(self, event):
+        self.controller.Shutdown()
+        super().closeEvent(event)
 
 def start():
     app = QApplication(sys.argv)
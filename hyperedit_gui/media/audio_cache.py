@@ -0,0 +1,181 @@
+import os
+import glob
+import json
+import hashlib
+import struct
+import wave
+
+import numpy as np
+
+from hyperedit_gui.media.media_info import GetVideoIdentity
+
+_INDEX_FILE_NAME = "tracks.json"
+
+_KEY_VIDEO = "video"
+_KEY_TRACKS = "tracks"
+
+# whisper resamples to 16kHz mono anyway, and it keeps a multi-hour track to a few hundred MB
+SAMPLE_RATE = 16000
+
+# seconds of non-silent audio in a track audition
+_AUDITION_SECONDS = 10
+
+# samples per block when mixing, so memory stays flat however long the recording is
+_MIX_BLOCK_FRAMES = 1 << 20
+
+# data chunk sizes written by a muxer that could not seek back to fill in the real size
+_STREAMED_DATA_SIZES = (0, 0xFFFFFFFF)
+
+def GetTrackWavPath(wav_directory, index) -> str:
+    return os.path.join(wav_directory, f"track-{index}.wav")
+
+def BuildDemuxCommand(video_path, track_count, wav_directory) -> list:
+    """
+    One ffmpeg invocation that writes every audio stream to its own WAV in a single read of the video
+    """
+    cmd = ["ffmpeg", "-y", "-v", "error", "-i", video_path]
+    for index in range(track_count):
+        cmd += [
+            "-map", f"0:a:{index}",
+            "-ac", "1", "-ar", str(SAMPLE_RATE), "-c:a", "pcm_s16le",
+            _GetPartialPath(GetTrackWavPath(wav_directory, index)),
+        ]
+    return cmd
+
+def GetAuditionPath(wav_directory, video_path, index) -> str:
+    """
+    Auditions are named after the video they came from, so a changed video never plays a stale one
+    """
+    identity = hashlib.sha256(json.dumps(GetVideoIdentity(video_path)).encode()).hexdigest()[:16]
+    return os.path.join(wav_directory, f"audition-{index}-{identity}.wav")
+
+def BuildAuditionCommand(video_path, index, output_path) -> list:
+    return [
+        "ffmpeg", "-y", "-v", "error",
+        "-i", video_path,
+        "-map", f"0:a:{index}",
+        "-af", "acompressor, silenceremove=stop_periods=-1:stop_duration=0.5:stop_threshold=-50dB",
+        "-t", str(_AUDITION_SECONDS),
+        output_path,
+    ]
+
+def RenderAudition(job, video_path, index, audition_path) -> str:
+    """
+    Write a short, compressed, silence trimmed snippet of one audio track for previewing
+    """
+    job.SetProgress(0, f"Preparing track {index} preview")
+    partial_path = _GetPartialPath(audition_path)
+    job.Run(BuildAuditionCommand(video_path, index, partial_path))
+    os.replace(partial_path, audition_path)
+    for stale_path in glob.glob(os.path.join(os.path.dirname(audition_path), f"audition-{index}-*.wav")):
+        if stale_path != audition_path:
+            os.remove(stale_path)
+    return audition_path
+
+def _GetPartialPath(path) -> str:
+    base, ext = os.path.splitext(path)
+    return f"{base}.part{ext}"
+
+class AudioTrackCache:
+    """
+    Per-track WAVs extracted once from a project's video, so any combination of tracks can be mixed
+    without reading the video again
+    """
+    def __init__(self, wav_directory) -> None:
+        self.wav_directory = wav_directory
+        self.index_path = os.path.join(wav_directory, _INDEX_FILE_NAME)
+
+    def _ReadIndex(self) -> dict:
+        try:
+            with open(self.index_path, 'r') as index_file:
+                return json.load(index_file)
+        except (FileNotFoundError, json.decoder.JSONDecodeError):
+            return {}
+
+    def IsExtracted(self, video_path, track_count) -> bool:
+        index = self._ReadIndex()
+        if index.get(_KEY_VIDEO) != list(GetVideoIdentity(video_path)) or index.get(_KEY_TRACKS) != track_count:
+            return False
+        return all(os.path.exists(GetTrackWavPath(self.wav_directory, i)) for i in range(track_count))
+
+    def Extract(self, job, video_path, track_count):
+        """
+        Demux every audio track of the video unless the cached WAVs are still current
+        """
+        if self.IsExtracted(video_path, track_count):
+            return
+        job.SetProgress(0, f"Extracting {track_count} audio tracks")
+        job.Run(BuildDemuxCommand(video_path, track_count, self.wav_directory))
+        for i in range(track_count):
+            track_path = GetTrackWavPath(self.wav_directory, i)
+            os.replace(_GetPartialPath(track_path), track_path)
+        with open(self.index_path, 'w') as index_file:
+            json.dump({_KEY_VIDEO: GetVideoIdentity(video_path), _KEY_TRACKS: track_count}, index_file)
+
+    def Mix(self, job, tracks, output_path):
+        job.SetProgress(0, f"Mixing tracks {tracks}")
+        partial_path = _GetPartialPath(output_path)
+        MixWavs([GetTrackWavPath(self.wav_directory, i) for i in tracks], partial_path,
+                lambda fraction: job.SetProgress(fraction, f"Mixing tracks {tracks}"))
+        os.replace(partial_path, output_path)
+
+def ReadWav(path) -> np.ndarray:
+    """
+    Memory map the PCM data of a 16-bit WAV file as a (frames, channels) array
+    """
+    with open(path, 'rb') as wav_file:
+        riff, _, wave_id = struct.unpack("<4sI4s", wav_file.read(12))
+        if riff != b"RIFF" or wave_id != b"WAVE":
+            raise ValueError(f"{path} is not a WAV file")
+        channels = None
+        while True:
+            header = wav_file.read(8)
+            if len(header) < 8:
+                raise ValueError(f"{path} has no data chunk")
+            chunk_id, chunk_size = struct.unpack("<4sI", header)
+            if chunk_id == b"fmt ":
+                fmt = wav_file.read(chunk_size)
+                _, channels, _, _, _, bits = struct.unpack("<HHIIHH", fmt[:16])
+                if bits != 16:
+                    raise ValueError(f"{path} is {bits}-bit, expected 16-bit")
+                wav_file.seek(chunk_size % 2, os.SEEK_CUR)
+            elif chunk_id == b"data":
+                if channels is None:
+                    raise ValueError(f"{path} has no fmt chunk before its data chunk")
+                offset = wav_file.tell()
+                break
+            else:
+                wav_file.seek(chunk_size + chunk_size % 2, os.SEEK_CUR)
+
+    # a chunk may follow the data, but streamed WAVs carry a placeholder data size, so those are sized
+    # from the file instead
+    data_size = os.path.getsize(path) - offset
+    if chunk_size not in _STREAMED_DATA_SIZES:
+        data_size = min(chunk_size, data_size)
+    frames = data_size // (2 * channels)
+    return np.memmap(path, dtype="<i2", mode="r", offset=offset, shape=(frames, channels))
+
+def MixWavs(input_paths, output_path, progress=None):
+    """
+    Sum 16-bit mono WAVs sample by sample into output_path, clipping rather than wrapping. Tracks are
+    summed rather than averaged so a single voice keeps its level
+    """
+    inputs = [ReadWav(path)[:, 0] for path in input_paths]
+    with wave.open(input_paths[0], 'rb') as first:
+        sample_rate = first.getframerate()
+    frames = max(len(samples) for samples in inputs)
+
+    with wave.open(output_path, 'wb') as output:
+        output.setnchannels(1)
+        output.setsampwidth(2)
+        output.setframerate(sample_rate)
+        for start in range(0, frames, _MIX_BLOCK_FRAMES):
+            end = min(start + _MIX_BLOCK_FRAMES, frames)
+            mixed = np.zeros(end - start, dtype=np.int32)
+            for samples in inputs:
+                block = samples[start:end]
+                mixed[:len(block)] += block
+            np.clip(mixed, -32768, 32767, out=mixed)
+            output.writeframes(mixed.astype("<i2").tobytes())
+            if progress:
+                progress(end / frames)
@@ -0,0 +1,151 @@
+import os
+import json
+import subprocess
+
+_MEDIA_INFO_FILE_NAME = "media.json"
+
+_KEY_VIDEO = "video"
+_KEY_STREAMS = "streams"
+_KEY_DURATION = "duration"
+_KEY_FRAME_RATE = "frame_rate"
+_KEY_KEYFRAMES = "keyframes"
+
+def GetVideoIdentity(video_path):
+    """
+    Identify a source video by path, size and modification time, without reading it
+    """
+    stat = os.stat(video_path)
+    return (os.path.abspath(video_path), stat.st_size, stat.st_mtime_ns)
+
+class MediaInfo:
+    def __init__(self, video_identity, streams, duration, frame_rate, keyframes) -> None:
+        self.video_identity = list(video_identity)
+        self.streams = streams
+        self.duration = duration
+        self.frame_rate = frame_rate
+        self.keyframes = keyframes
+
+    def GetAudioStreams(self):
+        return [stream for stream in self.streams if stream.get("codec_type") == "audio"]
+
+    def GetVideoStream(self):
+        for stream in self.streams:
+            if stream.get("codec_type") == "video":
+                return stream
+        return None
+
+    def GetBitrate(self):
+        """
+        Average bytes per second of the source, for estimating output sizes
+        """
+        if not self.duration:
+            return 0
+        return self.video_identity[1] / self.duration
+
+    def to_json(self):
+        return {
+            _KEY_VIDEO: self.video_identity,
+            _KEY_STREAMS: self.streams,
+            _KEY_DURATION: self.duration,
+            _KEY_FRAME_RATE: self.frame_rate,
+            _KEY_KEYFRAMES: self.keyframes,
+        }
+
+def _FromJson(media_json) -> MediaInfo:
+    return MediaInfo(media_json[_KEY_VIDEO], media_json[_KEY_STREAMS], media_json[_KEY_DURATION],
+                     media_json[_KEY_FRAME_RATE], media_json[_KEY_KEYFRAMES])
+
+def _ParseFrameRate(rate) -> float:
+    numerator, _, denominator = rate.partition("/")
+    if not denominator or float(denominator) == 0:
+        return float(numerator or 0)
+    return float(numerator) / float(denominator)
+
+def ParseProbe(video_identity, probe) -> MediaInfo:
+    """
+    Media info without keyframes from ffprobe's -show_streams -show_format JSON
+    """
+    streams = [{
+        "index": stream.get("index"),
+        "codec_type": stream.get("codec_type"),
+        "codec_name": stream.get("codec_name"),
+        "channels": stream.get("channels"),
+        "sample_rate": stream.get("sample_rate"),
+        "width": stream.get("width"),
+        "height": stream.get("height"),
+        "avg_frame_rate": stream.get("avg_frame_rate"),
+        "pix_fmt": stream.get("pix_fmt"),
+        "tags": stream.get("tags", {}),
+    } for stream in probe.get("streams", [])]
+    duration = float(probe.get("format", {}).get("duration", 0))
+
+    info = MediaInfo(video_identity, streams, duration, 0.0, [])
+    video_stream = info.GetVideoStream()
+    if video_stream is not None:
+        info.frame_rate = _ParseFrameRate(video_stream.get("avg_frame_rate") or "0")
+    return info
+
+def ProbeMediaInfo(job, video_path) -> MediaInfo:
+    """
+    Probe streams, duration and the keyframe index of the first video stream. Keyframes come from
+    packet flags, so nothing is decoded
+    """
+    video_identity = GetVideoIdentity(video_path)
+
+    job.SetProgress(0, "Probing streams")
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-print_format", "json", "-show_streams", "-show_format", video_path],
+        capture_output=True, text=True, check=True)
+    info = ParseProbe(video_identity, json.loads(result.stdout))
+    if info.GetVideoStream() is None:
+        return info
+
+    job.SetProgress(0.1, "Indexing keyframes")
+    process = job.Popen(
+        ["ffprobe", "-v", "error", "-select_streams", "v:0", "-show_entries", "packet=pts_time,flags", "-of", "csv=print_section=0", video_path],
+        stdout=subprocess.PIPE, text=True)
+    for line in process.stdout:
+        pts_time, _, flags = line.strip().partition(",")
+        if "K" in flags and pts_time not in ("", "N/A"):
+            info.keyframes.append(float(pts_time))
+            if info.duration and len(info.keyframes) % 500 == 0:
+                job.SetProgress(0.1 + 0.9 * min(1.0, info.keyframes[-1] / info.duration), "Indexing keyframes")
+    process.wait()
+    job.CheckCancelled()
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, "ffprobe")
+    info.keyframes.sort()
+    return info
+
+def ReadMediaInfoFile(project_directory):
+    """
+    Media info a project cached in its directory before it had a project database, or None
+    """
+    try:
+        with open(os.path.join(project_directory, _MEDIA_INFO_FILE_NAME), 'r') as media_info_file:
+            return _FromJson(json.load(media_info_file))
+    except (FileNotFoundError, json.decoder.JSONDecodeError, KeyError):
+        return None
+
+class MediaInfoCache:
+    """
+    Media info for a project's video, stored in the project database and invalidated when the
+    video's path, size or modification time change
+    """
+    def __init__(self, database) -> None:
+        self.database = database
+
+    def Get(self, video_path):
+        try:
+            media_json = self.database.GetMedia(GetVideoIdentity(video_path))
+        except OSError:
+            return None
+        if media_json is None:
+            return None
+        try:
+            return _FromJson(media_json)
+        except KeyError:
+            return None
+
+    def Put(self, info: MediaInfo):
+        self.database.PutMedia(info.video_identity, info.to_json())
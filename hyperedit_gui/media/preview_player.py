@@ -0,0 +1,164 @@
+import os
+import sys
+import json
+import time
+import tempfile
+import subprocess
+
+from PySide6.QtCore import QTimer
+from PySide6.QtNetwork import QLocalSocket
+
+# how long to wait for a freshly started mpv to open its IPC socket
+_CONNECT_TIMEOUT = 5.0
+_CONNECT_INTERVAL = 0.05
+
+# seconds either side of a neighbouring segment to read ahead
+_PREFETCH_MARGIN = 2.0
+
+def _GetIpcPath() -> str:
+    name = f"hyperedit-mpv-{os.getpid()}"
+    if sys.platform == "win32":
+        return rf"\\.\pipe\{name}"
+    return os.path.join(tempfile.gettempdir(), f"{name}.sock")
+
+def BuildPlayerCommand(ipc_path) -> list:
+    return [
+        "mpv",
+        "--idle=yes", "--force-window=yes", "--keep-open=yes",
+        "--really-quiet",
+        f"--input-ipc-server={ipc_path}",
+    ]
+
+def BuildSegmentCommands(video_path, start, end, load) -> list:
+    """
+    mpv IPC commands that play start to end, looping the segment until the next preview. The file is
+    only loaded when it is not already open, otherwise moving to a segment is a seek
+    """
+    commands = [
+        ["set_property", "ab-loop-a", start],
+        ["set_property", "ab-loop-b", end],
+    ]
+    if load:
+        # start only applies to the load, later segments seek within the open file
+        commands.append(["set_property", "start", str(start)])
+        commands.append(["loadfile", video_path, "replace"])
+    else:
+        commands.append(["seek", start, "absolute+exact"])
+    commands.append(["set_property", "pause", False])
+    return commands
+
+class PreviewPlayer:
+    """
+    A long lived mpv controlled over its JSON IPC, reused for every SRT preview so each click costs a
+    seek rather than a player startup and file open. Commands are written through a QLocalSocket
+    without waiting, so a slow or stalled mpv never blocks the GUI thread
+    """
+    def __init__(self) -> None:
+        self.ipc_path = _GetIpcPath()
+        self._process = None
+        self._video_path = None
+        self._socket = None
+        # commands waiting for the socket to connect
+        self._pending = b""
+        self._connect_deadline = 0.0
+
+    def IsRunning(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def _Start(self):
+        self._CloseSocket()
+        if sys.platform != "win32" and os.path.exists(self.ipc_path):
+            os.remove(self.ipc_path)
+        self._process = subprocess.Popen(BuildPlayerCommand(self.ipc_path))
+        self._video_path = None
+        self._connect_deadline = time.monotonic() + _CONNECT_TIMEOUT
+
+    def _Send(self, commands):
+        """
+        Queue commands and return straight away. They are written once the socket connects, and
+        mpv's replies are read and dropped as they arrive
+        """
+        self._pending += b"".join(json.dumps({"command": command}).encode() + b"\n" for command in commands)
+        if self._socket is None:
+            self._Connect()
+        elif self._socket.state() == QLocalSocket.ConnectedState:
+            self._Flush()
+
+    def _Connect(self):
+        self._socket = QLocalSocket()
+        self._socket.connected.connect(self._Flush)
+        self._socket.readyRead.connect(self._OnReadyRead)
+        self._socket.errorOccurred.connect(self._OnError)
+        self._socket.connectToServer(self.ipc_path)
+
+    def _Reconnect(self):
+        # a command sent since the error may already have connected again
+        if self._socket is None:
+            self._Connect()
+
+    def _CloseSocket(self):
+        if self._socket is None:
+            return
+        socket, self._socket = self._socket, None
+        socket.errorOccurred.disconnect(self._OnError)
+        socket.abort()
+        socket.deleteLater()
+
+    def _Flush(self):
+        if self._socket is None or not self._pending:
+            return
+        self._socket.write(self._pending)
+        self._pending = b""
+
+    def _OnReadyRead(self):
+        if self._socket is not None:
+            self._socket.readAll()
+
+    def _OnError(self, error):
+        self._CloseSocket()
+        if self._pending and self.IsRunning() and time.monotonic() < self._connect_deadline:
+            # mpv has not opened its socket yet
+            QTimer.singleShot(int(_CONNECT_INTERVAL * 1000), self._Reconnect)
+            return
+        if self._pending:
+            print(f"Could not send commands to mpv: {error}")
+            self._pending = b""
+
+    def Play(self, video_path, start, end):
+        if not self.IsRunning():
+            self._Start()
+        load = video_path != self._video_path
+        self._Send(BuildSegmentCommands(video_path, start, end, load))
+        self._video_path = video_path
+
+    def Quit(self):
+        if not self.IsRunning():
+            return
+        if self._socket is not None and self._socket.state() == QLocalSocket.ConnectedState:
+            # shutting down, so a short wait for the command to go out is fine
+            self._Send([["quit"]])
+            self._socket.waitForBytesWritten(500)
+            try:
+                self._process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self._process.terminate()
+        else:
+            self._process.terminate()
+        self._CloseSocket()
+        self._pending = b""
+        self._process = None
+
+def Prefetch(video_path, bitrate, start, end):
+    """
+    Ask the OS to read the bytes of a segment into the page cache, estimating their offset from the
+    average bitrate, so previewing it next does not wait on the disk
+    """
+    if not bitrate or not hasattr(os, "posix_fadvise"):
+        return
+    offset = int(max(0.0, start - _PREFETCH_MARGIN) * bitrate)
+    length = int((end - start + 2 * _PREFETCH_MARGIN) * bitrate)
+    fd = os.open(video_path, os.O_RDONLY)
+    try:
+        os.posix_fadvise(fd, offset, length, os.POSIX_FADV_WILLNEED)
+    finally:
+        os.close(fd)
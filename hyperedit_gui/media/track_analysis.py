@@ -0,0 +1,125 @@
+import os
+import json
+
+import numpy as np
+
+from hyperedit_gui.media.audio_cache import AudioTrackCache, GetTrackWavPath, ReadWav, SAMPLE_RATE
+from hyperedit_gui.media.media_info import GetVideoIdentity
+
+_SCORES_FILE_NAME = "track_scores.json"
+
+_KEY_VIDEO = "video"
+_KEY_SCORES = "scores"
+_KEY_LOUDNESS = "loudness"
+_KEY_SPEECH_RATIO = "speech_ratio"
+_KEY_SILENCE = "silence"
+
+# 32ms windows at 16kHz, short enough to find the gaps between words
+_WINDOW_FRAMES = 512
+# windows per block, so memory stays flat however long the recording is
+_BLOCK_WINDOWS = 8192
+
+_SPEECH_LOW_HZ = 300
+_SPEECH_HIGH_HZ = 3400
+_SILENCE_DB = -50.0
+
+# thresholds for pre-selecting a track as voice
+_VOICE_SPEECH_RATIO = 0.6
+_VOICE_LOUDNESS_DB = -45.0
+_VOICE_MAX_SILENCE = 0.98
+
+class TrackScore:
+    def __init__(self, loudness, speech_ratio, silence) -> None:
+        # mean level of the non-silent windows in dBFS
+        self.loudness = loudness
+        # share of non-silent energy in the speech band
+        self.speech_ratio = speech_ratio
+        # share of windows below the silence threshold
+        self.silence = silence
+
+    def IsLikelyVoice(self) -> bool:
+        return self.speech_ratio >= _VOICE_SPEECH_RATIO and self.loudness >= _VOICE_LOUDNESS_DB and self.silence <= _VOICE_MAX_SILENCE
+
+    def to_json(self):
+        return {
+            _KEY_LOUDNESS: self.loudness,
+            _KEY_SPEECH_RATIO: self.speech_ratio,
+            _KEY_SILENCE: self.silence,
+        }
+
+def _FromJson(score_json) -> TrackScore:
+    return TrackScore(score_json[_KEY_LOUDNESS], score_json[_KEY_SPEECH_RATIO], score_json[_KEY_SILENCE])
+
+def AnalyzeSamples(samples, sample_rate, progress=None) -> TrackScore:
+    """
+    Score 16-bit mono samples in a single pass of fixed size windows. Spectra are only taken of the
+    windows above the silence threshold
+    """
+    window = np.hanning(_WINDOW_FRAMES).astype(np.float32)
+    bin_hz = sample_rate / _WINDOW_FRAMES
+    low_bin = int(np.ceil(_SPEECH_LOW_HZ / bin_hz))
+    high_bin = int(_SPEECH_HIGH_HZ / bin_hz) + 1
+
+    window_count = len(samples) // _WINDOW_FRAMES
+    silent_windows = 0
+    active_power = 0.0
+    speech_energy = 0.0
+    total_energy = 0.0
+    block_frames = _BLOCK_WINDOWS * _WINDOW_FRAMES
+    for start in range(0, window_count * _WINDOW_FRAMES, block_frames):
+        end = min(start + block_frames, window_count * _WINDOW_FRAMES)
+        windows = np.asarray(samples[start:end], dtype=np.float32).reshape(-1, _WINDOW_FRAMES) / 32768.0
+        power = np.mean(windows * windows, axis=1)
+        active = 10.0 * np.log10(power + 1e-12) >= _SILENCE_DB
+        silent_windows += len(power) - int(np.count_nonzero(active))
+        active_power += float(np.sum(power[active]))
+
+        spectra = np.abs(np.fft.rfft(windows[active] * window, axis=1)) ** 2
+        speech_energy += float(np.sum(spectra[:, low_bin:high_bin]))
+        # skip the DC bin, which is only offset
+        total_energy += float(np.sum(spectra[:, 1:]))
+        if progress:
+            progress(end / (window_count * _WINDOW_FRAMES))
+
+    if window_count == 0:
+        return TrackScore(-120.0, 0.0, 1.0)
+    active_windows = window_count - silent_windows
+    loudness = 10.0 * np.log10(active_power / active_windows) if active_windows else -120.0
+    speech_ratio = speech_energy / total_energy if total_energy else 0.0
+    return TrackScore(float(loudness), float(speech_ratio), silent_windows / window_count)
+
+def AnalyzeTracks(job, video_path, track_count, wav_directory) -> list:
+    """
+    Score every audio track of the video from its cached WAV, extracting the WAVs first if needed
+    """
+    audio_cache = AudioTrackCache(wav_directory)
+    audio_cache.Extract(job, video_path, track_count)
+    scores = []
+    for index in range(track_count):
+        samples = ReadWav(GetTrackWavPath(wav_directory, index))
+        scores.append(AnalyzeSamples(samples[:, 0], SAMPLE_RATE,
+                                     lambda fraction: job.SetProgress((index + fraction) / track_count, f"Analyzing track {index}")))
+    TrackScoreCache(wav_directory).Put(video_path, scores)
+    return scores
+
+class TrackScoreCache:
+    """
+    Track scores for a project's video, invalidated when the video's path, size or modification time change
+    """
+    def __init__(self, wav_directory) -> None:
+        self.scores_path = os.path.join(wav_directory, _SCORES_FILE_NAME)
+
+    def Get(self, video_path, track_count):
+        try:
+            with open(self.scores_path, 'r') as scores_file:
+                scores_json = json.load(scores_file)
+            if scores_json[_KEY_VIDEO] != list(GetVideoIdentity(video_path)) or len(scores_json[_KEY_SCORES]) != track_count:
+                return None
+            return [_FromJson(score_json) for score_json in scores_json[_KEY_SCORES]]
+        except (OSError, json.decoder.JSONDecodeError, KeyError):
+            return None
+
+    def Put(self, video_path, scores):
+        with open(self.scores_path + ".tmp", 'w') as scores_file:
+            json.dump({_KEY_VIDEO: GetVideoIdentity(video_path), _KEY_SCORES: [score.to_json() for score in scores]}, scores_file)
+        os.replace(self.scores_path + ".tmp", self.scores_path)
@@ -0,0 +1,62 @@
+import os
+import json
+import shutil
+import hashlib
+
+from appdirs import user_cache_dir
+
+_SOURCE_SUFFIX = ".source.json"
+
+_KEY_AUDIO = "audio"
+_KEY_TRANSCRIPT = "transcript"
+
+def GetSharedTranscriptDirectory() -> str:
+    return os.path.join(user_cache_dir("hyperedit_gui"), "transcripts")
+
+def GetTranscriptKey(audio_checksum, settings) -> str:
+    key = json.dumps([audio_checksum, settings], sort_keys=True)
+    return hashlib.sha256(key.encode()).hexdigest()
+
+def GetAudioIdentity(audio_path):
+    stat = os.stat(audio_path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+class TranscriptCache:
+    """
+    Transcripts stored under the key of the audio they came from, so identical audio is never
+    transcribed twice. File names are the keys, so there is no index to keep in step
+    """
+    def __init__(self, cache_directory) -> None:
+        self.cache_directory = cache_directory
+
+    def _GetPath(self, key) -> str:
+        return os.path.join(self.cache_directory, f"transcript-{key}.srt")
+
+    def Get(self, key):
+        path = self._GetPath(key)
+        if os.path.exists(path):
+            return path
+        return None
+
+    def Put(self, key, srt_path):
+        os.makedirs(self.cache_directory, exist_ok=True)
+        path = self._GetPath(key)
+        shutil.copyfile(srt_path, path + ".tmp")
+        os.replace(path + ".tmp", path)
+
+def WriteTranscriptSource(srt_path, audio_path, key):
+    """
+    Record which audio a project's SRT was transcribed from
+    """
+    with open(srt_path + _SOURCE_SUFFIX, 'w') as source_file:
+        json.dump({_KEY_AUDIO: GetAudioIdentity(audio_path), _KEY_TRANSCRIPT: key}, source_file)
+
+def ReadTranscriptSource(srt_path):
+    """
+    The [size, mtime_ns] of the audio an SRT was transcribed from, or None if it was not recorded
+    """
+    try:
+        with open(srt_path + _SOURCE_SUFFIX, 'r') as source_file:
+            return json.load(source_file).get(_KEY_AUDIO)
+    except (OSError, json.decoder.JSONDecodeError, AttributeError):
+        return None
@@ -0,0 +1,176 @@
+import os
+import shutil
+import wave
+import multiprocessing
+from importlib import metadata
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from hyperedit_gui.media.audio_cache import ReadWav
+from hyperedit_gui.model.srt_file import WriteSrtFile
+from hyperedit_gui.media.transcript_cache import GetTranscriptKey, WriteTranscriptSource
+from hyperedit_gui.render.clips import GetChecksum
+
+# 32ms windows at 16kHz
+_WINDOW_FRAMES = 512
+# windows per block when measuring power, so memory stays flat however long the recording is
+_BLOCK_WINDOWS = 8192
+
+# aim for chunks of this length, cut at the quietest pause within the search distance of the target
+_CHUNK_SECONDS = 300
+_SEARCH_SECONDS = 30
+_PAUSE_SECONDS = 0.5
+
+def GetTranscriptionSettings() -> dict:
+    """
+    Everything besides the audio that changes a transcript
+    """
+    try:
+        hyperedit_version = metadata.version("hyperedit")
+    except metadata.PackageNotFoundError:
+        hyperedit_version = None
+    return {
+        "hyperedit": hyperedit_version,
+        "chunk_seconds": _CHUNK_SECONDS,
+        "search_seconds": _SEARCH_SECONDS,
+        "pause_seconds": _PAUSE_SECONDS,
+    }
+
+def GetWindowPower(samples) -> np.ndarray:
+    """
+    Mean power of each whole window of 16-bit samples
+    """
+    window_count = len(samples) // _WINDOW_FRAMES
+    power = np.empty(window_count, dtype=np.float64)
+    for first in range(0, window_count, _BLOCK_WINDOWS):
+        last = min(first + _BLOCK_WINDOWS, window_count)
+        windows = np.asarray(samples[first * _WINDOW_FRAMES:last * _WINDOW_FRAMES], dtype=np.float32).reshape(-1, _WINDOW_FRAMES) / 32768.0
+        power[first:last] = np.mean(windows * windows, axis=1)
+    return power
+
+def FindChunkBoundaries(samples, sample_rate, chunk_seconds=_CHUNK_SECONDS) -> list:
+    """
+    Frame offsets that split the samples into chunks of roughly chunk_seconds, each cut in the middle
+    of the quietest pause near its target so no word is split. Includes 0 and len(samples)
+    """
+    window_seconds = _WINDOW_FRAMES / sample_rate
+    chunk_windows = max(1, round(chunk_seconds / window_seconds))
+    search_windows = max(1, round(min(_SEARCH_SECONDS, chunk_seconds / 4) / window_seconds))
+    pause_windows = max(1, round(_PAUSE_SECONDS / window_seconds))
+
+    power = GetWindowPower(samples)
+    # mean power of every pause length stretch of windows
+    cumulative = np.concatenate([[0.0], np.cumsum(power)])
+    stretches = (cumulative[pause_windows:] - cumulative[:-pause_windows]) / pause_windows
+
+    boundaries = [0]
+    last = 0
+    # leave at least the search distance for the final chunk
+    while last + chunk_windows + search_windows < len(stretches):
+        target = last + chunk_windows
+        low = max(last + 1, target - search_windows)
+        high = target + search_windows
+        quietest = low + int(np.argmin(stretches[low:high]))
+        last = quietest + pause_windows // 2
+        boundaries.append(last * _WINDOW_FRAMES)
+    boundaries.append(len(samples))
+    return boundaries
+
+def WriteWav(path, samples, sample_rate):
+    with wave.open(path, 'wb') as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(np.asarray(samples, dtype="<i2").tobytes())
+
+def StitchChunk(primitive_srts, offset, first_id) -> list:
+    """
+    Move a chunk's SRTs onto the timeline of the whole recording and number them from first_id
+    """
+    return [(str(first_id + i), round(start + offset, 3), round(end + offset, 3), text)
+            for i, (_, start, end, text) in enumerate(primitive_srts)]
+
+def _TranscribeChunk(chunk_path):
+    # runs in a worker process, which is the only place the speech model needs loading
+    from hyperedit.transcribe import transcribe
+    from hyperedit.srt import parse_srt
+
+    srt_path = os.path.splitext(chunk_path)[0] + ".srt"
+    transcribe(chunk_path, srt_path)
+    return parse_srt(srt_path)
+
+def TranscribeInChunks(job, audio_path, srt_path, workers) -> str:
+    """
+    Transcribe audio_path to srt_path across a process pool, one chunk per worker. Chunks are emitted
+    through job.EmitPartial strictly in order as they finish, so the ids given to earlier SRTs never
+    change. Cancelling abandons queued chunks, chunks already running finish in the background
+    """
+    samples = ReadWav(audio_path)[:, 0]
+    with wave.open(audio_path, 'rb') as audio_file:
+        sample_rate = audio_file.getframerate()
+
+    job.SetProgress(0, "Finding pauses")
+    boundaries = FindChunkBoundaries(samples, sample_rate)
+    chunk_directory = os.path.splitext(srt_path)[0] + ".chunks"
+    os.makedirs(chunk_directory, exist_ok=True)
+    chunks = []
+    for index, (start, end) in enumerate(zip(boundaries, boundaries[1:])):
+        chunk_path = os.path.join(chunk_directory, f"chunk-{index}.wav")
+        WriteWav(chunk_path, samples[start:end], sample_rate)
+        chunks.append((start / sample_rate, chunk_path))
+
+    print(f"Transcribing {len(chunks)} chunks with {workers} workers")
+    job.SetProgress(0, f"Transcribing {len(chunks)} chunks")
+    transcribed = {}
+    next_chunk = 0
+    srts = []
+    # this runs on a worker thread of a Qt process, which forked workers would copy along with the
+    # locks other threads hold, so workers start fresh and import _TranscribeChunk themselves
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        futures = {executor.submit(_TranscribeChunk, chunk_path): index for index, (_, chunk_path) in enumerate(chunks)}
+        for done, future in enumerate(as_completed(futures), 1):
+            transcribed[futures[future]] = future.result()
+            streamed = []
+            while next_chunk in transcribed:
+                streamed += StitchChunk(transcribed.pop(next_chunk), chunks[next_chunk][0], len(srts) + len(streamed) + 1)
+                next_chunk += 1
+            if streamed:
+                srts += streamed
+                job.EmitPartial(streamed)
+            job.SetProgress(done / len(chunks), f"Transcribed {done} of {len(chunks)} chunks")
+    except BaseException:
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown()
+
+    partial_path = os.path.splitext(srt_path)[0] + ".part.srt"
+    WriteSrtFile(partial_path, srts)
+    os.replace(partial_path, srt_path)
+    shutil.rmtree(chunk_directory, ignore_errors=True)
+    return srt_path
+
+def TranscribeWithCache(job, audio_path, srt_path, workers, transcript_caches) -> str:
+    """
+    Copy the transcript of identical audio from the first cache that has it, otherwise transcribe it
+    and store it in every cache
+    """
+    job.SetProgress(0, "Hashing audio")
+    key = GetTranscriptKey(GetChecksum(audio_path), GetTranscriptionSettings())
+    job.CheckCancelled()
+    for transcript_cache in transcript_caches:
+        cached_path = transcript_cache.Get(key)
+        if cached_path is not None:
+            print(f"Transcript cache hit in {transcript_cache.cache_directory}")
+            partial_path = os.path.splitext(srt_path)[0] + ".part.srt"
+            shutil.copyfile(cached_path, partial_path)
+            os.replace(partial_path, srt_path)
+            break
+    else:
+        TranscribeInChunks(job, audio_path, srt_path, workers)
+    for transcript_cache in transcript_caches:
+        if transcript_cache.Get(key) is None:
+            transcript_cache.Put(key, srt_path)
+    WriteTranscriptSource(srt_path, audio_path, key)
+    return srt_path
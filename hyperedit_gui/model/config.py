@@ -1,12 +1,25 @@
+import os
+
 from common_py.config import Config
 
 _CONFIG_SINGLETON = None
 
+# a few concurrent encodes keep a many-core machine busy without thrashing the disk
+_DEFAULT_RENDER_WORKERS = max(1, (os.cpu_count() or 1) // 4)
+# every transcriber loads its own model, so memory runs out long before cores do
+_DEFAULT_TRANSCRIBE_WORKERS = max(1, min(4, (os.cpu_count() or 1) // 4))
+
 class HeConfig(Config):
 
     def __init__(self) -> None:
         super().__init__('hyperedit_gui')
         self._projects = self.config["projects"]
+        self._render_workers = self.config.get("render_workers", _DEFAULT_RENDER_WORKERS)
+        # 0 shares the cores evenly between render workers
+        self._render_threads = self.config.get("render_threads", 0)
+        self._transcribe_workers = self.config.get("transcribe_workers", _DEFAULT_TRANSCRIBE_WORKERS)
+        # also look for transcripts made by other projects on this machine
+        self._share_transcripts = self.config.get("share_transcripts", False)
         self.observers = []
 
     def AddObserver(self, observer):
@@ -23,14 +36,46 @@ class HeConfig(Config):
         for project in recent_projects.GetProjects():
             self._projects.append(project.path)
 
+    def GetRenderWorkers(self):
+        return self._render_workers
+
+    def SetRenderWorkers(self, workers):
+        self._render_workers = workers
+
+    def GetRenderThreads(self):
+        return self._render_threads
+
+    def SetRenderThreads(self, threads):
+        self._render_threads = threads
+
+    def GetTranscribeWorkers(self):
+        return self._transcribe_workers
+
+    def SetTranscribeWorkers(self, workers):
+        self._transcribe_workers = workers
+
+    def GetShareTranscripts(self):
+        return self._share_transcripts
+
+    def SetShareTranscripts(self, share):
+        self._share_transcripts = share
+
     def _PrepareSave(self):
         return dict(
-            projects=self._projects
+            projects=self._projects,
+            render_workers=self._render_workers,
+            render_threads=self._render_threads,
+            transcribe_workers=self._transcribe_workers,
+            share_transcripts=self._share_transcripts
         )
 
     def _DefaultConfig(self):
         return dict(
-            projects=[]
+            projects=[],
+            render_workers=_DEFAULT_RENDER_WORKERS,
+            render_threads=0,
+            transcribe_workers=_DEFAULT_TRANSCRIBE_WORKERS,
+            share_transcripts=False
         )
     
 def GetConfig():
@@ -0,0 +1,34 @@
+import numpy as np
+
+class DeaggressEngine:
+    """
+    Pulls every SRT start back by the leading seconds and merges the SRTs that then overlap. Works on
+    columnar start and end arrays and remembers the result for every value it has computed
+    """
+    def __init__(self, primitive_srts) -> None:
+        order = sorted(range(len(primitive_srts)), key=lambda i: primitive_srts[i][1])
+        self.starts = np.array([primitive_srts[i][1] for i in order], dtype=np.float64)
+        self.ends = np.array([primitive_srts[i][2] for i in order], dtype=np.float64)
+        self.texts = [primitive_srts[i][3] for i in order]
+        self._merged = {}
+
+    def Merge(self, leading_seconds):
+        """
+        Start, end and index of the first original SRT of every merged SRT
+        """
+        if len(self.starts) == 0:
+            return np.empty(0), np.empty(0), np.empty(0, dtype=np.int64)
+        starts = np.maximum(self.starts - leading_seconds, 0.0)
+        # an SRT starts a new group unless it begins before every earlier SRT has ended
+        reach = np.maximum.accumulate(self.ends)
+        firsts = np.flatnonzero(np.concatenate([[True], starts[1:] > reach[:-1]]))
+        return starts[firsts], np.maximum.reduceat(self.ends, firsts), firsts
+
+    def GetSrts(self, leading_seconds) -> list:
+        key = round(leading_seconds, 3)
+        if key not in self._merged:
+            starts, ends, firsts = self.Merge(key)
+            lasts = np.append(firsts[1:], len(self.texts))
+            self._merged[key] = [(str(i + 1), round(float(start), 3), round(float(end), 3), " ".join(self.texts[first:last]))
+                                 for i, (start, end, first, last) in enumerate(zip(starts, ends, firsts, lasts))]
+        return self._merged[key]
@@ -0,0 +1,138 @@
+import os
+import json
+
+_KEY_OP = "op"
+_KEY_BEFORE = "before"
+_KEY_AFTER = "after"
+
+OP_EDIT = "edit"
+OP_UNDO = "undo"
+OP_REDO = "redo"
+
+class EditJournal:
+    """
+    Append-only log of SRT edit operations, one JSON object per line. Each entry holds the before and
+    after edit state of the rows it touched, so it can be replayed over a snapshot or undone
+    """
+    def __init__(self, journal_path) -> None:
+        self.journal_path = journal_path
+        self._length = None
+
+    def Append(self, op, before: dict, after: dict):
+        length = len(self)
+        entry = {_KEY_OP: op, _KEY_BEFORE: before, _KEY_AFTER: after}
+        line = json.dumps(entry) + "\n"
+        with open(self.journal_path, 'ab+') as journal_file:
+            # start on a fresh line if a crash left a torn entry at the end
+            journal_file.seek(0, os.SEEK_END)
+            if journal_file.tell() > 0:
+                journal_file.seek(-1, os.SEEK_END)
+                if journal_file.read(1) != b"\n":
+                    line = "\n" + line
+            journal_file.write(line.encode())
+            journal_file.flush()
+            os.fsync(journal_file.fileno())
+        self._length = length + 1
+
+    def Read(self) -> list:
+        """
+        Read entries as (op, before, after). A torn line from a crash mid-write is ignored
+        """
+        entries = []
+        try:
+            with open(self.journal_path, 'r') as journal_file:
+                for line in journal_file:
+                    try:
+                        entry = json.loads(line)
+                    except json.decoder.JSONDecodeError:
+                        print(f"Ignoring incomplete entry in {self.journal_path}")
+                        continue
+                    entries.append((entry[_KEY_OP], _ToEdits(entry[_KEY_BEFORE]), _ToEdits(entry[_KEY_AFTER])))
+        except FileNotFoundError:
+            pass
+        self._length = len(entries)
+        return entries
+
+    def Clear(self):
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        self._length = 0
+
+    def __len__(self):
+        if self._length is None:
+            self.Read()
+        return self._length
+
+def _ToEdits(json_edits) -> dict:
+    return {key: tuple(value) for key, value in json_edits.items()}
+
+class EditHistory:
+    """
+    Undo and redo stacks of (before, after) edits, rebuilt by replaying a journal
+    """
+    def __init__(self) -> None:
+        self._undo = []
+        self._redo = []
+
+    def Replay(self, entries) -> dict:
+        """
+        Replay journal entries and return the resulting edit state of every row they touched
+        """
+        edits = {}
+        for op, before, after in entries:
+            if op == OP_EDIT:
+                self.Push(before, after)
+            elif op == OP_UNDO and self._undo:
+                self._redo.append(self._undo.pop())
+            elif op == OP_REDO and self._redo:
+                self._undo.append(self._redo.pop())
+            edits.update(after)
+        return edits
+
+    def GetEntries(self, limit) -> list:
+        """
+        Journal entries that rebuild the newest of the undo and redo stacks, at most limit of them. A
+        redo takes two entries, the edit and its undo
+        """
+        redo = self._redo[-(limit // 2):] if limit >= 2 else []
+        undo = self._undo[max(0, len(self._undo) - (limit - 2 * len(redo))):]
+        entries = [(OP_EDIT, before, after) for before, after in undo + redo[::-1]]
+        # the last redone edit is undone first, leaving the next redo on top
+        entries += [(OP_UNDO, after, before) for before, after in redo]
+        return entries
+
+    def Push(self, before, after):
+        self._undo.append((before, after))
+        self._redo.clear()
+
+    def Undo(self):
+        """
+        Pop the last edit, returning (before, after) or None
+        """
+        if not self._undo:
+            return None
+        edit = self._undo.pop()
+        self._redo.append(edit)
+        return edit
+
+    def Redo(self):
+        if not self._redo:
+            return None
+        edit = self._redo.pop()
+        self._undo.append(edit)
+        return edit
+
+    def PeekUndo(self):
+        """
+        The edit Undo would pop, without popping it
+        """
+        return self._undo[-1] if self._undo else None
+
+    def PeekRedo(self):
+        return self._redo[-1] if self._redo else None
+
+    def CanUndo(self):
+        return len(self._undo) > 0
+
+    def CanRedo(self):
+        return len(self._redo) > 0
@@ -0,0 +1,32 @@
+class EditSetDiff:
+    """
+    How one edit set differs from another, by SRT id. Enabled and retimed rows need clips the first
+    set's render did not have, disabled rows only drop out of it
+    """
+    __slots__ = ("edits", "enabled", "disabled", "retimed")
+
+    def __init__(self, changes: dict) -> None:
+        """
+        changes is {id: (edit in the first set, edit in the second)} of the rows that differ
+        """
+        # applying these to the first set gives the second
+        self.edits = {id: to_edit for id, (_, to_edit) in changes.items()}
+        self.enabled = []
+        self.disabled = []
+        self.retimed = []
+        for id, (from_edit, to_edit) in changes.items():
+            if to_edit[2] and not from_edit[2]:
+                self.enabled.append(id)
+            elif from_edit[2] and not to_edit[2]:
+                self.disabled.append(id)
+            elif to_edit[2] and from_edit[:2] != to_edit[:2]:
+                self.retimed.append(id)
+
+    def __len__(self):
+        return len(self.edits)
+
+    def GetRenderIds(self) -> list:
+        """
+        Ids of the rows whose clips a render of the second set has to encode
+        """
+        return self.enabled + self.retimed
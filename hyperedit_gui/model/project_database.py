@@ -0,0 +1,306 @@
+import json
+import sqlite3
+
+DATABASE_FILE_NAME = "project.db"
+DEFAULT_EDIT_SET_NAME = "default"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS project (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS media (
+    video_path TEXT PRIMARY KEY,
+    size INTEGER,
+    mtime_ns INTEGER,
+    info TEXT
+);
+CREATE TABLE IF NOT EXISTS track_sets (
+    bitmap INTEGER PRIMARY KEY,
+    audio_size INTEGER,
+    audio_mtime_ns INTEGER
+);
+CREATE TABLE IF NOT EXISTS transcripts (
+    id INTEGER PRIMARY KEY,
+    name TEXT UNIQUE,
+    mtime_ns INTEGER,
+    bitmap INTEGER,
+    audio_size INTEGER,
+    audio_mtime_ns INTEGER,
+    edit_set_id INTEGER
+);
+CREATE TABLE IF NOT EXISTS segments (
+    transcript_id INTEGER REFERENCES transcripts(id) ON DELETE CASCADE,
+    row INTEGER,
+    srt_id TEXT,
+    start_time REAL,
+    end_time REAL,
+    text TEXT,
+    PRIMARY KEY (transcript_id, row)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS edit_sets (
+    id INTEGER PRIMARY KEY,
+    transcript_id INTEGER REFERENCES transcripts(id) ON DELETE CASCADE,
+    name TEXT,
+    UNIQUE (transcript_id, name)
+);
+CREATE TABLE IF NOT EXISTS edits (
+    edit_set_id INTEGER REFERENCES edit_sets(id) ON DELETE CASCADE,
+    srt_id TEXT,
+    edited_start_time REAL,
+    edited_end_time REAL,
+    enabled INTEGER,
+    PRIMARY KEY (edit_set_id, srt_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS edit_log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    edit_set_id INTEGER REFERENCES edit_sets(id) ON DELETE CASCADE,
+    op TEXT,
+    before TEXT,
+    after TEXT
+);
+CREATE INDEX IF NOT EXISTS edit_log_by_edit_set ON edit_log (edit_set_id, id);
+CREATE TABLE IF NOT EXISTS render_artifacts (
+    key TEXT PRIMARY KEY,
+    file TEXT,
+    size INTEGER
+);
+"""
+
+# each migration moves the schema up one version, PRAGMA user_version counts those applied. Only
+# schemas that have shipped need one, until then _SCHEMA itself changes
+_MIGRATIONS = []
+
+# the edit state of a row nobody has touched, which is never stored
+_UNEDITED = (None, None, True)
+
+def _ToEdits(json_edits) -> dict:
+    return {id: tuple(edit) for id, edit in json.loads(json_edits).items()}
+
+class ProjectDatabase:
+    """
+    Everything a project knows besides the media files themselves: the project settings, probed media
+    info, merged track sets, transcripts with their segments, named edit sets with their edits and
+    edit log, and render artifacts. SQLite in WAL mode, so every change is one small transaction
+    rather than a rewritten file. Only use it from the thread that opened it
+    """
+    def __init__(self, database_path) -> None:
+        self.database_path = database_path
+        self._connection = sqlite3.connect(database_path)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        # WAL stays consistent after a crash at NORMAL, the last commits may be lost on power failure
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("PRAGMA foreign_keys=ON")
+        self._Migrate()
+
+    def _Migrate(self):
+        version = self._connection.execute("PRAGMA user_version").fetchone()[0]
+        if version == 0:
+            # the first schema, created as-is by the first version with a database
+            self._connection.executescript(_SCHEMA)
+        for migration in _MIGRATIONS[version:]:
+            version += 1
+            # executescript commits as it goes, so the whole migration is one explicit transaction
+            self._connection.executescript(f"BEGIN; {migration} PRAGMA user_version = {version}; COMMIT;")
+
+    def Close(self):
+        self._connection.close()
+
+    def IsEmpty(self) -> bool:
+        """
+        Whether the project has never been stored, so its directory needs importing
+        """
+        return self._connection.execute("SELECT 1 FROM project LIMIT 1").fetchone() is None
+
+    def GetProjectValues(self) -> dict:
+        return {key: json.loads(value) for key, value in self._connection.execute("SELECT key, value FROM project")}
+
+    def SetProjectValues(self, values: dict):
+        with self._connection:
+            self._connection.executemany("INSERT OR REPLACE INTO project (key, value) VALUES (?, ?)",
+                                         [(key, json.dumps(value)) for key, value in values.items()])
+
+    def GetMedia(self, video_identity):
+        """
+        The stored media info JSON if it was probed from this exact video, otherwise None
+        """
+        row = self._connection.execute("SELECT info FROM media WHERE video_path = ? AND size = ? AND mtime_ns = ?",
+                                       list(video_identity)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def PutMedia(self, video_identity, info_json):
+        with self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO media (video_path, size, mtime_ns, info) VALUES (?, ?, ?, ?)",
+                                     [*video_identity, json.dumps(info_json)])
+
+    def PutTrackSet(self, bitmap, audio_identity):
+        """
+        Record that the tracks in bitmap were merged into audio with the given [size, mtime_ns]
+        """
+        with self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO track_sets (bitmap, audio_size, audio_mtime_ns) VALUES (?, ?, ?)",
+                                     [bitmap, *audio_identity])
+
+    def IsTrackSetMerged(self, bitmap) -> bool:
+        return self._connection.execute("SELECT 1 FROM track_sets WHERE bitmap = ?", [bitmap]).fetchone() is not None
+
+    def GetTranscript(self, name):
+        """
+        (id, mtime_ns of the SRT file it was read from) of a transcript, or None
+        """
+        return self._connection.execute("SELECT id, mtime_ns FROM transcripts WHERE name = ?", [name]).fetchone()
+
+    def PutTranscript(self, name, mtime_ns, primitive_srts) -> int:
+        """
+        Store or replace the segments of a transcript, keeping its id, source and edit sets. A new
+        transcript starts with an empty default edit set
+        """
+        with self._connection:
+            self._connection.execute("INSERT INTO transcripts (name, mtime_ns) VALUES (?, ?) "
+                                     "ON CONFLICT (name) DO UPDATE SET mtime_ns = excluded.mtime_ns", [name, mtime_ns])
+            transcript_id = self.GetTranscript(name)[0]
+            self._connection.execute("DELETE FROM segments WHERE transcript_id = ?", [transcript_id])
+            self._connection.executemany("INSERT INTO segments (transcript_id, row, srt_id, start_time, end_time, text) VALUES (?, ?, ?, ?, ?, ?)",
+                                         [(transcript_id, row, *srt) for row, srt in enumerate(primitive_srts)])
+            if self.GetActiveEditSet(transcript_id) is None:
+                edit_set_id = self._connection.execute("INSERT INTO edit_sets (transcript_id, name) VALUES (?, ?)",
+                                                       [transcript_id, DEFAULT_EDIT_SET_NAME]).lastrowid
+                self._connection.execute("UPDATE transcripts SET edit_set_id = ? WHERE id = ?", [edit_set_id, transcript_id])
+        return transcript_id
+
+    def SetTranscriptSource(self, name, bitmap, audio_identity):
+        """
+        Record which merged audio a transcript was made from
+        """
+        with self._connection:
+            self._connection.execute("UPDATE transcripts SET bitmap = ?, audio_size = ?, audio_mtime_ns = ? WHERE name = ?",
+                                     [bitmap, *audio_identity, name])
+
+    def IsTranscriptCurrent(self, name, bitmap) -> bool:
+        """
+        Whether the transcript exists and its track set has not been merged again since. Transcripts
+        with no recorded source are trusted
+        """
+        row = self._connection.execute("SELECT t.audio_size IS NULL OR (t.audio_size = s.audio_size AND t.audio_mtime_ns = s.audio_mtime_ns) "
+                                       "FROM transcripts t LEFT JOIN track_sets s ON s.bitmap = ? WHERE t.name = ?", [bitmap, name]).fetchone()
+        return row is not None and bool(row[0])
+
+    def GetSegments(self, transcript_id) -> list:
+        return self._connection.execute("SELECT srt_id, start_time, end_time, text FROM segments WHERE transcript_id = ? ORDER BY row",
+                                        [transcript_id]).fetchall()
+
+    def GetEditSets(self, transcript_id) -> list:
+        """
+        (id, name) of every edit set of a transcript, oldest first
+        """
+        return self._connection.execute("SELECT id, name FROM edit_sets WHERE transcript_id = ? ORDER BY id", [transcript_id]).fetchall()
+
+    def GetActiveEditSet(self, transcript_id):
+        row = self._connection.execute("SELECT edit_set_id FROM transcripts WHERE id = ?", [transcript_id]).fetchone()
+        return None if row is None else row[0]
+
+    def SetActiveEditSet(self, transcript_id, edit_set_id):
+        with self._connection:
+            self._connection.execute("UPDATE transcripts SET edit_set_id = ? WHERE id = ?", [edit_set_id, transcript_id])
+
+    def AddEditSet(self, transcript_id, name, copy_from=None) -> int:
+        """
+        Add an edit set, starting from the edits of copy_from if given. Only edited rows are copied.
+        Raises sqlite3.IntegrityError if the transcript already has a set of that name
+        """
+        with self._connection:
+            edit_set_id = self._connection.execute("INSERT INTO edit_sets (transcript_id, name) VALUES (?, ?)", [transcript_id, name]).lastrowid
+            if copy_from is not None:
+                self._connection.execute("INSERT INTO edits (edit_set_id, srt_id, edited_start_time, edited_end_time, enabled) "
+                                         "SELECT ?, srt_id, edited_start_time, edited_end_time, enabled FROM edits WHERE edit_set_id = ?",
+                                         [edit_set_id, copy_from])
+        return edit_set_id
+
+    def RemoveEditSet(self, edit_set_id):
+        with self._connection:
+            self._connection.execute("DELETE FROM edit_sets WHERE id = ?", [edit_set_id])
+
+    def GetEditSetDiff(self, from_edit_set_id, to_edit_set_id) -> dict:
+        """
+        {id: (edit in from, edit in to)} of every row edited differently in the two sets. Only rows
+        edited in either set are visited, so the cost follows the size of the edits, not the transcript
+        """
+        rows = self._connection.execute(
+            "SELECT a.srt_id, a.edited_start_time, a.edited_end_time, a.enabled, b.edited_start_time, b.edited_end_time, b.enabled "
+            "FROM edits a LEFT JOIN edits b ON b.edit_set_id = :to AND b.srt_id = a.srt_id WHERE a.edit_set_id = :from "
+            "UNION ALL "
+            "SELECT b.srt_id, NULL, NULL, NULL, b.edited_start_time, b.edited_end_time, b.enabled FROM edits b "
+            "WHERE b.edit_set_id = :to AND NOT EXISTS (SELECT 1 FROM edits a WHERE a.edit_set_id = :from AND a.srt_id = b.srt_id)",
+            {"from": from_edit_set_id, "to": to_edit_set_id})
+        diff = {}
+        for id, from_start, from_end, from_enabled, to_start, to_end, to_enabled in rows:
+            # a set without the row leaves it unedited
+            from_edit = _UNEDITED if from_enabled is None else (from_start, from_end, bool(from_enabled))
+            to_edit = _UNEDITED if to_enabled is None else (to_start, to_end, bool(to_enabled))
+            if from_edit != to_edit:
+                diff[id] = (from_edit, to_edit)
+        return diff
+
+    def GetEdits(self, edit_set_id) -> dict:
+        rows = self._connection.execute("SELECT srt_id, edited_start_time, edited_end_time, enabled FROM edits WHERE edit_set_id = ?",
+                                        [edit_set_id])
+        return {id: (start, end, bool(enabled)) for id, start, end, enabled in rows}
+
+    def _PutEdits(self, edit_set_id, edits: dict):
+        # unedited rows are deleted rather than stored, so the table only holds real edits
+        self._connection.executemany("DELETE FROM edits WHERE edit_set_id = ? AND srt_id = ?",
+                                     [(edit_set_id, id) for id, edit in edits.items() if tuple(edit) == _UNEDITED])
+        self._connection.executemany("INSERT OR REPLACE INTO edits (edit_set_id, srt_id, edited_start_time, edited_end_time, enabled) VALUES (?, ?, ?, ?, ?)",
+                                     [(edit_set_id, id, *edit) for id, edit in edits.items() if tuple(edit) != _UNEDITED])
+
+    def PutEdits(self, edit_set_id, edits: dict):
+        with self._connection:
+            self._PutEdits(edit_set_id, edits)
+
+    def ApplyEdits(self, edit_set_id, op, before: dict, after: dict):
+        """
+        Store the after state of an edit, undo or redo and log the operation, in one transaction
+        """
+        with self._connection:
+            self._PutEdits(edit_set_id, after)
+            self._connection.execute("INSERT INTO edit_log (edit_set_id, op, before, after) VALUES (?, ?, ?, ?)",
+                                     [edit_set_id, op, json.dumps(before), json.dumps(after)])
+
+    def AppendEditLog(self, edit_set_id, entries):
+        with self._connection:
+            self._connection.executemany("INSERT INTO edit_log (edit_set_id, op, before, after) VALUES (?, ?, ?, ?)",
+                                         [(edit_set_id, op, json.dumps(before), json.dumps(after)) for op, before, after in entries])
+
+    def ReplaceEditLog(self, edit_set_id, entries):
+        with self._connection:
+            self._connection.execute("DELETE FROM edit_log WHERE edit_set_id = ?", [edit_set_id])
+            self._connection.executemany("INSERT INTO edit_log (edit_set_id, op, before, after) VALUES (?, ?, ?, ?)",
+                                         [(edit_set_id, op, json.dumps(before), json.dumps(after)) for op, before, after in entries])
+
+    def GetEditLog(self, edit_set_id) -> list:
+        """
+        Logged operations as (op, before, after), oldest first
+        """
+        rows = self._connection.execute("SELECT op, before, after FROM edit_log WHERE edit_set_id = ? ORDER BY id", [edit_set_id])
+        return [(op, _ToEdits(before), _ToEdits(after)) for op, before, after in rows]
+
+    def GetEditLogLength(self, edit_set_id) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM edit_log WHERE edit_set_id = ?", [edit_set_id]).fetchone()[0]
+
+    def ClearEditLog(self, edit_set_id):
+        with self._connection:
+            self._connection.execute("DELETE FROM edit_log WHERE edit_set_id = ?", [edit_set_id])
+
+    def GetRenderArtifact(self, key):
+        """
+        (file name, size) of a cached render, or None
+        """
+        return self._connection.execute("SELECT file, size FROM render_artifacts WHERE key = ?", [key]).fetchone()
+
+    def PutRenderArtifact(self, key, file_name, size):
+        with self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO render_artifacts (key, file, size) VALUES (?, ?, ?)", [key, file_name, size])
+
+    def RemoveRenderArtifact(self, key):
+        with self._connection:
+            self._connection.execute("DELETE FROM render_artifacts WHERE key = ?", [key])
@@ -0,0 +1,91 @@
+import os
+import re
+import json
+
+from hyperedit_gui.media.media_info import MediaInfoCache, ReadMediaInfoFile
+from hyperedit_gui.media.transcript_cache import GetAudioIdentity, ReadTranscriptSource
+from hyperedit_gui.model.edit_journal import EditJournal, EditHistory
+from hyperedit_gui.render.render_cache import ReadRenderIndexFile
+
+_MERGE_FILE_PATTERN = re.compile(r"^(\d+)\.wav$")
+_SRT_FILE_PATTERN = re.compile(r"^(\d+)(-d\d+ms)?\.srt$")
+
+_KEY_EDITED_START_TIME = "edited_start_time"
+_KEY_EDITED_END_TIME = "edited_end_time"
+_KEY_ENABLED = "enabled"
+
+def ReadSrtEditsFile(srt_file_path) -> dict:
+    """
+    Edits exported next to an SRT as {id: (edited_start_time, edited_end_time, enabled)}
+    """
+    srt_edit_path = srt_file_path + ".json"
+    edits = {}
+    try:
+        with open(srt_edit_path, 'r') as srt_edit_file:
+            json_edits = json.load(srt_edit_file)
+            for key in json_edits.keys():
+                edits[key] = (json_edits[key].get(_KEY_EDITED_START_TIME, None), json_edits[key].get(_KEY_EDITED_END_TIME, None), json_edits[key].get(_KEY_ENABLED, True))
+    except FileNotFoundError:
+        pass
+    except json.decoder.JSONDecodeError:
+        print(f"Error decoding json in {srt_edit_path}")
+    return edits
+
+def ImportSrtFile(database, srt_file_path) -> int:
+    """
+    Store an SRT file as a transcript along with its exported edits and any journal written after
+    them. Returns the transcript id
+    """
+    from hyperedit.srt import parse_srt
+
+    name = os.path.basename(srt_file_path)
+    transcript_id = database.PutTranscript(name, os.stat(srt_file_path).st_mtime_ns, parse_srt(srt_file_path))
+
+    edits = ReadSrtEditsFile(srt_file_path)
+    entries = EditJournal(srt_file_path + ".journal").Read()
+    edits.update(EditHistory().Replay(entries))
+    edit_set_id = database.GetActiveEditSet(transcript_id)
+    database.PutEdits(edit_set_id, edits)
+    database.ClearEditLog(edit_set_id)
+    database.AppendEditLog(edit_set_id, entries)
+
+    match = _SRT_FILE_PATTERN.match(name)
+    audio_identity = ReadTranscriptSource(srt_file_path)
+    if match and match.group(2) is None and audio_identity is not None:
+        database.SetTranscriptSource(name, int(match.group(1)), audio_identity)
+    return transcript_id
+
+def ImportProjectDirectory(database, project_path):
+    """
+    Move a project from the files it kept in its directory into its database. The files are left
+    where they are, so older versions can still open the project
+    """
+    from hyperedit_gui.model.projects import ReadProject
+
+    project = ReadProject(project_path)
+    project_directory = os.path.dirname(project_path)
+    print(f"Importing project {project.name} into its database")
+
+    media_info = ReadMediaInfoFile(project_directory)
+    if media_info is not None:
+        MediaInfoCache(database).Put(media_info)
+
+    wav_directory = os.path.join(project_directory, "WAV")
+    if os.path.isdir(wav_directory):
+        for file_name in os.listdir(wav_directory):
+            match = _MERGE_FILE_PATTERN.match(file_name)
+            if match:
+                database.PutTrackSet(int(match.group(1)), GetAudioIdentity(os.path.join(wav_directory, file_name)))
+
+    srt_directory = os.path.join(project_directory, "SRT")
+    if os.path.isdir(srt_directory):
+        for file_name in sorted(os.listdir(srt_directory)):
+            if _SRT_FILE_PATTERN.match(file_name):
+                ImportSrtFile(database, os.path.join(srt_directory, file_name))
+
+    for key, (file_name, size) in ReadRenderIndexFile(os.path.join(project_directory, "CLIP")).items():
+        database.PutRenderArtifact(key, file_name, size)
+
+    # last, so an interrupted import is started again on the next load
+    project.database = database
+    project.Save()
@@ -4,6 +4,7 @@ import json
 from PySide6.QtWidgets import QInputDialog
 
 from hyperedit_gui.exception.exceptions import ProjectException
+from hyperedit_gui.model.project_database import ProjectDatabase, DATABASE_FILE_NAME
 
 _PROJECT_SINGLETON = None
 
@@ -12,19 +13,38 @@ _KEY_VIDEO_FILE="video_file"
 _KEY_TRACKS="tracks"
 
 class Project:
-    def __init__(self, name, project_path, video_path, tracks=None) -> None:
+    def __init__(self, name, project_path, video_path, tracks=None, database=None) -> None:
         self.name = name
         self.project_path = project_path
         self.video_path = video_path
         self.tracks = tracks
+        self.database = database
+
+    def to_json(self):
+        config = {}
+        config[_KEY_PROJECT_NAME] = self.name
+        config[_KEY_VIDEO_FILE] = self.video_path
+        config[_KEY_TRACKS] = self.tracks
+        return config
 
     def Save(self):
+        self.database.SetProjectValues(self.to_json())
+
+    def ExportJson(self):
+        """
+        Write the project file, which identifies the project in recent projects and to hyperedit
+        """
         with open(self.project_path, "w") as project_file:
-            config = {}
-            config[_KEY_PROJECT_NAME] = self.name
-            config[_KEY_VIDEO_FILE] = self.video_path
-            config[_KEY_TRACKS] = self.tracks
-            json.dump(config, project_file, indent=4)
+            json.dump(self.to_json(), project_file, indent=4)
+
+def _OpenDatabase(project_path) -> ProjectDatabase:
+    return ProjectDatabase(os.path.join(os.path.dirname(project_path), DATABASE_FILE_NAME))
+
+def _CloseCurrentProject():
+    global _PROJECT_SINGLETON
+    if _PROJECT_SINGLETON is not None and _PROJECT_SINGLETON.database is not None:
+        _PROJECT_SINGLETON.database.Close()
+    _PROJECT_SINGLETON = None
 
 def GetCurrentProject() -> Project:
     global _PROJECT_SINGLETON
@@ -57,7 +77,9 @@ def CreateProject(video_file_path):
 
     project_file_path = os.path.join(project_folder, "project.json")
 
-    _PROJECT_SINGLETON = Project(project_name, project_file_path, video_file_path, None)
+    _CloseCurrentProject()
+    _PROJECT_SINGLETON = Project(project_name, project_file_path, video_file_path, None, _OpenDatabase(project_file_path))
+    _PROJECT_SINGLETON.ExportJson()
     _PROJECT_SINGLETON.Save()
 
 def ReadProject(project_path) -> Project:
@@ -73,14 +95,22 @@ def ReadProject(project_path) -> Project:
 
 def LoadProject(project_path):
     """
-    Load project into singleton instance
+    Load project into singleton instance from its database, importing the project directory the
+    first time a project from before the database is opened
     """
     global _PROJECT_SINGLETON
-    _PROJECT_SINGLETON = None
+    _CloseCurrentProject()
 
-    try:
-        with open(project_path, 'r') as project_file:
-            project_json = json.load(project_file)
-            _PROJECT_SINGLETON = Project(project_json.get(_KEY_PROJECT_NAME, "<NO NAME>"), project_path, project_json.get(_KEY_VIDEO_FILE, "missing"), project_json.get(_KEY_TRACKS, None))
-    except (json.decoder.JSONDecodeError, FileNotFoundError) as e:
+    if not os.path.exists(project_path):
         raise ProjectException(f"Project file not found: {project_path}")
+    database = _OpenDatabase(project_path)
+    if database.IsEmpty():
+        from hyperedit_gui.model.project_import import ImportProjectDirectory
+
+        try:
+            ImportProjectDirectory(database, project_path)
+        except Exception:
+            database.Close()
+            raise
+    project_json = database.GetProjectValues()
+    _PROJECT_SINGLETON = Project(project_json.get(_KEY_PROJECT_NAME, "<NO NAME>"), project_path, project_json.get(_KEY_VIDEO_FILE, "missing"), project_json.get(_KEY_TRACKS, None), database)
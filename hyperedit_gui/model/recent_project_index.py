@@ -0,0 +1,130 @@
+import os
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from appdirs import user_cache_dir
+
+from hyperedit_gui.exception.exceptions import ProjectException
+from hyperedit_gui.model.projects import ReadProject
+
+_INDEX_FILE_NAME = "recent_projects.json"
+
+_KEY_NAME = "name"
+_KEY_VIDEO_FILE = "video_file"
+_KEY_STATUS = "status"
+_KEY_MTIME = "mtime"
+
+RECENT_PROJECT_PENDING = "pending"
+RECENT_PROJECT_OK = "ok"
+RECENT_PROJECT_MISSING = "missing"
+RECENT_PROJECT_INVALID = "invalid"
+RECENT_PROJECT_VIDEO_MISSING = "video missing"
+
+def GetRecentProjectIndexPath() -> str:
+    return os.path.join(user_cache_dir("hyperedit_gui"), _INDEX_FILE_NAME)
+
+class RecentProjectEntry:
+    """
+    What the project list shows for a recent project, and the modification time of the project
+    file it was read from
+    """
+    def __init__(self, project_path, name=None, video_path=None, status=RECENT_PROJECT_PENDING, mtime=None) -> None:
+        self.project_path = project_path
+        self.name = name
+        self.video_path = video_path
+        self.status = status
+        self.mtime = mtime
+
+    def IsOpenable(self) -> bool:
+        return self.status in (RECENT_PROJECT_OK, RECENT_PROJECT_VIDEO_MISSING)
+
+    def to_json(self):
+        return {
+            _KEY_NAME: self.name,
+            _KEY_VIDEO_FILE: self.video_path,
+            _KEY_STATUS: self.status,
+            _KEY_MTIME: self.mtime,
+        }
+
+def _FromJson(project_path, entry_json) -> RecentProjectEntry:
+    return RecentProjectEntry(project_path, entry_json[_KEY_NAME], entry_json[_KEY_VIDEO_FILE], entry_json[_KEY_STATUS], entry_json[_KEY_MTIME])
+
+def ReadRecentProjectEntry(project_path, cached=None) -> RecentProjectEntry:
+    """
+    Stat the project file and parse it only if it changed since cached was read. Never raises, a
+    project that cannot be read gets a status saying why
+    """
+    try:
+        mtime = os.stat(project_path).st_mtime_ns
+    except OSError:
+        if cached is None:
+            return RecentProjectEntry(project_path, status=RECENT_PROJECT_MISSING)
+        return RecentProjectEntry(project_path, cached.name, cached.video_path, RECENT_PROJECT_MISSING)
+    if cached is not None and cached.mtime == mtime and cached.status != RECENT_PROJECT_INVALID:
+        name, video_path = cached.name, cached.video_path
+    else:
+        try:
+            project = ReadProject(project_path)
+        except (ProjectException, OSError):
+            return RecentProjectEntry(project_path, status=RECENT_PROJECT_INVALID, mtime=mtime)
+        name, video_path = project.name, project.video_path
+    status = RECENT_PROJECT_OK if os.path.exists(video_path) else RECENT_PROJECT_VIDEO_MISSING
+    return RecentProjectEntry(project_path, name, video_path, status, mtime)
+
+def ReadRecentProjectEntries(job, entries) -> list:
+    """
+    Re-read every entry at once, so one project on a slow or sleeping disk does not hold up the rest.
+    Each entry is emitted through job.EmitPartial as soon as it resolves
+    """
+    if not entries:
+        return []
+    resolved = []
+    executor = ThreadPoolExecutor(max_workers=len(entries))
+    try:
+        futures = [executor.submit(ReadRecentProjectEntry, entry.project_path, entry) for entry in entries]
+        for done, future in enumerate(as_completed(futures), 1):
+            entry = future.result()
+            resolved.append(entry)
+            job.EmitPartial(entry)
+            job.SetProgress(done / len(entries), f"Read {done} of {len(entries)} recent projects")
+    finally:
+        # a cancelled job must not wait on a disk that is still waking up
+        executor.shutdown(wait=False, cancel_futures=True)
+    return resolved
+
+class RecentProjectIndex:
+    """
+    Entries read from recent projects, kept between runs so the list can be shown before any
+    project file is touched
+    """
+    def __init__(self, index_path) -> None:
+        self.index_path = index_path
+        self._entries = {}
+        try:
+            with open(index_path, 'r') as index_file:
+                index_json = json.load(index_file)
+            self._entries = {project_path: _FromJson(project_path, entry_json) for project_path, entry_json in index_json.items()}
+        except (OSError, json.decoder.JSONDecodeError, KeyError, AttributeError):
+            pass
+
+    def Get(self, project_path) -> RecentProjectEntry:
+        """
+        The cached entry, or a pending one for a project that has never been read
+        """
+        entry = self._entries.get(project_path)
+        if entry is None:
+            return RecentProjectEntry(project_path)
+        return entry
+
+    def Put(self, entry):
+        self._entries[entry.project_path] = entry
+
+    def Save(self, project_paths):
+        """
+        Write the entries of project_paths, dropping those of projects no longer in the list
+        """
+        index_json = {project_path: self._entries[project_path].to_json() for project_path in project_paths if project_path in self._entries}
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        with open(self.index_path + ".tmp", 'w') as index_file:
+            json.dump(index_json, index_file)
+        os.replace(self.index_path + ".tmp", self.index_path)
@@ -1,11 +1,12 @@
 from hyperedit_gui.model.config import GetConfig
-from hyperedit_gui.model.projects import ReadProject
+from hyperedit_gui.model.recent_project_index import RecentProjectIndex, GetRecentProjectIndexPath
 
 _MAX_PROJECTS = 10
 
 class RecentProjects:
     def __init__(self):
         self._projects = GetConfig().GetRecentProjectPaths()
+        self._index = RecentProjectIndex(GetRecentProjectIndexPath())
         self.observers = []
 
     def AddObserver(self, observer):
@@ -30,10 +31,17 @@ class RecentProjects:
     def remove_project(self, project):
         self._projects.remove(project)
 
-    def ReadProjects(self):
-        return [ 
-            ReadProject(project) for project in self._projects
-        ]
+    def GetEntries(self):
+        """
+        Cached entries for every recent project, without touching the project files
+        """
+        return [self._index.Get(project) for project in self._projects]
+
+    def PutEntry(self, entry):
+        self._index.Put(entry)
+
+    def SaveIndex(self):
+        self._index.Save(self._projects)
     
     def AddRecentProject(self, project):
         rs = self._projects.add_project(project)
@@ -1,94 +1,298 @@
+import os
 import json
 from typing import List
-from hyperedit.srt import parse_srt
+
+from hyperedit_gui.model.edit_journal import EditHistory, OP_EDIT, OP_UNDO, OP_REDO
+
+# SrtStore needs NumPy and parsing needs hyperedit, neither is imported until SRTs are first used
 
 _SRTS_SINGLETON = None
+_SRT_FILE_PATH = None
+_DATABASE_SINGLETON = None
+_TRANSCRIPT_ID = None
+_EDIT_SET_ID = None
+_HISTORY_SINGLETON = EditHistory()
+# undo and redo of every edit set switched to since the SRTs were loaded, by edit set id
+_HISTORIES = {}
 
-_KEY_EDITED_START_TIME = "edited_start_time"
-_KEY_EDITED_END_TIME = "edited_end_time"
-_KEY_ENABLED = "enabled"
-
-class Srt:
-    def __init__(self, entry) -> None:
-        self.id = entry[0]
-        self.original_start_time = entry[1]
-        self.original_end_time = entry[2]
-        self.text = entry[3]
-        # TODO: load these from srt.json
-        self.edited_start_time = None
-        self.edited_end_time = None
-        self.enabled = True
-
-    def to_primitive(self):
-        if self.edited_start_time:
-            start_time = self.edited_start_time
-        else:
-            start_time = self.original_start_time
-
-        if self.edited_end_time:
-            end_time = self.edited_end_time
-        else:
-            end_time = self.original_end_time
-
-        return (self.id, start_time, end_time, self.text)
-    
-    def to_edit_json(self):
-        json = {}
-        json[_KEY_EDITED_START_TIME] = self.edited_start_time
-        json[_KEY_EDITED_END_TIME] = self.edited_end_time
-        json[_KEY_ENABLED] = self.enabled
-        return json
-
-def _LoadSrtEdits(srt_file_path) -> dict:
-    srt_edit_path = srt_file_path + ".json"
-    edits = {}
+# once the edit log holds this many entries it is rewritten to the newest half of its undo and redo,
+# the edits table always has the latest state
+_COMPACT_THRESHOLD = 1000
+
+def SetSrtDatabase(database):
+    """
+    Use the current project's database for transcripts and edits. The loaded SRTs belong to the
+    previous database, so they are cleared until the project's are loaded
+    """
+    global _DATABASE_SINGLETON
+    _DATABASE_SINGLETON = database
+    ClearSrts()
+
+def _GetDatabase():
+    global _DATABASE_SINGLETON
+    if _DATABASE_SINGLETON is None:
+        from hyperedit_gui.model.project_database import ProjectDatabase
+
+        # no project open, edits last as long as the SRTs are loaded
+        _DATABASE_SINGLETON = ProjectDatabase(":memory:")
+    return _DATABASE_SINGLETON
+
+def _GetTranscriptId(database, srt_file_path) -> int:
+    """
+    The id of the SRT file's transcript, importing the file if it is new and re-reading its
+    segments if it has been written since
+    """
+    name = os.path.basename(srt_file_path)
+    transcript = database.GetTranscript(name)
+    if transcript is None:
+        from hyperedit_gui.model.project_import import ImportSrtFile
+
+        return ImportSrtFile(database, srt_file_path)
+    transcript_id, mtime_ns = transcript
     try:
-        # read edits # TODO separate named edits that can be saved/loaded separately
-        with open(srt_edit_path, 'r') as srt_edit_file:
-            json_edits = json.load(srt_edit_file)
-            for key in json_edits.keys():
-                edits[key] = (json_edits[key].get(_KEY_EDITED_START_TIME, None), json_edits[key].get(_KEY_EDITED_END_TIME, None), json_edits[key].get(_KEY_ENABLED, True))
+        current_mtime_ns = os.stat(srt_file_path).st_mtime_ns
     except FileNotFoundError:
-        # write an empty edits file
-        with open(srt_edit_path, 'w') as srt_edit_file:
-            srt_edit_file.write("{}")
-    except json.decoder.JSONDecodeError:
-        print(f"Error decoding json in {srt_edit_path}")
-    return edits
+        return transcript_id
+    if current_mtime_ns != mtime_ns:
+        from hyperedit.srt import parse_srt
 
-def LoadSrts(srt_file_path) -> List[Srt]:
+        database.PutTranscript(name, current_mtime_ns, parse_srt(srt_file_path))
+    return transcript_id
 
-    global _SRTS_SINGLETON
+def _LoadHistory(database, edit_set_id) -> EditHistory:
+    """
+    Undo and redo of an edit set. The log only rebuilds them, the edits table already holds its result.
+    A log that reached _COMPACT_THRESHOLD is rewritten to the newest half of them
+    """
+    history = EditHistory()
+    entries = database.GetEditLog(edit_set_id)
+    history.Replay(entries)
+    if len(entries) >= _COMPACT_THRESHOLD:
+        database.ReplaceEditLog(edit_set_id, history.GetEntries(_COMPACT_THRESHOLD // 2))
+    return history
+
+def LoadSrts(srt_file_path):
+    from hyperedit_gui.model.srt_store import SrtStore
 
-    # parse SRTs from SRT file
-    primitive_srts = parse_srt(srt_file_path)
-    srts = []
-    for srt in primitive_srts:
-        srts.append(Srt(srt))
+    global _SRTS_SINGLETON
+    global _SRT_FILE_PATH
+    global _TRANSCRIPT_ID
+    global _EDIT_SET_ID
+    global _HISTORY_SINGLETON
+    global _HISTORIES
 
-    # parse edits from edits file
-    edits = _LoadSrtEdits(srt_file_path)
+    database = _GetDatabase()
+    transcript_id = _GetTranscriptId(database, srt_file_path)
+    edit_set_id = database.GetActiveEditSet(transcript_id)
+    srts = SrtStore(database.GetSegments(transcript_id))
 
-    # for any present edits, enhance the "Srt"
-    for srt in srts:
-        edit = edits.get(srt.id, (None, None, True))
-        srt.edited_start_time = edit[0]
-        srt.edited_end_time = edit[1]
-        srt.enabled = edit[2]
+    # only edited SRTs are stored, every other row keeps the store's defaults
+    for id, edit in database.GetEdits(edit_set_id).items():
+        if srts.HasId(id):
+            srts.SetEdit(id, edit)
+    # index the texts now rather than on the first search keystroke
+    srts.GetSearchIndex()
 
     _SRTS_SINGLETON = srts
+    _SRT_FILE_PATH = srt_file_path
+    _TRANSCRIPT_ID = transcript_id
+    _EDIT_SET_ID = edit_set_id
+    _HISTORY_SINGLETON = _LoadHistory(database, edit_set_id)
+    _HISTORIES = {edit_set_id: _HISTORY_SINGLETON}
+
+def ClearSrts():
+    """
+    Replace the loaded SRTs with an empty list that is not a transcript, so it cannot be edited
+    """
+    from hyperedit_gui.model.srt_store import SrtStore
+
+    global _SRTS_SINGLETON
+    global _SRT_FILE_PATH
+    global _TRANSCRIPT_ID
+    global _EDIT_SET_ID
+    global _HISTORY_SINGLETON
+    global _HISTORIES
+
+    _SRTS_SINGLETON = SrtStore()
+    _SRT_FILE_PATH = None
+    _TRANSCRIPT_ID = None
+    _EDIT_SET_ID = None
+    _HISTORY_SINGLETON = EditHistory()
+    _HISTORIES = {}
 
-def SaveEdits(srt_file_path):
-    # overwrites?
+def BeginStreamedSrts():
+    """
+    Replace the loaded SRTs with an empty list that a running transcription or a preview appends to.
+    Streamed SRTs are not stored as a transcript, so they cannot be edited until a file is loaded.
+    Returns the new store, which a stream's later SRTs can be checked against before appending
+    """
+    ClearSrts()
+    return _SRTS_SINGLETON
+
+def AppendStreamedSrts(primitive_srts):
+    GetSrts().Append(primitive_srts)
+
+def IsSrtsEditable():
+    return _TRANSCRIPT_ID is not None
+
+def GetLoadedSrtFilePath():
+    """
+    The SRT file the loaded SRTs were read from, None while they are streamed
+    """
+    return _SRT_FILE_PATH
+
+def ExportEdits():
+    """
+    Write the edits next to the SRT file as JSON, the format hyperedit reads
+    """
+    if _SRT_FILE_PATH is None:
+        return
     edits = {}
-    with open(srt_file_path + ".json", 'w') as srt_edit_file:
-        for srt in GetSrts():
-            edits[srt.id] = srt.to_edit_json()
+    srts = GetSrts()
+    for row in srts.GetEditedRows():
+        srt = srts[int(row)]
+        edits[srt.id] = srt.to_edit_json()
+    srt_edit_path = _SRT_FILE_PATH + ".json"
+    with open(srt_edit_path + ".tmp", 'w') as srt_edit_file:
         srt_edit_file.write(json.dumps(edits))
+    os.replace(srt_edit_path + ".tmp", srt_edit_path)
+
+def _ApplyEdits(edits: dict):
+    srts = GetSrts()
+    for id, edit in edits.items():
+        if srts.HasId(id):
+            srts.SetEdit(id, edit)
 
-def GetSrts() -> List[Srt]:
+def _StoreEdits(op, before, after):
+    database = _GetDatabase()
+    database.ApplyEdits(_EDIT_SET_ID, op, before, after)
+    if database.GetEditLogLength(_EDIT_SET_ID) >= _COMPACT_THRESHOLD:
+        # rebuilt from the log, the history has not taken this operation yet
+        _LoadHistory(database, _EDIT_SET_ID)
+
+def EditSrts(edits: dict):
+    """
+    Apply edits of {id: (edited_start_time, edited_end_time, enabled)} as one undoable operation
+    """
+    if not IsSrtsEditable():
+        print("SRTs are still being transcribed, ignoring edits")
+        return
+    srts = GetSrts()
+    edits = {id: edit for id, edit in edits.items() if srts.GetById(id).to_edit() != edit}
+    if not edits:
+        return
+    before = {id: srts.GetById(id).to_edit() for id in edits}
+    # stored first, so a failed write leaves the SRTs and their history as they were
+    _StoreEdits(OP_EDIT, before, edits)
+    _ApplyEdits(edits)
+    _HISTORY_SINGLETON.Push(before, edits)
+
+def UndoEdit() -> List[str]:
+    """
+    Undo the last edit, returning the ids of the rows it changed
+    """
+    edit = _HISTORY_SINGLETON.PeekUndo()
+    if edit is None:
+        return []
+    before, after = edit
+    _StoreEdits(OP_UNDO, after, before)
+    _HISTORY_SINGLETON.Undo()
+    _ApplyEdits(before)
+    return list(before.keys())
+
+def RedoEdit() -> List[str]:
+    edit = _HISTORY_SINGLETON.PeekRedo()
+    if edit is None:
+        return []
+    before, after = edit
+    _StoreEdits(OP_REDO, before, after)
+    _HISTORY_SINGLETON.Redo()
+    _ApplyEdits(after)
+    return list(after.keys())
+
+def GetEditSetNames() -> List[str]:
+    if not IsSrtsEditable():
+        return []
+    return [name for _, name in _GetDatabase().GetEditSets(_TRANSCRIPT_ID)]
+
+def GetActiveEditSetName():
+    if not IsSrtsEditable():
+        return None
+    return dict(_GetDatabase().GetEditSets(_TRANSCRIPT_ID)).get(_EDIT_SET_ID)
+
+def _GetEditSetId(name):
+    for edit_set_id, edit_set_name in _GetDatabase().GetEditSets(_TRANSCRIPT_ID):
+        if edit_set_name == name:
+            return edit_set_id
+    return None
+
+def AddEditSet(name) -> bool:
+    """
+    Add an edit set starting as a copy of the active one, without switching to it
+    """
+    if not IsSrtsEditable() or _GetEditSetId(name) is not None:
+        print(f"Can't add edit set {name}")
+        return False
+    _GetDatabase().AddEditSet(_TRANSCRIPT_ID, name, copy_from=_EDIT_SET_ID)
+    return True
+
+def SwitchEditSet(name) -> List[str]:
+    """
+    Make another edit set active by applying only the rows it edits differently, returning their ids
+    """
+    global _EDIT_SET_ID
+    global _HISTORY_SINGLETON
+
+    edit_set_id = _GetEditSetId(name) if IsSrtsEditable() else None
+    if edit_set_id is None or edit_set_id == _EDIT_SET_ID:
+        return []
+    database = _GetDatabase()
+    diff = database.GetEditSetDiff(_EDIT_SET_ID, edit_set_id)
+    _ApplyEdits({id: to_edit for id, (_, to_edit) in diff.items()})
+    database.SetActiveEditSet(_TRANSCRIPT_ID, edit_set_id)
+    _EDIT_SET_ID = edit_set_id
+    if edit_set_id not in _HISTORIES:
+        _HISTORIES[edit_set_id] = _LoadHistory(database, edit_set_id)
+    _HISTORY_SINGLETON = _HISTORIES[edit_set_id]
+    return list(diff.keys())
+
+def RemoveEditSet(name) -> bool:
+    """
+    Remove an edit set other than the active one
+    """
+    edit_set_id = _GetEditSetId(name) if IsSrtsEditable() else None
+    if edit_set_id is None or edit_set_id == _EDIT_SET_ID:
+        print(f"Can't remove edit set {name}")
+        return False
+    _GetDatabase().RemoveEditSet(edit_set_id)
+    _HISTORIES.pop(edit_set_id, None)
+    return True
+
+def DiffEditSet(name):
+    """
+    How the named edit set differs from the active one, or None if there is no such set
+    """
+    from hyperedit_gui.model.edit_set_diff import EditSetDiff
+
+    edit_set_id = _GetEditSetId(name) if IsSrtsEditable() else None
+    if edit_set_id is None:
+        return None
+    return EditSetDiff(_GetDatabase().GetEditSetDiff(_EDIT_SET_ID, edit_set_id))
+
+def GetSrts():
+    """
+    The loaded SrtStore, or an empty one if none has been loaded
+    """
     global _SRTS_SINGLETON
     if _SRTS_SINGLETON is None:
+        from hyperedit_gui.model.srt_store import SrtStore
+
         print("SRTs have not been loaded yet.")
-        return []
-    return _SRTS_SINGLETON
\ No newline at end of file
+        return SrtStore()
+    return _SRTS_SINGLETON
+
+def GetSrtById(id):
+    """
+    SRT ids are not guaranteed to be contiguous, so look them up rather than indexing GetSrts()
+    """
+    return GetSrts().GetById(str(id))
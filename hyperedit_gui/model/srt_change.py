@@ -0,0 +1,62 @@
+SRT_CHANGE_REPLACED = "replaced"
+SRT_CHANGE_APPENDED = "appended"
+SRT_CHANGE_ENABLED = "enabled"
+SRT_CHANGE_TIMES = "times"
+
+class SrtChange:
+    """
+    Rows first to last inclusive changed in the way kind describes. A replaced change covers the
+    whole list, so it has no rows
+    """
+    __slots__ = ("kind", "first", "last")
+
+    def __init__(self, kind, first=None, last=None) -> None:
+        self.kind = kind
+        self.first = first
+        self.last = last
+
+    def __eq__(self, other):
+        return isinstance(other, SrtChange) and (self.kind, self.first, self.last) == (other.kind, other.first, other.last)
+
+    def __repr__(self):
+        return f"SrtChange({self.kind!r}, {self.first!r}, {self.last!r})"
+
+def GetRowRanges(rows) -> list:
+    """
+    (first, last) of every run of consecutive rows
+    """
+    ranges = []
+    for row in sorted(set(rows)):
+        if ranges and row == ranges[-1][1] + 1:
+            ranges[-1][1] = row
+        else:
+            ranges.append([row, row])
+    return [tuple(row_range) for row_range in ranges]
+
+def MergeRowRanges(ranges) -> list:
+    """
+    Merge overlapping or touching (first, last) ranges
+    """
+    merged = []
+    for first, last in sorted(ranges):
+        if merged and first <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], last)
+        else:
+            merged.append([first, last])
+    return [tuple(row_range) for row_range in merged]
+
+def CoalesceSrtChanges(changes) -> list:
+    """
+    Fold changes into as few as possible: a replace swallows everything, appends become one range and
+    overlapping or touching ranges of the same kind are merged
+    """
+    if any(change.kind == SRT_CHANGE_REPLACED for change in changes):
+        return [SrtChange(SRT_CHANGE_REPLACED)]
+    coalesced = []
+    appended = [change for change in changes if change.kind == SRT_CHANGE_APPENDED]
+    if appended:
+        coalesced.append(SrtChange(SRT_CHANGE_APPENDED, min(change.first for change in appended), max(change.last for change in appended)))
+    for kind in (SRT_CHANGE_ENABLED, SRT_CHANGE_TIMES):
+        ranges = MergeRowRanges((change.first, change.last) for change in changes if change.kind == kind)
+        coalesced += [SrtChange(kind, first, last) for first, last in ranges]
+    return coalesced
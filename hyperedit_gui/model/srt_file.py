@@ -0,0 +1,11 @@
+def FormatSrtTime(seconds) -> str:
+    milliseconds = int(round(seconds * 1000))
+    hours, milliseconds = divmod(milliseconds, 3600000)
+    minutes, milliseconds = divmod(milliseconds, 60000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02}:{minutes:02}:{seconds:02},{milliseconds:03}"
+
+def WriteSrtFile(srt_path, primitive_srts):
+    with open(srt_path, 'w') as srt_file:
+        for id, start, end, text in primitive_srts:
+            srt_file.write(f"{id}\n{FormatSrtTime(start)} --> {FormatSrtTime(end)}\n{text}\n\n")
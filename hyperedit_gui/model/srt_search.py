@@ -0,0 +1,163 @@
+import re
+from bisect import bisect_left
+
+# words, keeping contractions like don't together
+_WORD_PATTERN = re.compile(r"\w+(?:'\w+)*")
+# a quoted phrase, left open while it is being typed, or a bare word
+_QUERY_PATTERN = re.compile(r'"([^"]*)"?|([^\s"]+)')
+
+_PREFIX_SUFFIX = "*"
+_FUZZY_SUFFIX = "~"
+# shorter words are only matched exactly when fuzzy, one edit away is a different word
+_FUZZY_MIN_LENGTH = 4
+
+def Tokenize(text) -> list:
+    return _WORD_PATTERN.findall(text.casefold())
+
+def _GetDeletes(term):
+    return {term[:i] + term[i + 1:] for i in range(len(term))}
+
+def _IsOneEditAway(a, b) -> bool:
+    """
+    Whether a becomes b by inserting, removing or replacing one letter or swapping two adjacent ones
+    """
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) == len(b):
+        diffs = [i for i in range(len(a)) if a[i] != b[i]]
+        if len(diffs) == 2:
+            first, second = diffs
+            return second == first + 1 and a[first] == b[second] and a[second] == b[first]
+        return len(diffs) <= 1
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    return a[i:] == b[i + 1:]
+
+class SrtSearchIndex:
+    """
+    Inverted index over SRT texts. Every term maps to the rows it appears in and its positions in
+    each, so word, prefix, fuzzy and phrase queries only visit the rows that match. Built once when
+    the SRTs are loaded and appended to as rows are
+    """
+    def __init__(self, texts=()) -> None:
+        # term: {row: [positions]}
+        self._postings = {}
+        self._row_count = 0
+        # the vocabulary in order for prefix queries, sorted again only after new terms
+        self._sorted_terms = None
+        # every term with one letter removed: the terms it came from, built on the first fuzzy query
+        self._deletes = None
+        self.Append(texts)
+
+    def __len__(self):
+        return self._row_count
+
+    def Append(self, texts):
+        """
+        Index the texts of rows added after the last ones indexed
+        """
+        new_terms = []
+        for text in texts:
+            row = self._row_count
+            for position, term in enumerate(Tokenize(text)):
+                rows = self._postings.get(term)
+                if rows is None:
+                    rows = self._postings[term] = {}
+                    new_terms.append(term)
+                rows.setdefault(row, []).append(position)
+            self._row_count += 1
+        if new_terms:
+            self._sorted_terms = None
+            if self._deletes is not None:
+                for term in new_terms:
+                    self._AddDeletes(term)
+
+    def _AddDeletes(self, term):
+        for variant in _GetDeletes(term):
+            self._deletes.setdefault(variant, []).append(term)
+
+    def _MatchTerm(self, term) -> set:
+        return set(self._postings.get(term, ()))
+
+    def _MatchPrefix(self, prefix) -> set:
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self._postings)
+        rows = set()
+        for i in range(bisect_left(self._sorted_terms, prefix), len(self._sorted_terms)):
+            term = self._sorted_terms[i]
+            if not term.startswith(prefix):
+                break
+            rows.update(self._postings[term])
+        return rows
+
+    def _MatchFuzzy(self, term) -> set:
+        if len(term) < _FUZZY_MIN_LENGTH:
+            return self._MatchTerm(term)
+        if self._deletes is None:
+            self._deletes = {}
+            for indexed_term in self._postings:
+                self._AddDeletes(indexed_term)
+        # terms within one edit share the term or one of its deletes, either as a term or a delete
+        candidates = set()
+        for variant in _GetDeletes(term) | {term}:
+            if variant in self._postings:
+                candidates.add(variant)
+            candidates.update(self._deletes.get(variant, ()))
+        rows = set()
+        for candidate in candidates:
+            if _IsOneEditAway(term, candidate):
+                rows.update(self._postings[candidate])
+        return rows
+
+    def _MatchPhrase(self, terms) -> set:
+        postings = [self._postings.get(term, {}) for term in terms]
+        rows = set(postings[0]).intersection(*postings[1:])
+        matched = set()
+        for row in rows:
+            following = [set(term_postings[row]) for term_postings in postings[1:]]
+            for position in postings[0][row]:
+                if all(position + offset in positions for offset, positions in enumerate(following, 1)):
+                    matched.add(row)
+                    break
+        return matched
+
+    def _MatchPart(self, part) -> set:
+        phrase, word = part
+        if phrase is not None:
+            terms = Tokenize(phrase)
+            if len(terms) > 1:
+                return self._MatchPhrase(terms)
+            return self._MatchTerm(terms[0]) if terms else None
+        terms = Tokenize(word)
+        if not terms:
+            return None
+        # every word in the part has to match, the suffix applies to the last one
+        rows = [self._MatchTerm(term) for term in terms[:-1]]
+        if word.endswith(_PREFIX_SUFFIX):
+            rows.append(self._MatchPrefix(terms[-1]))
+        elif word.endswith(_FUZZY_SUFFIX):
+            rows.append(self._MatchFuzzy(terms[-1]))
+        else:
+            rows.append(self._MatchTerm(terms[-1]))
+        return set.intersection(*rows)
+
+    def Search(self, query) -> list:
+        """
+        Rows matching every part of the query, in order. Parts are words, prefixes ending in *, fuzzy
+        words ending in ~ that also match one edit away, and "quoted phrases". A query with no words
+        matches every row
+        """
+        rows = None
+        for match in _QUERY_PATTERN.finditer(query):
+            part_rows = self._MatchPart(match.groups())
+            if part_rows is None:
+                continue
+            rows = part_rows if rows is None else rows & part_rows
+            if not rows:
+                return []
+        if rows is None:
+            return list(range(self._row_count))
+        return sorted(rows)
@@ -0,0 +1,265 @@
+import numpy as np
+
+from hyperedit_gui.model.srt_search import SrtSearchIndex
+
+_KEY_EDITED_START_TIME = "edited_start_time"
+_KEY_EDITED_END_TIME = "edited_end_time"
+_KEY_ENABLED = "enabled"
+
+def _ToColumn(time):
+    return np.nan if time is None else time
+
+def _FromColumn(time):
+    return None if np.isnan(time) else float(time)
+
+class Srt:
+    """
+    A view of one row of an SrtStore. Views hold no data of their own, so they are cheap to create on
+    demand and always reflect the latest edits
+    """
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store, row) -> None:
+        self._store = store
+        self._row = row
+
+    @property
+    def row(self):
+        return self._row
+
+    @property
+    def id(self):
+        return self._store.ids[self._row]
+
+    @property
+    def original_start_time(self):
+        return float(self._store.original_starts[self._row])
+
+    @property
+    def original_end_time(self):
+        return float(self._store.original_ends[self._row])
+
+    @property
+    def edited_start_time(self):
+        return _FromColumn(self._store.edited_starts[self._row])
+
+    @property
+    def edited_end_time(self):
+        return _FromColumn(self._store.edited_ends[self._row])
+
+    @property
+    def enabled(self):
+        return bool(self._store.enabled[self._row])
+
+    @property
+    def text(self):
+        return self._store.texts[self._row]
+
+    def to_primitive(self):
+        return self._store.GetPrimitive(self._row)
+
+    def to_edit(self):
+        return (self.edited_start_time, self.edited_end_time, self.enabled)
+
+    def is_edited(self):
+        return self.to_edit() != (None, None, True)
+
+    def to_edit_json(self):
+        json = {}
+        json[_KEY_EDITED_START_TIME] = self.edited_start_time
+        json[_KEY_EDITED_END_TIME] = self.edited_end_time
+        json[_KEY_ENABLED] = self.enabled
+        return json
+
+class SrtStats:
+    """
+    Aggregates over the enabled SRTs
+    """
+    __slots__ = ("duration", "count", "longest_gap")
+
+    def __init__(self, duration, count, longest_gap) -> None:
+        self.duration = duration
+        self.count = count
+        # longest stretch of source between two enabled SRTs, i.e. the biggest cut
+        self.longest_gap = longest_gap
+
+    @property
+    def average(self):
+        return self.duration / self.count if self.count else 0.0
+
+class SrtStore:
+    """
+    SRTs held as columns: original and edited times in float arrays (NaN where not edited), an
+    enabled mask and a pool of texts. Indexing and iterating yield Srt views, totals and primitive
+    lists are computed over whole columns. Enabled duration and count are kept up to date on every
+    edit rather than recomputed
+    """
+    def __init__(self, primitive_srts=()) -> None:
+        self.ids = []
+        self.texts = []
+        self._rows_by_id = {}
+        self.original_starts = np.empty(0)
+        self.original_ends = np.empty(0)
+        self.edited_starts = np.empty(0)
+        self.edited_ends = np.empty(0)
+        self.enabled = np.empty(0, dtype=bool)
+        self._times = None
+        self._enabled_duration = 0.0
+        self._enabled_count = 0
+        self._longest_gap = None
+        self._search_index = None
+        self.Append(primitive_srts)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, row) -> Srt:
+        if row < 0:
+            row += len(self.ids)
+        if not 0 <= row < len(self.ids):
+            raise IndexError(row)
+        return Srt(self, row)
+
+    def __iter__(self):
+        return (Srt(self, row) for row in range(len(self.ids)))
+
+    def Append(self, primitive_srts):
+        primitive_srts = list(primitive_srts)
+        if not primitive_srts:
+            return
+        first_row = len(self.ids)
+        ids, starts, ends, texts = zip(*primitive_srts)
+        self.ids.extend(ids)
+        self.texts.extend(texts)
+        count = len(ids)
+        self._rows_by_id.update(zip(ids, range(first_row, first_row + count)))
+        self.original_starts = np.concatenate([self.original_starts, np.array(starts, dtype=np.float64)])
+        self.original_ends = np.concatenate([self.original_ends, np.array(ends, dtype=np.float64)])
+        self.edited_starts = np.concatenate([self.edited_starts, np.full(count, np.nan)])
+        self.edited_ends = np.concatenate([self.edited_ends, np.full(count, np.nan)])
+        self.enabled = np.concatenate([self.enabled, np.ones(count, dtype=bool)])
+        self._times = None
+        self._enabled_duration += float(np.sum(self.original_ends[first_row:] - self.original_starts[first_row:]))
+        self._enabled_count += count
+        self._longest_gap = None
+        if self._search_index is not None:
+            self._search_index.Append(texts)
+
+    def GetRow(self, id) -> int:
+        return self._rows_by_id[id]
+
+    def GetById(self, id) -> Srt:
+        return Srt(self, self._rows_by_id[id])
+
+    def HasId(self, id) -> bool:
+        return id in self._rows_by_id
+
+    def SetEdit(self, id, edit):
+        """
+        Set the (edited_start_time, edited_end_time, enabled) of one SRT
+        """
+        row = self._rows_by_id[id]
+        if self.enabled[row]:
+            self._enabled_duration -= self._GetDuration(row)
+            self._enabled_count -= 1
+        self.edited_starts[row] = _ToColumn(edit[0])
+        self.edited_ends[row] = _ToColumn(edit[1])
+        self.enabled[row] = edit[2]
+        if self.enabled[row]:
+            self._enabled_duration += self._GetDuration(row)
+            self._enabled_count += 1
+        elif self._enabled_count == 0:
+            # drop the rounding left over from the running sum
+            self._enabled_duration = 0.0
+        if self._times is not None:
+            # keep the cached columns in step rather than rebuilding them
+            self._times[0][row], self._times[1][row] = self._GetTimes(row)
+        self._longest_gap = None
+
+    def _GetTimes(self, row):
+        start = self.edited_starts[row]
+        end = self.edited_ends[row]
+        return (self.original_starts[row] if np.isnan(start) else start,
+                self.original_ends[row] if np.isnan(end) else end)
+
+    def _GetDuration(self, row) -> float:
+        start, end = self._GetTimes(row)
+        return float(end - start)
+
+    def GetTimes(self):
+        """
+        Effective start and end of every SRT, the edited time where there is one
+        """
+        if self._times is None:
+            self._times = (np.where(np.isnan(self.edited_starts), self.original_starts, self.edited_starts),
+                           np.where(np.isnan(self.edited_ends), self.original_ends, self.edited_ends))
+        return self._times
+
+    def GetPrimitive(self, row):
+        starts, ends = self.GetTimes()
+        return (self.ids[row], float(starts[row]), float(ends[row]), self.texts[row])
+
+    def GetPrimitiveSrts(self, rows=None, enabled_only=False) -> list:
+        """
+        (id, start, end, text) of the given rows, or all rows, in row order
+        """
+        starts, ends = self.GetTimes()
+        rows = np.arange(len(self.ids)) if rows is None else np.asarray(sorted(rows), dtype=np.int64)
+        if enabled_only:
+            rows = rows[self.enabled[rows]]
+        return list(zip([self.ids[row] for row in rows], starts[rows].tolist(), ends[rows].tolist(), [self.texts[row] for row in rows]))
+
+    def GetPrimitiveSrtsWithEdits(self, edits: dict, enabled_only=False) -> list:
+        """
+        (id, start, end, text) of every row as it would be with edits applied over the current ones,
+        leaving the store unchanged
+        """
+        starts, ends = (column.copy() for column in self.GetTimes())
+        enabled = self.enabled.copy()
+        for id, (start, end, row_enabled) in edits.items():
+            row = self._rows_by_id.get(id)
+            if row is None:
+                continue
+            starts[row] = self.original_starts[row] if start is None else start
+            ends[row] = self.original_ends[row] if end is None else end
+            enabled[row] = row_enabled
+        rows = np.flatnonzero(enabled) if enabled_only else np.arange(len(self.ids))
+        return list(zip([self.ids[row] for row in rows], starts[rows].tolist(), ends[rows].tolist(), [self.texts[row] for row in rows]))
+
+    def GetEnabledDuration(self) -> float:
+        return self._enabled_duration
+
+    def GetLongestGap(self) -> float:
+        """
+        Computed over the enabled columns the first time it is asked for after a change
+        """
+        if self._longest_gap is None:
+            starts, ends = self.GetTimes()
+            starts = starts[self.enabled]
+            ends = ends[self.enabled]
+            if len(starts) < 2:
+                self._longest_gap = 0.0
+            else:
+                gaps = starts[1:] - np.maximum.accumulate(ends)[:-1]
+                self._longest_gap = max(0.0, float(np.max(gaps)))
+        return self._longest_gap
+
+    def GetStats(self) -> SrtStats:
+        return SrtStats(self._enabled_duration, self._enabled_count, self.GetLongestGap())
+
+    def GetSearchIndex(self) -> SrtSearchIndex:
+        """
+        Built over the texts the first time it is asked for, then kept up to date as rows are appended
+        """
+        if self._search_index is None:
+            self._search_index = SrtSearchIndex(self.texts)
+        return self._search_index
+
+    def Search(self, query) -> list:
+        """
+        Rows whose text matches the query, see SrtSearchIndex.Search
+        """
+        return self.GetSearchIndex().Search(query)
+
+    def GetEditedRows(self):
+        return np.flatnonzero(~np.isnan(self.edited_starts) | ~np.isnan(self.edited_ends) | ~self.enabled)
@@ -0,0 +1,210 @@
+import os
+import json
+import hashlib
+import subprocess
+
+from hyperedit_gui.media.media_info import GetVideoIdentity
+
+_INDEX_FILE_NAME = "clips.json"
+
+_KEY_FILE_NAME = "file"
+_KEY_START = "start"
+_KEY_END = "end"
+_KEY_SIZE = "size"
+_KEY_MTIME = "mtime"
+_KEY_DURATION = "duration"
+_KEY_CHECKSUM = "checksum"
+
+# an encoded clip may differ from its segment by a frame or two at either end
+_DURATION_TOLERANCE = 0.25
+
+def GetEncodeArgs(preview, encoder) -> list:
+    """
+    ffmpeg output arguments for a clip. Every clip of a render uses the same arguments so the clips
+    can be concatenated without re-encoding
+    """
+    if encoder == "apple":
+        video_args = ["-c:v", "h264_videotoolbox", "-b:v", "4M" if preview else "12M"]
+    else:
+        video_args = ["-c:v", "libx264", "-preset", "ultrafast" if preview else "veryfast", "-crf", "28" if preview else "20"]
+    if preview:
+        video_args = ["-vf", "scale=-2:720"] + video_args
+    return video_args + ["-pix_fmt", "yuv420p", "-c:a", "aac", "-b:a", "192k", "-ar", "48000"]
+
+def GetClipExt(encode_args) -> str:
+    if "mpegts" in encode_args:
+        return ".ts"
+    return ".mp4"
+
+def GetClipKey(video_identity, start, end, encode_args) -> str:
+    key = json.dumps([video_identity, round(start, 3), round(end, 3), encode_args])
+    return hashlib.sha256(key.encode()).hexdigest()
+
+def BuildClipCommand(video_path, start, end, encode_args, output_path, threads=0) -> list:
+    # stream copied clips start on a keyframe, which must not be rounded down to the one before it,
+    # and ffprobe prints keyframe times to the microsecond
+    return [
+        "ffmpeg", "-y", "-v", "error",
+        "-ss", f"{start:.6f}",
+        "-i", video_path,
+        "-t", f"{end - start:.6f}",
+        "-map", "0:v:0", "-map", "0:a:0?",
+        *encode_args,
+        "-threads", str(threads),
+        output_path,
+    ]
+
+def BuildConcatCommand(concat_list_path, output_path, output_args=()) -> list:
+    return [
+        "ffmpeg", "-y", "-v", "error",
+        "-f", "concat", "-safe", "0",
+        "-i", concat_list_path,
+        "-c", "copy",
+        *output_args,
+        output_path,
+    ]
+
+def BuildRemuxCommand(input_path, output_path, output_args=()) -> list:
+    return [
+        "ffmpeg", "-y", "-v", "error",
+        "-i", input_path,
+        "-map", "0",
+        "-c", "copy",
+        *output_args,
+        output_path,
+    ]
+
+def WriteConcatList(concat_list_path, clip_paths):
+    with open(concat_list_path, 'w') as concat_file:
+        for clip_path in clip_paths:
+            escaped = clip_path.replace("'", "'\\''")
+            concat_file.write(f"file '{escaped}'\n")
+
+def GetChecksum(path) -> str:
+    checksum = hashlib.blake2b()
+    with open(path, 'rb') as clip_file:
+        for chunk in iter(lambda: clip_file.read(1 << 20), b""):
+            checksum.update(chunk)
+    return checksum.hexdigest()
+
+def ProbeDuration(path) -> float:
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "default=noprint_wrappers=1:nokey=1", path],
+        capture_output=True, text=True, check=True)
+    return float(result.stdout.strip())
+
+def DescribeClip(clip_path, start, end) -> dict:
+    """
+    Size, duration and checksum of a freshly encoded clip. Raises ValueError if its duration does not
+    match the segment, e.g. ffmpeg exited cleanly on a truncated input
+    """
+    duration = ProbeDuration(clip_path)
+    if abs(duration - (end - start)) > _DURATION_TOLERANCE:
+        raise ValueError(f"Clip {clip_path} is {duration:.3f}s, expected {end - start:.3f}s")
+    stat = os.stat(clip_path)
+    return {
+        _KEY_SIZE: stat.st_size,
+        _KEY_MTIME: stat.st_mtime_ns,
+        _KEY_DURATION: duration,
+        _KEY_CHECKSUM: GetChecksum(clip_path),
+    }
+
+class ClipCache:
+    """
+    Per-clip render cache in a project's CLIP directory, keyed by source video, segment boundaries and
+    encode arguments. Editing one segment only invalidates that segment's clip.
+
+    The index doubles as a manifest: a clip is only recorded, with its size, duration and checksum,
+    once ffmpeg has exited cleanly, and a clip that no longer matches its entry is re-encoded
+    """
+    def __init__(self, clip_directory) -> None:
+        self.clip_directory = clip_directory
+        self.index_path = os.path.join(clip_directory, _INDEX_FILE_NAME)
+        self._index = self._ReadIndex()
+
+    def _ReadIndex(self) -> dict:
+        try:
+            with open(self.index_path, 'r') as index_file:
+                return json.load(index_file)
+        except FileNotFoundError:
+            return {}
+        except json.decoder.JSONDecodeError:
+            print(f"Error decoding json in {self.index_path}, starting with an empty clip cache")
+            return {}
+
+    def _WriteIndex(self):
+        with open(self.index_path + ".tmp", 'w') as index_file:
+            json.dump(self._index, index_file)
+            index_file.flush()
+            os.fsync(index_file.fileno())
+        os.replace(self.index_path + ".tmp", self.index_path)
+
+    def GetClipPath(self, key, encode_args) -> str:
+        return os.path.join(self.clip_directory, f"clip-{key[:16]}{GetClipExt(encode_args)}")
+
+    def Get(self, key):
+        """
+        Return the path of a cached clip, or None if it is missing or fails verification
+        """
+        entry = self._index.get(key)
+        if entry is None:
+            return None
+        clip_path = os.path.join(self.clip_directory, entry[_KEY_FILE_NAME])
+        if self._Verify(clip_path, entry):
+            return clip_path
+        print(f"Clip {clip_path} is missing or corrupt, it will be re-encoded")
+        del self._index[key]
+        self._WriteIndex()
+        return None
+
+    def _Verify(self, clip_path, entry):
+        try:
+            stat = os.stat(clip_path)
+        except OSError:
+            return False
+        if stat.st_size != entry.get(_KEY_SIZE):
+            return False
+        if stat.st_mtime_ns == entry.get(_KEY_MTIME):
+            return True
+        # touched since it was recorded, only the checksum can tell if the content changed
+        if GetChecksum(clip_path) != entry.get(_KEY_CHECKSUM):
+            return False
+        entry[_KEY_MTIME] = stat.st_mtime_ns
+        self._WriteIndex()
+        return True
+
+    def Put(self, key, clip_path, start, end, clip_info: dict):
+        entry = {
+            _KEY_FILE_NAME: os.path.basename(clip_path),
+            _KEY_START: start,
+            _KEY_END: end,
+        }
+        entry.update(clip_info)
+        self._index[key] = entry
+        self._WriteIndex()
+
+    def RemovePartials(self):
+        """
+        Remove clips left half written by a render that was killed
+        """
+        for file_name in os.listdir(self.clip_directory):
+            if file_name.startswith("clip-") and ".part." in file_name:
+                os.remove(os.path.join(self.clip_directory, file_name))
+
+class ClipPlan:
+    """
+    The clips needed for a render, split into those already cached and those that must be encoded.
+    clip_specs is an ordered list of (start, end, encode_args)
+    """
+    def __init__(self, clip_cache: ClipCache, video_path, clip_specs) -> None:
+        video_identity = GetVideoIdentity(video_path)
+        self.clips = []
+        self.missing = []
+        seen = set()
+        for start, end, encode_args in clip_specs:
+            key = GetClipKey(video_identity, start, end, encode_args)
+            clip_path = clip_cache.GetClipPath(key, encode_args)
+            self.clips.append(clip_path)
+            if key not in seen and clip_cache.Get(key) is None:
+                self.missing.append((key, clip_path, start, end, encode_args))
+            seen.add(key)
@@ -0,0 +1,43 @@
+import os
+
+# ffmpeg's concat demuxer reads this header to allow the inpoint and outpoint directives
+_CONCAT_HEADER = "ffconcat version 1.0\n"
+
+def _Escape(path) -> str:
+    return path.replace("'", "'\\''")
+
+def WriteConcatScript(script_path, video_path, srts):
+    """
+    Write an ffconcat script whose entries point straight into the source video, one per primitive
+    SRT, so an edit can be played or exported without encoding any clips first
+    """
+    video_path = _Escape(os.path.abspath(video_path))
+    with open(script_path + ".tmp", 'w') as script_file:
+        script_file.write(_CONCAT_HEADER)
+        for _, start, end, _ in srts:
+            script_file.write(f"file '{video_path}'\n")
+            script_file.write(f"inpoint {start:.3f}\n")
+            script_file.write(f"outpoint {end:.3f}\n")
+    os.replace(script_path + ".tmp", script_path)
+
+def GetScriptDuration(srts) -> float:
+    return sum(end - start for _, start, end, _ in srts)
+
+def BuildPlayCommand(script_path) -> list:
+    return ["ffplay", "-autoexit", "-f", "concat", "-safe", "0", script_path]
+
+def BuildExportCommand(script_path, encode_args, output_path, threads=0) -> list:
+    """
+    Decode the script and encode it in one ffmpeg process. With inter-frame sources each cut may
+    start a few frames before its inpoint, as the demuxer reads from the preceding keyframe
+    """
+    return [
+        "ffmpeg", "-y", "-v", "error",
+        "-f", "concat", "-safe", "0",
+        "-i", script_path,
+        "-map", "0:v:0", "-map", "0:a:0?",
+        *encode_args,
+        "-threads", str(threads),
+        "-progress", "pipe:1", "-nostats",
+        output_path,
+    ]
@@ -0,0 +1,75 @@
+from bisect import bisect_left, bisect_right
+
+# stream copied pieces are muxed to MPEG-TS, which carries codec parameters in band so copied and
+# re-encoded pieces can be concatenated
+_COPY_ARGS = ["-c:v", "copy", "-c:a", "aac", "-b:a", "192k", "-ar", "48000", "-avoid_negative_ts", "make_zero", "-f", "mpegts"]
+
+# SRT times are in milliseconds
+_EPSILON = 0.0005
+
+def SnapToKeyframe(keyframes, time) -> float:
+    """
+    The last keyframe at or before time, so a stream copy starting there includes all of the segment
+    """
+    index = bisect_right(keyframes, time + _EPSILON) - 1
+    if index < 0:
+        return 0.0
+    return keyframes[index]
+
+def GetCopyArgs() -> list:
+    return list(_COPY_ARGS)
+
+def GetSmartEncodeArgs(video_stream, encoder) -> list:
+    """
+    Encode arguments for the head and tail of a smart cut. They must match the source's codec so the
+    encoded pieces can sit next to stream copied ones
+    """
+    codec_name = (video_stream or {}).get("codec_name")
+    if codec_name == "hevc":
+        video_args = ["-c:v", "hevc_videotoolbox" if encoder == "apple" else "libx265"]
+    else:
+        video_args = ["-c:v", "h264_videotoolbox" if encoder == "apple" else "libx264"]
+    if encoder == "apple":
+        video_args += ["-q:v", "65"]
+    else:
+        video_args += ["-preset", "veryfast", "-crf", "18"]
+    pix_fmt = (video_stream or {}).get("pix_fmt")
+    if pix_fmt:
+        video_args += ["-pix_fmt", pix_fmt]
+    return video_args + ["-c:a", "aac", "-b:a", "192k", "-ar", "48000", "-f", "mpegts"]
+
+def GetJoinArgs() -> list:
+    """
+    Output arguments for joining smart cut pieces. The re-encoded pieces have their own parameter sets,
+    which MPEG-TS carries in band next to the source's
+    """
+    return ["-f", "mpegts"]
+
+def GetRemuxArgs(video_stream) -> list:
+    """
+    MP4 output arguments for a remux of joined smart cut pieces. avc1 and hvc1 hold one set of
+    parameter sets for the whole file, avc3 and hev1 let them change in band
+    """
+    codec_name = (video_stream or {}).get("codec_name")
+    return ["-tag:v", "hev1" if codec_name == "hevc" else "avc3"]
+
+def SplitSmartCut(keyframes, start, end):
+    """
+    Split a segment into (start, end, copy) pieces: the partial GOP before the first keyframe and
+    after the last one are re-encoded, everything between is stream copied
+    """
+    first = bisect_left(keyframes, start - _EPSILON)
+    last = bisect_right(keyframes, end + _EPSILON) - 1
+    if first >= len(keyframes) or last < 0 or keyframes[first] >= keyframes[last]:
+        # no whole GOP inside the segment
+        return [(start, end, False)]
+
+    head_end = keyframes[first]
+    tail_start = keyframes[last]
+    pieces = []
+    if head_end - start > _EPSILON:
+        pieces.append((start, head_end, False))
+    pieces.append((head_end, tail_start, True))
+    if end - tail_start > _EPSILON:
+        pieces.append((tail_start, end, False))
+    return pieces
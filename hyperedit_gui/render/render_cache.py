@@ -0,0 +1,63 @@
+import os
+import json
+import hashlib
+
+from hyperedit_gui.media.media_info import GetVideoIdentity
+
+_INDEX_FILE_NAME = "render_cache.json"
+
+_KEY_FILE_NAME = "file"
+_KEY_SIZE = "size"
+
+def GetRenderKey(srt_list_hash, video_path, settings_key) -> str:
+    key = json.dumps([srt_list_hash, GetVideoIdentity(video_path), settings_key])
+    return hashlib.sha256(key.encode()).hexdigest()
+
+def ReadRenderIndexFile(clip_directory) -> dict:
+    """
+    {key: (file name, size)} of the renders a project indexed in its CLIP directory before it had a
+    project database
+    """
+    try:
+        with open(os.path.join(clip_directory, _INDEX_FILE_NAME), 'r') as index_file:
+            index = json.load(index_file)
+        return {key: (entry[_KEY_FILE_NAME], entry[_KEY_SIZE]) for key, entry in index.items()}
+    except (FileNotFoundError, json.decoder.JSONDecodeError, KeyError, AttributeError):
+        return {}
+
+class RenderCache:
+    """
+    Content addressed store of final renders in a project's CLIP directory. The project database maps
+    render keys to output files so lookups never scan the directory
+    """
+    def __init__(self, clip_directory, database) -> None:
+        self.clip_directory = clip_directory
+        self.database = database
+
+    def Get(self, key):
+        """
+        Return the path of a cached render, or None if it is missing or has changed on disk
+        """
+        artifact = self.database.GetRenderArtifact(key)
+        if artifact is None:
+            return None
+        file_name, size = artifact
+        output_path = os.path.join(self.clip_directory, file_name)
+        try:
+            if os.path.getsize(output_path) == size:
+                return output_path
+        except OSError:
+            pass
+        self.database.RemoveRenderArtifact(key)
+        return None
+
+    def Put(self, key, output_path) -> str:
+        """
+        Move a finished render into the cache under its key and return its new path
+        """
+        _, ext = os.path.splitext(output_path)
+        file_name = f"render-{key[:16]}{ext}"
+        cached_path = os.path.join(self.clip_directory, file_name)
+        os.replace(output_path, cached_path)
+        self.database.PutRenderArtifact(key, file_name, os.path.getsize(cached_path))
+        return cached_path
@@ -0,0 +1,178 @@
+import os
+import sys
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from hyperedit_gui.render.clips import ClipCache, ClipPlan, GetEncodeArgs, BuildClipCommand, BuildConcatCommand, BuildRemuxCommand, WriteConcatList, DescribeClip
+from hyperedit_gui.render.fast_cut import SnapToKeyframe, SplitSmartCut, GetCopyArgs, GetSmartEncodeArgs, GetJoinArgs, GetRemuxArgs
+from hyperedit_gui.render.concat_script import WriteConcatScript, GetScriptDuration, BuildExportCommand
+
+RENDER_MODE_ENCODE = "encode"
+RENDER_MODE_FAST_CUT = "fast_cut"
+RENDER_MODE_SMART = "smart"
+RENDER_MODE_SINGLE_PASS = "single_pass"
+
+def GetDefaultEncoder():
+    """
+    Hardware encoding is only wired up for VideoToolbox, elsewhere use libx264
+    """
+    if sys.platform == "darwin":
+        return "apple"
+    return None
+
+class RenderSettings:
+    def __init__(self, mode=RENDER_MODE_ENCODE, preview=True, encoder=None, workers=1, threads=0) -> None:
+        self.mode = mode
+        self.preview = preview
+        self.encoder = encoder
+        self.workers = workers
+        self.threads = threads
+
+    def GetKey(self):
+        """
+        The settings that change the rendered output. Workers and threads only change how fast it is
+        """
+        if self.mode == RENDER_MODE_FAST_CUT:
+            return [self.mode]
+        if self.mode == RENDER_MODE_SMART:
+            return [self.mode, self.encoder]
+        return [self.mode, self.preview, self.encoder]
+
+def GetClipSpecs(srts, settings: RenderSettings, media_info=None) -> list:
+    """
+    The (start, end, encode_args) clips that make up a render, in order. Fast cut snaps each segment
+    back to a keyframe and stream copies it, smart re-encodes only the partial GOPs at either end
+    """
+    clip_specs = []
+    if settings.mode == RENDER_MODE_FAST_CUT:
+        copy_args = GetCopyArgs()
+        for _, start, end, _ in srts:
+            clip_specs.append((SnapToKeyframe(media_info.keyframes, start), end, copy_args))
+    elif settings.mode == RENDER_MODE_SMART:
+        copy_args = GetCopyArgs()
+        encode_args = GetSmartEncodeArgs(media_info.GetVideoStream(), settings.encoder)
+        for _, start, end, _ in srts:
+            for piece_start, piece_end, copy in SplitSmartCut(media_info.keyframes, start, end):
+                clip_specs.append((piece_start, piece_end, copy_args if copy else encode_args))
+    else:
+        encode_args = GetEncodeArgs(settings.preview, settings.encoder)
+        for _, start, end, _ in srts:
+            clip_specs.append((start, end, encode_args))
+    return clip_specs
+
+def GetJoinCommands(concat_list_path, joined_path, output_path, settings: RenderSettings, media_info=None) -> list:
+    """
+    ffmpeg commands that concatenate the clips in the list into output_path. Smart cut pieces are
+    joined into MPEG-TS at joined_path first, as stream copied and re-encoded pieces have different
+    parameter sets that a plain MP4 cannot hold
+    """
+    if settings.mode != RENDER_MODE_SMART:
+        return [BuildConcatCommand(concat_list_path, output_path)]
+    return [
+        BuildConcatCommand(concat_list_path, joined_path, GetJoinArgs()),
+        BuildRemuxCommand(joined_path, output_path, GetRemuxArgs(media_info.GetVideoStream())),
+    ]
+
+def GetThreadsPerWorker(workers, threads):
+    """
+    Threads per ffmpeg process. 0 shares the machine's cores evenly between the workers
+    """
+    if threads > 0:
+        return threads
+    return max(1, (os.cpu_count() or 1) // workers)
+
+def _EncodeClip(job, video_path, clip_path, start, end, encode_args, threads):
+    base, ext = os.path.splitext(clip_path)
+    partial_path = f"{base}.part{ext}"
+    job.Run(BuildClipCommand(video_path, start, end, encode_args, partial_path, threads))
+    try:
+        clip_info = DescribeClip(partial_path, start, end)
+    except Exception:
+        os.remove(partial_path)
+        raise
+    os.replace(partial_path, clip_path)
+    return clip_info
+
+def _EncodeClips(job, clip_cache: ClipCache, video_path, missing, workers, threads, steps):
+    """
+    Encode missing clips with up to `workers` ffmpeg processes at once. Clips are handed to the pool
+    only as workers free up, and the clip cache is only written from this thread
+    """
+    pending = list(reversed(missing))
+    running = {}
+    done = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        try:
+            while pending or running:
+                while pending and len(running) < workers:
+                    clip = pending.pop()
+                    key, clip_path, start, end, encode_args = clip
+                    running[executor.submit(_EncodeClip, job, video_path, clip_path, start, end, encode_args, threads)] = clip
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    key, clip_path, start, end, _ = running.pop(future)
+                    clip_cache.Put(key, clip_path, start, end, future.result())
+                    done += 1
+                    job.SetProgress(done / steps, f"Encoded clip {done} of {len(missing)}")
+        except BaseException:
+            # stop the other encodes rather than waiting for them
+            job.Cancel()
+            raise
+
+def _RenderSinglePass(job, srts, video_path, settings: RenderSettings, output_path):
+    """
+    Encode the edit in one ffmpeg process reading a concat script, without writing any clips
+    """
+    script_path = os.path.splitext(output_path)[0] + ".ffconcat"
+    WriteConcatScript(script_path, video_path, srts)
+    duration = GetScriptDuration(srts)
+    print(f"Rendering {len(srts)} segments in a single pass")
+    job.SetProgress(0, "Encoding")
+    try:
+        process = job.Popen(BuildExportCommand(script_path, GetEncodeArgs(settings.preview, settings.encoder), output_path, settings.threads),
+                            stdout=subprocess.PIPE, text=True)
+        for line in process.stdout:
+            key, _, value = line.strip().partition("=")
+            if key == "out_time_us" and value.isdigit() and duration > 0:
+                job.SetProgress(min(1.0, int(value) / 1000000 / duration), "Encoding")
+        process.wait()
+        job.CheckCancelled()
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, "ffmpeg")
+    finally:
+        os.remove(script_path)
+    return output_path
+
+def RenderSrts(job, srts, video_path, clip_directory, settings: RenderSettings, output_path, media_info=None):
+    """
+    Render primitive SRTs to output_path. Only clips that are missing from the clip cache or fail
+    verification are encoded, then every clip is concatenated in SRT order
+    """
+    if settings.mode == RENDER_MODE_SINGLE_PASS:
+        return _RenderSinglePass(job, srts, video_path, settings, output_path)
+
+    clip_cache = ClipCache(clip_directory)
+    clip_cache.RemovePartials()
+    plan = ClipPlan(clip_cache, video_path, GetClipSpecs(srts, settings, media_info))
+    workers = settings.workers
+    threads = GetThreadsPerWorker(workers, settings.threads)
+    print(f"Rendering {len(plan.clips)} clips, {len(plan.missing)} need encoding with {workers} workers of {threads} threads")
+
+    # concatenation counts as one more step
+    steps = len(plan.missing) + 1
+    job.SetProgress(0, f"Encoding {len(plan.missing)} clips")
+    _EncodeClips(job, clip_cache, video_path, plan.missing, workers, threads, steps)
+
+    job.SetProgress((steps - 1) / steps, "Concatenating")
+    concat_list_path = os.path.splitext(output_path)[0] + ".txt"
+    joined_path = os.path.splitext(output_path)[0] + ".ts"
+    WriteConcatList(concat_list_path, plan.clips)
+    try:
+        for command in GetJoinCommands(concat_list_path, joined_path, output_path, settings, media_info):
+            job.Run(command)
+    finally:
+        os.remove(concat_list_path)
+        if os.path.exists(joined_path):
+            os.remove(joined_path)
+    return output_path
@@ -0,0 +1,57 @@
+from PySide6.QtWidgets import QHBoxLayout, QLabel, QProgressBar, QPushButton, QWidget
+
+from hyperedit_gui.controller import Controller
+from hyperedit_gui.job.jobs import JOB_FAILED, JOB_RUNNING
+
+class JobsWidget(QWidget):
+    """
+    Status bar widget showing the running job, how many are queued behind it and a cancel button
+    """
+    def __init__(self, parent, controller: Controller):
+        super().__init__(parent)
+
+        self.controller = controller
+        self.controller.AddJobObserver(self)
+        self.job = None
+
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.label = QLabel("")
+        self.progressBar = QProgressBar()
+        self.progressBar.setRange(0, 100)
+        self.progressBar.setMaximumWidth(200)
+        self.cancelButton = QPushButton("Cancel")
+        self.cancelButton.clicked.connect(self.cancel)
+        layout.addWidget(self.label)
+        layout.addWidget(self.progressBar)
+        layout.addWidget(self.cancelButton)
+        self.setLayout(layout)
+
+        self.update_status()
+
+    def cancel(self):
+        if self.job:
+            self.controller.CancelJob(self.job)
+
+    def update_status(self, text=""):
+        jobs = self.controller.GetJobs()
+        running = [job for job in jobs if job.state == JOB_RUNNING]
+        self.job = running[0] if running else (jobs[0] if jobs else None)
+
+        self.progressBar.setVisible(self.job is not None)
+        self.cancelButton.setVisible(self.job is not None)
+        if self.job is None:
+            self.label.setText(text)
+            return
+
+        text = f"{self.job.name}: {self.job.message}" if self.job.message else self.job.name
+        if len(jobs) > 1:
+            text = f"{text} (+{len(jobs) - 1} queued)"
+        self.label.setText(text)
+        self.progressBar.setValue(int(self.job.progress * 100))
+
+    def OnJobChange(self, job):
+        if job.state == JOB_FAILED:
+            self.update_status(f"⚠️ {job.name} failed: {job.error}")
+        else:
+            self.update_status()
@@ -0,0 +1,31 @@
+from PySide6.QtWidgets import QStackedWidget, QWidget
+
+class PageStack(QStackedWidget):
+    """
+    A stacked widget whose pages are built the first time they are shown. Until then each page is an
+    empty placeholder, so indexes stay the same whichever pages have been built
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._factories = {}
+
+    def AddPage(self, factory) -> int:
+        """
+        Add a page that factory(stack) builds on first use
+        """
+        index = self.addWidget(QWidget())
+        self._factories[index] = factory
+        return index
+
+    def GetPage(self, index) -> QWidget:
+        factory = self._factories.pop(index, None)
+        if factory is not None:
+            placeholder = self.widget(index)
+            self.insertWidget(index, factory(self))
+            self.removeWidget(placeholder)
+            placeholder.deleteLater()
+        return self.widget(index)
+
+    def setCurrentIndex(self, index):
+        self.GetPage(index)
+        super().setCurrentIndex(index)
@@ -6,12 +6,12 @@ from PySide6.QtWidgets import QApplication, QVBoxLayout, QPushButton, \
 
 from PySide6.QtCore import Qt
 
-from hyperedit_gui.model.projects import Project
+from hyperedit_gui.model.recent_project_index import RecentProjectEntry, RECENT_PROJECT_OK, RECENT_PROJECT_PENDING
 from hyperedit_gui.controller import Controller
 from hyperedit_gui.model.config import GetConfig, HeConfig
 
 class RecentProjectWidget(QWidget):
-    def __init__(self, project: Project, controller: Controller):
+    def __init__(self, project: RecentProjectEntry, controller: Controller):
         super().__init__()
         self.project = project
         self.controller = controller
@@ -24,7 +24,12 @@ class RecentProjectWidget(QWidget):
 
         # Project name label
         vLayout = QVBoxLayout(self)
-        nameLabel = QLabel(self.project.name)
+        if self.project.status == RECENT_PROJECT_PENDING:
+            nameLabel = QLabel("Reading...")
+        elif self.project.status == RECENT_PROJECT_OK or self.project.name is None:
+            nameLabel = QLabel(self.project.name or f"<{self.project.status}>")
+        else:
+            nameLabel = QLabel(f"{self.project.name} ({self.project.status})")
         nameLabel.setStyleSheet("font-size: 14px;")
 
         # Project path label
@@ -32,12 +37,13 @@ class RecentProjectWidget(QWidget):
         pathLabel.setStyleSheet("font-size: 12px; color: grey;")
 
         # video path label
-        videoLabel = QLabel(self.project.video_path)
+        videoLabel = QLabel(self.project.video_path or "")
         videoLabel.setStyleSheet("font-size: 12px; color: grey;")
 
         # Open button
         openButton = QPushButton("Open")
         openButton.setMaximumWidth(80)
+        openButton.setEnabled(self.project.IsOpenable())
         openButton.clicked.connect(self.open_project)
 
         # Remove button
@@ -67,6 +73,7 @@ class ProjectWindow(QWidget):
 
         self.controller = controller
         self.controller.AddProjectChangeObserver(self)
+        self.controller.AddRecentProjectObserver(self)
         GetConfig().AddObserver(self)
 
         # Set the main window's size
@@ -82,18 +89,31 @@ class ProjectWindow(QWidget):
         
         self.listWidget = QListWidget()
         self.layout.addWidget(self.listWidget)
+        self.listItems = {}
         self.populateList()
 
     def populateList(self):
-
+        """
+        Show the cached entries now, rows are replaced as the controller re-reads them
+        """
         self.listWidget.clear()
+        self.listItems = {}
         for project in self.controller.ReadRecentProjects():
             listItem = QListWidgetItem(self.listWidget)
-            projectWidget = RecentProjectWidget(project, self.controller)
-            listItem.setSizeHint(projectWidget.sizeHint())
             listItem.setFlags(listItem.flags() & ~Qt.ItemIsSelectable)
             self.listWidget.addItem(listItem)
-            self.listWidget.setItemWidget(listItem, projectWidget)
+            self.listItems[project.project_path] = listItem
+            self.setProjectWidget(listItem, project)
+
+    def setProjectWidget(self, listItem, project):
+        projectWidget = RecentProjectWidget(project, self.controller)
+        listItem.setSizeHint(projectWidget.sizeHint())
+        self.listWidget.setItemWidget(listItem, projectWidget)
+
+    def OnRecentProjectRead(self, project):
+        listItem = self.listItems.get(project.project_path)
+        if listItem is not None:
+            self.setProjectWidget(listItem, project)
 
     def newProject(self):
         print("New project...")
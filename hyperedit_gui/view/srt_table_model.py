@@ -0,0 +1,182 @@
+from PySide6.QtWidgets import QApplication, QStyle, QStyledItemDelegate, QStyleOptionButton
+from PySide6.QtCore import QAbstractTableModel, QEvent, QModelIndex, QRect, QSortFilterProxyModel, Qt
+
+from hyperedit_gui.model.srt import GetSrts
+
+COL_INDEX_ID = 0
+COL_INDEX_CHECKED = 1
+COL_INDEX_START = 2
+COL_INDEX_END = 3
+COL_INDEX_TEXT = 4
+COL_INDEX_ACTION = 5
+
+_HEADERS = ["ID", "", "Start", "End", "Text", "Actions"]
+
+# the row in GetSrts(), which a filtered view's row is not
+ROLE_ROW = Qt.UserRole
+
+_ACTION_REVERT = "Revert"
+_ACTION_PREVIEW = "Preview"
+
+class SrtTableModel(QAbstractTableModel):
+    """
+    Table model that reads straight from GetSrts(), so the view only asks for the rows it paints
+    """
+    def __init__(self, controller, parent=None):
+        super().__init__(parent)
+        self.controller = controller
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(GetSrts())
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(_HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return _HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        srt = GetSrts()[index.row()]
+        column = index.column()
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            if column == COL_INDEX_ID:
+                return srt.id
+            if column == COL_INDEX_START:
+                return str(srt.to_primitive()[1])
+            if column == COL_INDEX_END:
+                return str(srt.to_primitive()[2])
+            if column == COL_INDEX_TEXT and role == Qt.DisplayRole:
+                return srt.text
+        elif role == ROLE_ROW:
+            return index.row()
+        elif role == Qt.CheckStateRole and column == COL_INDEX_CHECKED:
+            return Qt.Checked if srt.enabled else Qt.Unchecked
+        return None
+
+    def flags(self, index):
+        column = index.column()
+        if column == COL_INDEX_CHECKED:
+            return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsUserCheckable
+        if column in (COL_INDEX_START, COL_INDEX_END):
+            return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsEditable
+        if column == COL_INDEX_ACTION:
+            return Qt.ItemIsEnabled
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid():
+            return False
+
+        srt = GetSrts()[index.row()]
+        column = index.column()
+        if role == Qt.CheckStateRole and column == COL_INDEX_CHECKED:
+            self.controller.SetSrtRowEnabled(srt.id, Qt.CheckState(value) == Qt.Checked)
+        elif role == Qt.EditRole and column in (COL_INDEX_START, COL_INDEX_END):
+            try:
+                time = float(value)
+            except ValueError:
+                return False
+            if column == COL_INDEX_START:
+                self.controller.EditSrtRowTimes(srt.id, start_time=time)
+            else:
+                self.controller.EditSrtRowTimes(srt.id, end_time=time)
+        else:
+            return False
+        # the controller notifies the change, which repaints the row
+        return True
+
+    def Reset(self):
+        self.beginResetModel()
+        self.endResetModel()
+
+    def RowsAppended(self, first, last):
+        # the rows are already in the store, so only tell the view about them
+        self.beginInsertRows(QModelIndex(), first, last)
+        self.endInsertRows()
+
+    def RowsChanged(self, first, last):
+        self.dataChanged.emit(self.index(first, 0), self.index(last, len(_HEADERS) - 1))
+
+class SrtFilterProxyModel(QSortFilterProxyModel):
+    """
+    Shows only the rows of a search result. The rows are looked up in a set, the search itself is
+    done by the index rather than by matching every row here
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = None
+
+    def SetRows(self, rows):
+        """
+        Rows to show, or None to show every row
+        """
+        self._rows = None if rows is None else set(rows)
+        self.invalidateRowsFilter()
+
+    def IsFiltered(self) -> bool:
+        return self._rows is not None
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        return self._rows is None or source_row in self._rows
+
+class ActionDelegate(QStyledItemDelegate):
+    """
+    Paints the Revert and Preview buttons for a row instead of creating widgets for every row
+    """
+    def __init__(self, parent=None, controller=None):
+        super().__init__(parent)
+        self.controller = controller
+
+    def _ButtonRects(self, rect: QRect):
+        width = (rect.width() - 6) // 2
+        revert = QRect(rect.left() + 2, rect.top() + 1, width, rect.height() - 2)
+        preview = QRect(revert.right() + 3, rect.top() + 1, width, rect.height() - 2)
+        return [(_ACTION_REVERT, revert), (_ACTION_PREVIEW, preview)]
+
+    def _IsActionEnabled(self, action, srt):
+        if action == _ACTION_REVERT:
+            return srt.edited_start_time is not None or srt.edited_end_time is not None
+        return True
+
+    def paint(self, painter, option, index):
+        srt = GetSrts()[index.data(ROLE_ROW)]
+        style = option.widget.style() if option.widget else QApplication.style()
+        for action, rect in self._ButtonRects(option.rect):
+            button = QStyleOptionButton()
+            button.rect = rect
+            button.text = action
+            button.state = QStyle.State_Raised
+            if self._IsActionEnabled(action, srt):
+                button.state |= QStyle.State_Enabled
+            style.drawControl(QStyle.CE_PushButton, button, painter, option.widget)
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() not in (QEvent.MouseButtonPress, QEvent.MouseButtonRelease, QEvent.MouseButtonDblClick):
+            return False
+        if event.button() != Qt.LeftButton:
+            return False
+
+        srt = GetSrts()[index.data(ROLE_ROW)]
+        position = event.position().toPoint()
+        for action, rect in self._ButtonRects(option.rect):
+            if not rect.contains(position):
+                continue
+            if event.type() == QEvent.MouseButtonRelease and self._IsActionEnabled(action, srt):
+                if action == _ACTION_REVERT:
+                    print(f"Reverting {srt.id}")
+                    self.controller.RevertSrtRow(srt.id)
+                else:
+                    print(f"Previewing {srt.id}")
+                    self.controller.PreviewSrt(srt.id)
+            # swallow presses on the buttons so they don't change the selection
+            return True
+        return False
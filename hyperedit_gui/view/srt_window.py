@@ -1,67 +1,15 @@
 import sys
 
-from PySide6.QtWidgets import QApplication, QVBoxLayout, QPushButton, QWidget, QTableView, QHBoxLayout, QLabel, QCheckBox, QLineEdit, QGroupBox, QHeaderView
-from PySide6.QtGui import QStandardItemModel, QStandardItem, QDoubleValidator, QValidator
+from PySide6.QtWidgets import QApplication, QVBoxLayout, QPushButton, QWidget, QTableView, QHBoxLayout, QLabel, QCheckBox, QLineEdit, QGroupBox, QHeaderView, QSpinBox, QComboBox, QInputDialog
+from PySide6.QtGui import QDoubleValidator, QValidator, QKeySequence, QShortcut
 from PySide6.QtCore import Qt
 
 from hyperedit_gui.controller import Controller
-from hyperedit_gui.model.srt import Srt, GetSrts
+from hyperedit_gui.model.srt_change import MergeRowRanges, SRT_CHANGE_REPLACED, SRT_CHANGE_APPENDED
+from hyperedit_gui.render.renderer import RENDER_MODE_ENCODE, RENDER_MODE_FAST_CUT, RENDER_MODE_SMART, RENDER_MODE_SINGLE_PASS
+from hyperedit_gui.view.srt_table_model import SrtTableModel, SrtFilterProxyModel, ActionDelegate, COL_INDEX_ID, COL_INDEX_CHECKED, COL_INDEX_START, COL_INDEX_END, COL_INDEX_TEXT, COL_INDEX_ACTION
 
 
-_COL_INDEX_ID = 0
-_COL_INDEX_CHECKED = 1
-_COL_INDEX_START = 2
-_COL_INDEX_END = 3
-_COL_INDEX_ACTION = 4
-
-# TODO this should go into hyperedit$
-class EnabledCell(QWidget):
-    def __init__(self, parent=None, id=None, enabled=True, controller=None):
-        super().__init__(parent)
-
-        self.id = id
-        self.enabled = enabled
-        self.controller = controller
-
-        self.layout = QHBoxLayout(self)
-        self.layout.setContentsMargins(2, 0, 2, 0)
-        self.checkbox = QCheckBox();
-        self.checkbox.setChecked(self.enabled)
-        self.checkbox.stateChanged.connect(self.Toggle)
-        self.layout.addWidget(self.checkbox)
-
-    def Toggle(self, state):
-        self.controller.SetSrtRowEnabled(self.id, state == Qt.Checked.value)
-
-class ActionPanel(QWidget):
-    def __init__(self, parent=None, id=None, enabled=True, controller=None):
-        super().__init__(parent)
-
-        self.id = id
-        self.controller = controller # TODO controller should REALLY be a singleton
-        self.layout = QHBoxLayout(self)
-        self.layout.setContentsMargins(2, 0, 2, 0)
-        self.layout.setSpacing(2)
-        self.revertButton = QPushButton("Revert")
-        self.revertButton.setEnabled(False)
-        self.previewButton = QPushButton("Preview")
-        self.layout.addWidget(self.revertButton)
-        self.layout.addWidget(self.previewButton)
-
-        self.revertButton.clicked.connect(self.revert)
-        self.previewButton.clicked.connect(self.preview)
-
-        self.setLayout(self.layout)
-
-    def revert(self):
-        print(f"Reverting {self.id}")
-
-    # TODO: next deaggress, edit tree :o
-    # TODO: oh and render previews?
-    def preview(self):
-        print(f"Previewing {self.id}")
-        self.controller.PreviewSrt(self.id)
-
 class SrtWindow(QWidget):
 
     def __init__(self, parent, controller=None):
@@ -69,23 +17,46 @@ class SrtWindow(QWidget):
 
         self.controller = controller
         self.controller.AddSrtChangeObserver(self)
+        self.controller.AddSrtStatsObserver(self)
+        self.controller.AddEditSetObserver(self)
 
         self.layout = QVBoxLayout(self)
 
-        self.model = None
-        self.resetModel()
+        self.model = SrtTableModel(self.controller, self)
+        self.proxy = SrtFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
 
         mainLayout = QHBoxLayout()
         self.tableView = QTableView()
         self.tableView.verticalHeader().setVisible(False)
-        self.tableView.setModel(self.model)
-        self.tableView.setColumnWidth(_COL_INDEX_ACTION, 200)
+        # fixed row heights so the view never has to measure rows it doesn't paint
+        self.tableView.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.tableView.setModel(self.proxy)
+        self.tableView.setItemDelegateForColumn(COL_INDEX_ACTION, ActionDelegate(self.tableView, self.controller))
 
-        mainLayout.addWidget(self.tableView)
+        # selects: Set selection behavior and mode
+        self.tableView.setSelectionBehavior(QTableView.SelectRows)
+        self.tableView.setSelectionMode(QTableView.ExtendedSelection)
+        self.tableView.selectionModel().selectionChanged.connect(self.onSelectionChanged)
+        header = self.tableView.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.Interactive)
+        header.setSectionResizeMode(COL_INDEX_TEXT, QHeaderView.Stretch)
+        self.tableView.setColumnWidth(COL_INDEX_ID, 50)
+        self.tableView.setColumnWidth(COL_INDEX_CHECKED, 30)
+        self.tableView.setColumnWidth(COL_INDEX_START, 70)
+        self.tableView.setColumnWidth(COL_INDEX_END, 70)
+        self.tableView.setColumnWidth(COL_INDEX_ACTION, 200)
+
+        tableLayout = QVBoxLayout()
+        tableLayout.addLayout(self.create_search_layout())
+        tableLayout.addWidget(self.tableView)
+        mainLayout.addLayout(tableLayout)
         sideLayout = QVBoxLayout()
         sideLayout.addWidget(self.create_stats_groupbox())
         sideLayout.addWidget(self.create_deaggress_groupbox())
         sideLayout.addWidget(self.create_multiselect_groupbox())
+        sideLayout.addWidget(self.create_history_groupbox())
+        sideLayout.addWidget(self.create_edit_sets_groupbox())
         sideLayout.addWidget(self.create_render_groupbox())
         sideLayout.addStretch(1)
         mainLayout.addLayout(sideLayout)
@@ -95,14 +66,51 @@ class SrtWindow(QWidget):
 
         self.layout.addLayout(mainLayout)
         self.layout.addLayout(self.create_back_next_buttons())
+        self.OnSrtStatsChange()
+        self.OnEditSetChange()
 
     def update_deaggress(self, text):
         if self.deaggress_validator.validate(text, 0)[0] == QValidator.Acceptable:
             self.controller.SetDeaggressSeconds(float(self.deaggress_seconds_line_edit.text()))
             self.deaggress_button.setEnabled(True)
         else:
+            self.controller.DeaggressZero()
             self.deaggress_button.setEnabled(False)
 
+    def create_search_layout(self):
+
+        search_layout = QHBoxLayout()
+
+        self.search_line_edit = QLineEdit()
+        self.search_line_edit.setPlaceholderText('Search: words, prefix*, fuzzy~, "a phrase"')
+        self.search_line_edit.setClearButtonEnabled(True)
+        self.search_line_edit.textChanged.connect(self.UpdateSearch)
+        QShortcut(QKeySequence.Find, self, self.search_line_edit.setFocus)
+
+        self.search_count_label = QLabel()
+
+        # select the results so the Enable, Disable and Render selection buttons act on them
+        select_all_button = QPushButton("Select all")
+        select_all_button.clicked.connect(self.tableView.selectAll)
+
+        search_layout.addWidget(self.search_line_edit)
+        search_layout.addWidget(self.search_count_label)
+        search_layout.addWidget(select_all_button)
+
+        return search_layout
+
+    def UpdateSearch(self):
+        query = self.search_line_edit.text()
+        # the selection was of the last results, and remapping a scattered one through the filter is slow
+        self.tableView.clearSelection()
+        if not query.strip():
+            self.proxy.SetRows(None)
+            self.search_count_label.setText("")
+        else:
+            rows = self.controller.SearchSrts(query)
+            self.proxy.SetRows(rows)
+            self.search_count_label.setText(f"{len(rows)} found")
+
     def create_back_next_buttons(self):
 
         buttonLayout = QHBoxLayout()
@@ -125,6 +133,13 @@ class SrtWindow(QWidget):
         row.addWidget(self.stats_label)
         row.addWidget(self.stats_line_edit)
         stats_layout.addLayout(row)
+        self.stats_values = {}
+        for name in ("Segments", "Average", "Longest gap", "Est. size"):
+            row = QHBoxLayout()
+            row.addWidget(QLabel(name))
+            self.stats_values[name] = QLabel("-")
+            row.addWidget(self.stats_values[name])
+            stats_layout.addLayout(row)
         stats_group_box = QGroupBox("Stats")
         stats_group_box.setLayout(stats_layout)
 
@@ -184,6 +199,91 @@ class SrtWindow(QWidget):
 
         return multiselect_group_box
 
+    def create_history_groupbox(self):
+
+        history_layout = QHBoxLayout()
+
+        undo_button = QPushButton("Undo")
+        redo_button = QPushButton("Redo")
+
+        undo_button.clicked.connect(self.controller.Undo)
+        redo_button.clicked.connect(self.controller.Redo)
+        QShortcut(QKeySequence.Undo, self).activated.connect(self.controller.Undo)
+        QShortcut(QKeySequence.Redo, self).activated.connect(self.controller.Redo)
+
+        history_layout.addWidget(undo_button)
+        history_layout.addWidget(redo_button)
+
+        history_group_box = QGroupBox("History")
+        history_group_box.setLayout(history_layout)
+
+        return history_group_box
+
+    def create_edit_sets_groupbox(self):
+
+        edit_sets_layout = QVBoxLayout()
+
+        row = QHBoxLayout()
+        self.edit_set_combobox = QComboBox()
+        self.edit_set_combobox.activated.connect(lambda i: self.controller.SelectEditSet(self.edit_set_combobox.itemText(i)))
+        row.addWidget(self.edit_set_combobox)
+        new_button = QPushButton("New")
+        new_button.clicked.connect(self.NewEditSet)
+        row.addWidget(new_button)
+        edit_sets_layout.addLayout(row)
+
+        # another set, how it differs from the active one, and actions on it
+        row = QHBoxLayout()
+        row.addWidget(QLabel("Compare"))
+        self.compare_combobox = QComboBox()
+        self.compare_combobox.currentIndexChanged.connect(lambda i: self.UpdateEditSetDiff())
+        row.addWidget(self.compare_combobox)
+        edit_sets_layout.addLayout(row)
+        self.edit_set_diff_label = QLabel("-")
+        edit_sets_layout.addWidget(self.edit_set_diff_label)
+
+        row = QHBoxLayout()
+        render_button = QPushButton("Render")
+        render_button.clicked.connect(lambda: self.controller.RenderEditSet(self.compare_combobox.currentText()))
+        row.addWidget(render_button)
+        delete_button = QPushButton("Delete")
+        delete_button.clicked.connect(lambda: self.controller.DeleteEditSet(self.compare_combobox.currentText()))
+        row.addWidget(delete_button)
+        edit_sets_layout.addLayout(row)
+
+        edit_sets_group_box = QGroupBox("Edit sets")
+        edit_sets_group_box.setLayout(edit_sets_layout)
+
+        return edit_sets_group_box
+
+    def NewEditSet(self):
+        name, ok = QInputDialog.getText(self, "New edit set", "Edit set name:")
+        if ok and name:
+            self.controller.CreateEditSet(name)
+
+    def UpdateEditSetDiff(self):
+        diff = self.controller.CompareEditSet(self.compare_combobox.currentText())
+        if diff is None:
+            self.edit_set_diff_label.setText("-")
+        else:
+            self.edit_set_diff_label.setText(f"{len(diff.enabled)} enabled, {len(diff.disabled)} disabled, {len(diff.retimed)} retimed")
+
+    def OnEditSetChange(self):
+        names = self.controller.GetEditSets()
+        active = self.controller.GetActiveEditSet()
+        compared = self.compare_combobox.currentText()
+        others = [name for name in names if name != active]
+        for combobox, items in ((self.edit_set_combobox, names), (self.compare_combobox, others)):
+            combobox.blockSignals(True)
+            combobox.clear()
+            combobox.addItems(items)
+            combobox.setEnabled(len(items) > 0)
+            combobox.blockSignals(False)
+        self.edit_set_combobox.setCurrentText(active or "")
+        if compared in others:
+            self.compare_combobox.setCurrentText(compared)
+        self.UpdateEditSetDiff()
+
     def create_render_groupbox(self):
         
         render_layout = QVBoxLayout()
@@ -198,7 +298,41 @@ class SrtWindow(QWidget):
         play_after_render_checkbox.stateChanged.connect(lambda s: self.controller.SetPlayAfterRender(s == Qt.Checked.value))
         row.addWidget(play_after_render_checkbox)
         render_layout.addLayout(row)
+
+        row = QHBoxLayout()
+        row.addWidget(QLabel("Mode"))
+        mode_combobox = QComboBox()
+        mode_combobox.addItem("Encode (frame accurate)", RENDER_MODE_ENCODE)
+        mode_combobox.addItem("Fast cut (snap to keyframes)", RENDER_MODE_FAST_CUT)
+        mode_combobox.addItem("Smart (copy, encode ends)", RENDER_MODE_SMART)
+        mode_combobox.addItem("Single pass (no clips)", RENDER_MODE_SINGLE_PASS)
+        mode_combobox.setCurrentIndex(mode_combobox.findData(self.controller.GetRenderMode()))
+        mode_combobox.currentIndexChanged.connect(lambda i: self.controller.SetRenderMode(mode_combobox.itemData(i)))
+        row.addWidget(mode_combobox)
+        render_layout.addLayout(row)
+
+        row = QHBoxLayout()
+        row.addWidget(QLabel("Workers"))
+        workers_spinbox = QSpinBox()
+        workers_spinbox.setRange(1, 64)
+        workers_spinbox.setValue(self.controller.GetRenderWorkers())
+        workers_spinbox.valueChanged.connect(self.controller.SetRenderWorkers)
+        row.addWidget(workers_spinbox)
+        row.addWidget(QLabel("Threads"))
+        threads_spinbox = QSpinBox()
+        threads_spinbox.setRange(0, 64)
+        threads_spinbox.setSpecialValueText("Auto")
+        threads_spinbox.setValue(self.controller.GetRenderThreads())
+        threads_spinbox.valueChanged.connect(self.controller.SetRenderThreads)
+        row.addWidget(threads_spinbox)
+        render_layout.addLayout(row)
         
+        row = QHBoxLayout()
+        play_enabled_button = QPushButton("Play enabled")
+        play_enabled_button.clicked.connect(self.controller.PlayEnabled)
+        row.addWidget(play_enabled_button)
+        render_layout.addLayout(row)
+
         row = QHBoxLayout()
         render_all_button = QPushButton("Render all")
         render_all_button.clicked.connect(self.controller.RenderAll)
@@ -220,22 +354,17 @@ class SrtWindow(QWidget):
         row.addWidget(self.render_selection_button)
         render_layout.addLayout(row)
 
+        row = QHBoxLayout()
+        export_button = QPushButton("Export SRT")
+        export_button.clicked.connect(self.controller.ExportSrts)
+        row.addWidget(export_button)
+        render_layout.addLayout(row)
+
         render_group_box = QGroupBox("Rendering")
         render_group_box.setLayout(render_layout)
 
         return render_group_box
     
-    def resetModel(self):
-        if self.model:
-            self.model.clear()
-
-        self.model = QStandardItemModel(0, 5)  # 4 columns
-        self.model.setHeaderData(_COL_INDEX_ID, Qt.Horizontal, "ID")
-        self.model.setHeaderData(_COL_INDEX_CHECKED, Qt.Horizontal, "")
-        self.model.setHeaderData(_COL_INDEX_START, Qt.Horizontal, "Start")
-        self.model.setHeaderData(_COL_INDEX_END, Qt.Horizontal, "End")
-        self.model.setHeaderData(_COL_INDEX_ACTION, Qt.Horizontal, "Actions")
-
     def ToggleEdit(self, id, state):
         self.controller.ToggleEdit(id, state == Qt.Checked.value)
 
@@ -248,67 +377,39 @@ class SrtWindow(QWidget):
         selected_indexes = selection_model.selectedRows()
 
         # Print the row numbers of selected rows
-        selected_rows = sorted([index.row() for index in selected_indexes])
+        selected_rows = sorted([self.proxy.mapToSource(index).row() for index in selected_indexes])
         print("Selected rows:", selected_rows)
         self.controller.SetSelectedSrtRows(selected_rows)
-        # TODO must reset this value in controller when SRT changes
-
-    def populateTable(self):
-        for entry in GetSrts():
-            idItem = QStandardItem(entry.id)
-            idItem.setFlags(~Qt.ItemIsEditable)
-            enabledItem = QStandardItem() # Empty, will hold the checkbox
-            # TODO use edit start/end times if available 
-            startItem = QStandardItem(str(entry.original_start_time))
-            startItem.setFlags(Qt.ItemIsEditable | Qt.ItemIsEnabled | Qt.ItemIsSelectable)
-            endItem = QStandardItem(str(entry.original_end_time))
-            endItem.setFlags(Qt.ItemIsEditable | Qt.ItemIsEnabled | Qt.ItemIsSelectable)
-            actionItem = QStandardItem()  # Empty, will hold the button
-            actionItem.setFlags(~Qt.ItemIsSelectable)
-            self.model.appendRow([idItem, enabledItem, startItem, endItem, actionItem])
-            self.model.itemChanged.connect(self.onItemChanged)
-
-            enabledCell = EnabledCell(id=entry.id, enabled=entry.enabled, controller=self.controller)
-            actionPanel = ActionPanel(id=entry.id, enabled=True, controller=self.controller)
-            current_row = self.model.rowCount() - 1
-            self.tableView.setIndexWidget(self.model.index(current_row, _COL_INDEX_CHECKED), enabledCell)
-            self.tableView.setIndexWidget(self.model.index(current_row, _COL_INDEX_ACTION), actionPanel)
-            
-            
-        # selects: Set selection behavior and mode
-        self.tableView.setSelectionBehavior(QTableView.SelectRows)
-        self.tableView.setSelectionMode(QTableView.ExtendedSelection)
-        selection_model = self.tableView.selectionModel()
-        selection_model.selectionChanged.connect(self.onSelectionChanged)
-        # self.tableView.resizeColumnsToContents()
-        header = self.tableView.horizontalHeader()
-        header.setSectionResizeMode(QHeaderView.Stretch)
-
-    def onItemChanged(self, item):
-        if item.column() == _COL_INDEX_START:
-            GetSrts()[item.row()].edited_start_time = float(item.text())
-        elif item.column() == _COL_INDEX_END:
-            GetSrts()[item.row()].edited_end_time = float(item.text())
-
-    def OnSrtChange(self):
-        self.resetModel()
-        self.tableView.setModel(self.model)
-        self.populateTable()
-        total_seconds = 0
-        # TODO: if SRT has an edit, hint as such in the table view
-        for srt in GetSrts():
-
-            # if this SRT is enabled, calculate time for it
-            if srt.enabled:
-                start_time = srt.original_start_time
-                end_time = srt.original_end_time
-                # if either start or end times have been edited, use them for the calculation
-                if srt.edited_start_time:
-                    start_time = srt.edited_start_time
-                if srt.edited_end_time:
-                    end_time = srt.edited_end_time
-                total_seconds = total_seconds + (end_time - start_time)
-        self.stats_line_edit.setText(str(total_seconds / 60).split(".")[0])
+
+    def OnSrtChange(self, changes):
+        for change in changes:
+            if change.kind == SRT_CHANGE_REPLACED:
+                # a reset clears the view's selection without emitting selectionChanged
+                self.model.Reset()
+                self.controller.SetSelectedSrtRows([])
+            elif change.kind == SRT_CHANGE_APPENDED:
+                self.model.RowsAppended(change.first, change.last)
+        # every other kind repaints the same cells, so repaint each row once
+        edited = [(change.first, change.last) for change in changes if change.kind not in (SRT_CHANGE_REPLACED, SRT_CHANGE_APPENDED)]
+        for first, last in MergeRowRanges(edited):
+            self.model.RowsChanged(first, last)
+        if self.proxy.IsFiltered() and any(change.kind in (SRT_CHANGE_REPLACED, SRT_CHANGE_APPENDED) for change in changes):
+            # new or replaced rows may match the search
+            self.UpdateSearch()
+        if any(change.kind == SRT_CHANGE_REPLACED for change in changes):
+            self.OnEditSetChange()
+        else:
+            # edits to the active set change how the compared set differs from it
+            self.UpdateEditSetDiff()
+
+    def OnSrtStatsChange(self):
+        stats = self.controller.GetSrtStats()
+        self.stats_line_edit.setText(str(stats.duration / 60).split(".")[0])
+        self.stats_values["Segments"].setText(str(stats.count))
+        self.stats_values["Average"].setText(f"{stats.average:.1f}s")
+        self.stats_values["Longest gap"].setText(f"{stats.longest_gap:.1f}s")
+        size = self.controller.GetEstimatedOutputSize(stats.duration)
+        self.stats_values["Est. size"].setText("-" if size is None else f"{size / 1e6:.0f} MB")
 
 if __name__ == "__main__":
     from hyperedit_gui.model.srt import LoadSrts
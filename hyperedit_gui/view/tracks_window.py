@@ -1,10 +1,9 @@
+import os
 import sys
-from PySide6.QtWidgets import QApplication, QMainWindow, QMenuBar, QMenu, QLabel, QWidget, QHBoxLayout, QCheckBox, QVBoxLayout, QListWidget, QListWidgetItem, QGroupBox, QPushButton, QLineEdit
+from PySide6.QtWidgets import QApplication, QMainWindow, QMenuBar, QMenu, QLabel, QWidget, QHBoxLayout, QCheckBox, QVBoxLayout, QListWidget, QListWidgetItem, QGroupBox, QPushButton, QLineEdit, QSpinBox
 from PySide6.QtGui import QAction, QDoubleValidator
 from PySide6.QtCore import QCoreApplication, Qt
 
-from ffprobe import FFProbe
-from hyperedit.extract_dialog import get_audio_tracks
 from hyperedit_gui.controller import Controller
 
 class TrackWidget(QWidget):
@@ -19,6 +18,12 @@ class TrackWidget(QWidget):
         hLayout = QHBoxLayout(self)
         hLayout.setContentsMargins(8, 8, 8, 8)
         hLayout.addWidget(QLabel(f"Track {self.index}"))
+        score = self.controller.GetTrackScore(self.index)
+        if score is not None:
+            score_label = QLabel(f"{score.loudness:.0f} dB, speech {score.speech_ratio:.0%}, silent {score.silence:.0%}")
+            if score.IsLikelyVoice():
+                score_label.setText(score_label.text() + ", likely voice")
+            hLayout.addWidget(score_label)
         self.checkbox = QCheckBox()
         self.checkbox.setChecked(self.enabled)
         self.checkbox.stateChanged.connect(self.toggle_track)
@@ -27,6 +32,9 @@ class TrackWidget(QWidget):
         previewButton = QPushButton("Preview")
         previewButton.clicked.connect(self.preview_track)
         hLayout.addWidget(previewButton, alignment=Qt.AlignRight)
+        stopButton = QPushButton("Stop")
+        stopButton.clicked.connect(self.controller.StopTrackPreview)
+        hLayout.addWidget(stopButton, alignment=Qt.AlignRight)
         self.setLayout(hLayout)
 
     def toggle_track(self, state):
@@ -44,6 +52,7 @@ class TracksWindow(QWidget):
 
         self.controller.AddProjectChangeObserver(self)
         self.controller.AddMergeObserver(self)
+        self.controller.AddMediaInfoObserver(self)
 
         # Set the main window's size
         self.resize(600, 480)
@@ -54,6 +63,9 @@ class TracksWindow(QWidget):
         self.layout.addLayout(self.create_back_next_buttons())
 
         self.populateList()
+        # built after a project was opened, so catch up with it
+        if self.controller.HasProject():
+            self.OnProjectChange()
     
     def create_tracks_groupbox(self) -> QGroupBox:
         groupbox = QGroupBox("Tracks")
@@ -106,6 +118,17 @@ class TracksWindow(QWidget):
 
         self.transcribe_label = QLabel(transcribe_label_text)
         hlayout.addWidget(self.transcribe_label)
+        hlayout.addStretch()
+        share_checkbox = QCheckBox("Share between projects")
+        share_checkbox.setChecked(self.controller.GetShareTranscripts())
+        share_checkbox.stateChanged.connect(lambda s: self.controller.SetShareTranscripts(s == Qt.Checked.value))
+        hlayout.addWidget(share_checkbox)
+        hlayout.addWidget(QLabel("Workers"))
+        workers_spinbox = QSpinBox()
+        workers_spinbox.setRange(1, os.cpu_count() or 1)
+        workers_spinbox.setValue(self.controller.GetTranscribeWorkers())
+        workers_spinbox.valueChanged.connect(self.controller.SetTranscribeWorkers)
+        hlayout.addWidget(workers_spinbox)
         # self.transcribe_path_line_edit = QLineEdit("blah.srt")
         # self.transcribe_path_line_edit.setEnabled(self.controller.AreTracksMerged())
         # hlayout.addWidget(self.transcribe_path_line_edit)
@@ -182,6 +205,9 @@ class TracksWindow(QWidget):
         self.update_merge_layout()
         self.update_transcribe_hlayout()
 
+    def OnMediaInfoChange(self):
+        self.OnProjectChange()
+
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
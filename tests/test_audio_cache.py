@@ -0,0 +1,82 @@
+import os
+import struct
+import tempfile
+import unittest
+import wave
+
+import numpy as np
+
+from hyperedit_gui.media.audio_cache import ReadWav, MixWavs, GetAuditionPath
+
+class AudioCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _WriteWav(self, name, samples):
+        path = os.path.join(self.directory.name, name)
+        with wave.open(path, 'wb') as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(16000)
+            wav_file.writeframes(np.array(samples, dtype="<i2").tobytes())
+        return path
+
+    def test_read_wav_skips_other_chunks(self):
+        # ffmpeg writes a LIST chunk between fmt and data
+        data = np.array([1, -2, 3], dtype="<i2").tobytes()
+        fmt = struct.pack("<HHIIHH", 1, 1, 16000, 32000, 2, 16)
+        info = b"INFOISFT\x06\x00\x00\x00ffmpeg"
+        body = b"WAVE" + b"fmt " + struct.pack("<I", len(fmt)) + fmt + b"LIST" + struct.pack("<I", len(info)) + info \
+            + b"data" + struct.pack("<I", 0xFFFFFFFF) + data
+        path = os.path.join(self.directory.name, "list.wav")
+        with open(path, 'wb') as wav_file:
+            wav_file.write(b"RIFF" + struct.pack("<I", len(body)) + body)
+        self.assertEqual(ReadWav(path)[:, 0].tolist(), [1, -2, 3])
+
+    def _WriteChunks(self, name, chunks):
+        body = b"WAVE" + b"".join(chunk_id + struct.pack("<I", size) + data for chunk_id, size, data in chunks)
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'wb') as wav_file:
+            wav_file.write(b"RIFF" + struct.pack("<I", len(body)) + body)
+        return path
+
+    def test_read_wav_stops_at_data_size(self):
+        data = np.array([1, -2, 3], dtype="<i2").tobytes()
+        fmt = struct.pack("<HHIIHH", 1, 1, 16000, 32000, 2, 16)
+        info = b"INFOISFT\x06\x00\x00\x00ffmpeg"
+        path = self._WriteChunks("trailing.wav", [(b"fmt ", len(fmt), fmt), (b"data", len(data), data), (b"LIST", len(info), info)])
+        self.assertEqual(ReadWav(path)[:, 0].tolist(), [1, -2, 3])
+
+    def test_read_wav_without_fmt(self):
+        data = np.array([1, -2, 3], dtype="<i2").tobytes()
+        path = self._WriteChunks("no_fmt.wav", [(b"data", len(data), data)])
+        with self.assertRaises(ValueError):
+            ReadWav(path)
+
+    def test_mix_clips_and_pads(self):
+        first = self._WriteWav("0.wav", [1, 2, 30000, -30000, 5])
+        second = self._WriteWav("1.wav", [10, 20, 30000, -30000])
+        output_path = os.path.join(self.directory.name, "mix.wav")
+        MixWavs([first, second], output_path)
+        self.assertEqual(ReadWav(output_path)[:, 0].tolist(), [11, 22, 32767, -32768, 5])
+        with wave.open(output_path, 'rb') as wav_file:
+            self.assertEqual(wav_file.getframerate(), 16000)
+
+    def test_audition_path_follows_video(self):
+        video_path = os.path.join(self.directory.name, "video.mkv")
+        with open(video_path, 'wb') as video_file:
+            video_file.write(b"video")
+        audition_path = GetAuditionPath(self.directory.name, video_path, 1)
+        self.assertEqual(audition_path, GetAuditionPath(self.directory.name, video_path, 1))
+        self.assertNotEqual(audition_path, GetAuditionPath(self.directory.name, video_path, 2))
+
+        with open(video_path, 'ab') as video_file:
+            video_file.write(b"re-recorded")
+        self.assertNotEqual(audition_path, GetAuditionPath(self.directory.name, video_path, 1))
+
+if __name__ == '__main__':
+    unittest.main()
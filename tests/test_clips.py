@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+
+from hyperedit_gui.render.clips import ClipCache, ClipPlan, GetEncodeArgs, GetChecksum
+
+def _Specs(srts, encode_args):
+    return [(start, end, encode_args) for _, start, end, _ in srts]
+
+class ClipPlanTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.clip_directory = self.directory.name
+        self.video_path = os.path.join(self.clip_directory, "source.mkv")
+        with open(self.video_path, 'wb') as video_file:
+            video_file.write(b"video")
+        self.encode_args = GetEncodeArgs(True, None)
+        self.srts = [(str(i), i * 10.0, i * 10.0 + 5.0, "text") for i in range(1, 6)]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _Encode(self, clip_cache, plan):
+        for key, clip_path, start, end, _ in plan.missing:
+            with open(clip_path, 'wb') as clip_file:
+                clip_file.write(b"clip")
+            stat = os.stat(clip_path)
+            clip_cache.Put(key, clip_path, start, end, {"size": stat.st_size, "mtime": stat.st_mtime_ns, "duration": end - start,
+                                                        "checksum": GetChecksum(clip_path)})
+
+    def test_only_changed_segments_are_missing(self):
+        clip_cache = ClipCache(self.clip_directory)
+        plan = ClipPlan(clip_cache, self.video_path, _Specs(self.srts, self.encode_args))
+        self.assertEqual(len(plan.missing), 5)
+        self._Encode(clip_cache, plan)
+
+        edited = list(self.srts)
+        edited[2] = ("3", 30.5, 35.0, "text")
+        plan = ClipPlan(ClipCache(self.clip_directory), self.video_path, _Specs(edited, self.encode_args))
+        self.assertEqual([(start, end) for _, _, start, end, _ in plan.missing], [(30.5, 35.0)])
+        self.assertEqual(len(plan.clips), 5)
+
+    def test_settings_change_invalidates(self):
+        clip_cache = ClipCache(self.clip_directory)
+        self._Encode(clip_cache, ClipPlan(clip_cache, self.video_path, _Specs(self.srts, self.encode_args)))
+        plan = ClipPlan(clip_cache, self.video_path, _Specs(self.srts, GetEncodeArgs(False, None)))
+        self.assertEqual(len(plan.missing), 5)
+
+    def test_duplicate_segments_encoded_once(self):
+        plan = ClipPlan(ClipCache(self.clip_directory), self.video_path, _Specs(self.srts + self.srts[:1], self.encode_args))
+        self.assertEqual(len(plan.missing), 5)
+        self.assertEqual(plan.clips[0], plan.clips[-1])
+
+    def test_corrupt_clips_are_re_encoded(self):
+        clip_cache = ClipCache(self.clip_directory)
+        plan = ClipPlan(clip_cache, self.video_path, _Specs(self.srts, self.encode_args))
+        self._Encode(clip_cache, plan)
+
+        # truncated, deleted, and rewritten with the same size
+        with open(plan.clips[0], 'wb') as clip_file:
+            clip_file.write(b"cl")
+        os.remove(plan.clips[1])
+        with open(plan.clips[2], 'wb') as clip_file:
+            clip_file.write(b"junk")
+        os.utime(plan.clips[3], ns=(0, 0))
+
+        plan = ClipPlan(ClipCache(self.clip_directory), self.video_path, _Specs(self.srts, self.encode_args))
+        self.assertEqual([start for _, _, start, _, _ in plan.missing], [10.0, 20.0, 30.0])
+
+    def test_partials_removed(self):
+        clip_cache = ClipCache(self.clip_directory)
+        partial_path = os.path.join(self.clip_directory, "clip-0123456789abcdef.part.mp4")
+        with open(partial_path, 'wb') as clip_file:
+            clip_file.write(b"cl")
+        clip_cache.RemovePartials()
+        self.assertFalse(os.path.exists(partial_path))
+        self.assertTrue(os.path.exists(self.video_path))
+
+if __name__ == '__main__':
+    unittest.main()
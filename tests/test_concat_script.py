@@ -0,0 +1,33 @@
+import os
+import tempfile
+import unittest
+
+from hyperedit_gui.render.concat_script import WriteConcatScript, GetScriptDuration
+
+class ConcatScriptTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.script_path = os.path.join(self.directory.name, "play.ffconcat")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_entries_point_into_source(self):
+        video_path = os.path.join(self.directory.name, "it's.mkv")
+        srts = [("1", 1.5, 3.25, "one"), ("3", 10.0, 12.0, "three")]
+        WriteConcatScript(self.script_path, video_path, srts)
+        with open(self.script_path, 'r') as script_file:
+            lines = script_file.read().splitlines()
+
+        escaped = video_path.replace("'", "'\\''")
+        self.assertEqual(lines, [
+            "ffconcat version 1.0",
+            f"file '{escaped}'", "inpoint 1.500", "outpoint 3.250",
+            f"file '{escaped}'", "inpoint 10.000", "outpoint 12.000",
+        ])
+        self.assertFalse(os.path.exists(self.script_path + ".tmp"))
+        self.assertAlmostEqual(GetScriptDuration(srts), 3.75)
+
+if __name__ == '__main__':
+    unittest.main()
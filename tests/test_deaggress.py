@@ -0,0 +1,38 @@
+import unittest
+
+from hyperedit_gui.model.deaggress import DeaggressEngine
+
+class DeaggressEngineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = DeaggressEngine([
+            ("1", 1.0, 2.0, "one"),
+            ("2", 2.5, 3.0, "two"),
+            ("4", 10.0, 11.0, "four"),
+            ("5", 11.2, 12.0, "five"),
+        ])
+
+    def test_gaps_within_leading_seconds_merge(self):
+        self.assertEqual(self.engine.GetSrts(0.6), [
+            ("1", 0.4, 3.0, "one two"),
+            ("2", 9.4, 12.0, "four five"),
+        ])
+
+    def test_small_value_only_moves_starts(self):
+        self.assertEqual(self.engine.GetSrts(0.1), [
+            ("1", 0.9, 2.0, "one"),
+            ("2", 2.4, 3.0, "two"),
+            ("3", 9.9, 11.0, "four"),
+            ("4", 11.1, 12.0, "five"),
+        ])
+
+    def test_long_srt_absorbs_later_ones(self):
+        engine = DeaggressEngine([("1", 0.0, 10.0, "long"), ("2", 3.0, 4.0, "inside"), ("3", 12.0, 13.0, "after")])
+        self.assertEqual(engine.GetSrts(0.5), [("1", 0.0, 10.0, "long inside"), ("2", 11.5, 13.0, "after")])
+
+    def test_results_are_memoized(self):
+        self.assertIs(self.engine.GetSrts(1.0), self.engine.GetSrts(1.0))
+        self.assertEqual(DeaggressEngine([]).GetSrts(1.0), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+
+from hyperedit_gui.model.edit_journal import EditJournal, EditHistory, OP_EDIT, OP_UNDO, OP_REDO
+
+class EditJournalTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.journal_path = os.path.join(self.directory.name, "1.srt.journal")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_append_and_read(self):
+        journal = EditJournal(self.journal_path)
+        journal.Append(OP_EDIT, {"1": (None, None, True)}, {"1": (None, None, False)})
+        journal.Append(OP_EDIT, {"2": (None, None, True)}, {"2": (1.5, 2.0, True)})
+        self.assertEqual(len(journal), 2)
+
+        entries = EditJournal(self.journal_path).Read()
+        self.assertEqual(entries[1], (OP_EDIT, {"2": (None, None, True)}, {"2": (1.5, 2.0, True)}))
+
+    def test_torn_write_ignored(self):
+        journal = EditJournal(self.journal_path)
+        journal.Append(OP_EDIT, {"1": (None, None, True)}, {"1": (None, None, False)})
+        with open(self.journal_path, 'a') as journal_file:
+            journal_file.write('{"op": "edit", "bef')
+        self.assertEqual(len(EditJournal(self.journal_path).Read()), 1)
+
+        journal = EditJournal(self.journal_path)
+        journal.Append(OP_EDIT, {"2": (None, None, True)}, {"2": (None, None, False)})
+        entries = EditJournal(self.journal_path).Read()
+        self.assertEqual([entry[2] for entry in entries], [{"1": (None, None, False)}, {"2": (None, None, False)}])
+
+    def test_clear(self):
+        journal = EditJournal(self.journal_path)
+        journal.Append(OP_EDIT, {}, {})
+        journal.Clear()
+        self.assertEqual(len(journal), 0)
+        self.assertFalse(os.path.exists(self.journal_path))
+
+class EditHistoryTest(unittest.TestCase):
+
+    def test_replay(self):
+        entries = [
+            (OP_EDIT, {"1": (None, None, True)}, {"1": (None, None, False)}),
+            (OP_EDIT, {"2": (None, None, True)}, {"2": (None, None, False)}),
+            (OP_UNDO, {"2": (None, None, False)}, {"2": (None, None, True)}),
+        ]
+        history = EditHistory()
+        edits = history.Replay(entries)
+        self.assertEqual(edits, {"1": (None, None, False), "2": (None, None, True)})
+        self.assertTrue(history.CanRedo())
+
+        before, after = history.Redo()
+        self.assertEqual(after, {"2": (None, None, False)})
+        self.assertFalse(history.CanRedo())
+
+    def test_edit_clears_redo(self):
+        history = EditHistory()
+        history.Push({"1": (None, None, True)}, {"1": (None, None, False)})
+        history.Undo()
+        history.Push({"2": (None, None, True)}, {"2": (None, None, False)})
+        self.assertFalse(history.CanRedo())
+        self.assertIsNone(history.Redo())
+
+    def test_entries_keep_newest_undo_and_redo(self):
+        history = EditHistory()
+        for i in range(6):
+            history.Push({str(i): (None, None, True)}, {str(i): (None, None, False)})
+        history.Undo()
+        history.Undo()
+
+        rebuilt = EditHistory()
+        rebuilt.Replay(history.GetEntries(6))
+        # both redos and the newest two undos, oldest first
+        self.assertEqual(rebuilt.Redo(), history.Redo())
+        self.assertEqual(rebuilt.Redo(), history.Redo())
+        self.assertIsNone(rebuilt.Redo())
+        for _ in range(4):
+            self.assertEqual(rebuilt.Undo(), history.Undo())
+        self.assertIsNone(rebuilt.Undo())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+
+from hyperedit_gui.render.clips import BuildClipCommand
+from hyperedit_gui.render.fast_cut import SnapToKeyframe, SplitSmartCut, GetCopyArgs
+
+_KEYFRAMES = [0.0, 2.0, 4.0, 6.0, 8.0]
+
+class FastCutTest(unittest.TestCase):
+
+    def test_snap_to_keyframe(self):
+        self.assertEqual(SnapToKeyframe(_KEYFRAMES, 3.5), 2.0)
+        self.assertEqual(SnapToKeyframe(_KEYFRAMES, 4.0), 4.0)
+        self.assertEqual(SnapToKeyframe(_KEYFRAMES, 9.0), 8.0)
+        self.assertEqual(SnapToKeyframe([1.0], 0.5), 0.0)
+
+    def test_smart_cut_head_and_tail(self):
+        self.assertEqual(SplitSmartCut(_KEYFRAMES, 1.5, 6.5),
+                         [(1.5, 2.0, False), (2.0, 6.0, True), (6.0, 6.5, False)])
+
+    def test_smart_cut_on_keyframes(self):
+        self.assertEqual(SplitSmartCut(_KEYFRAMES, 2.0, 6.0), [(2.0, 6.0, True)])
+
+    def test_smart_cut_within_gop(self):
+        self.assertEqual(SplitSmartCut(_KEYFRAMES, 2.5, 3.5), [(2.5, 3.5, False)])
+        self.assertEqual(SplitSmartCut(_KEYFRAMES, 1.5, 2.5), [(1.5, 2.5, False)])
+
+    def test_copy_start_is_not_rounded_below_keyframe(self):
+        keyframes = [0.0, 10.3103, 20.6206]
+        for start, end, copy in SplitSmartCut(keyframes, 9.0, 21.0):
+            if not copy:
+                continue
+            command = BuildClipCommand("source.mkv", start, end, GetCopyArgs(), "clip.ts")
+            seek = float(command[command.index("-ss") + 1])
+            self.assertGreaterEqual(seek, keyframes[1])
+            self.assertLess(seek, keyframes[1] + 0.001)
+
+        start = SnapToKeyframe(keyframes, 12.0)
+        command = BuildClipCommand("source.mkv", start, 15.0, GetCopyArgs(), "clip.ts")
+        self.assertGreaterEqual(float(command[command.index("-ss") + 1]), keyframes[1])
+
+if __name__ == '__main__':
+    unittest.main()
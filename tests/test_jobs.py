@@ -0,0 +1,82 @@
+import threading
+import time
+import unittest
+
+from PySide6.QtCore import QCoreApplication
+
+from hyperedit_gui.job.jobs import Job, JobQueue, JOB_CANCELLED, JOB_FAILED, JOB_FINISHED
+
+def _Wait(queue, timeout=5):
+    deadline = time.time() + timeout
+    while queue.GetJobs() and time.time() < deadline:
+        QCoreApplication.processEvents()
+        time.sleep(0.01)
+    QCoreApplication.processEvents()
+
+class JobQueueTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def test_finished_on_gui_thread(self):
+        queue = JobQueue()
+        results = []
+        job = Job("add", lambda job, a, b: a + b, 1, 2,
+                  on_finished=lambda result: results.append((result, threading.current_thread())))
+        queue.Submit(job)
+        _Wait(queue)
+        self.assertEqual(job.state, JOB_FINISHED)
+        self.assertEqual(results, [(3, threading.main_thread())])
+
+    def test_failed(self):
+        def work(job):
+            raise ValueError("broken")
+        queue = JobQueue()
+        job = queue.Submit(Job("fail", work))
+        _Wait(queue)
+        self.assertEqual(job.state, JOB_FAILED)
+        self.assertEqual(job.error, "broken")
+
+    def test_cancel(self):
+        started = threading.Event()
+        def work(job):
+            started.set()
+            while True:
+                job.SetProgress(0.5)
+                time.sleep(0.01)
+        queue = JobQueue()
+        job = queue.Submit(Job("loop", work))
+        queued = queue.Submit(Job("queued", lambda job: None))
+        started.wait(5)
+        queue.CancelAll()
+        _Wait(queue)
+        self.assertEqual(job.state, JOB_CANCELLED)
+        self.assertEqual(queued.state, JOB_CANCELLED)
+
+    def test_failed_and_cancelled_callbacks(self):
+        release = threading.Event()
+        def work(job):
+            release.wait(5)
+            raise ValueError("broken")
+        queue = JobQueue()
+        errors = []
+        cancelled = []
+        queue.Submit(Job("fail", work, on_failed=errors.append))
+        queued = queue.Submit(Job("queued", lambda job: None, on_cancelled=lambda: cancelled.append(True)))
+        queue.Cancel(queued)
+        release.set()
+        _Wait(queue)
+        self.assertEqual(errors, ["broken"])
+        self.assertEqual(cancelled, [True])
+
+    def test_serial_order(self):
+        queue = JobQueue()
+        order = []
+        for i in range(5):
+            queue.Submit(Job(f"job {i}", lambda job, i: order.append(i), i))
+        _Wait(queue)
+        self.assertEqual(order, [0, 1, 2, 3, 4])
+
+if __name__ == '__main__':
+    unittest.main()
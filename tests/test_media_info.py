@@ -0,0 +1,92 @@
+import os
+import tempfile
+import unittest
+
+from hyperedit_gui.media.media_info import MediaInfo, MediaInfoCache, ParseProbe, GetVideoIdentity
+from hyperedit_gui.model.project_database import ProjectDatabase
+
+_IDENTITY = ["video.mp4", 1000, 5]
+
+_PROBE = {
+    "streams": [
+        {"index": 0, "codec_type": "video", "codec_name": "h264", "width": 1920, "height": 1080, "avg_frame_rate": "30000/1001", "pix_fmt": "yuv420p"},
+        {"index": 1, "codec_type": "audio", "codec_name": "aac", "channels": 2, "sample_rate": "48000", "tags": {"title": "Game"}},
+        {"index": 2, "codec_type": "audio", "codec_name": "aac", "channels": 1, "sample_rate": "48000", "tags": {"title": "Mic"}},
+    ],
+    "format": {"duration": "62.500000"},
+}
+
+class ParseProbeTest(unittest.TestCase):
+
+    def test_streams_and_duration(self):
+        info = ParseProbe(_IDENTITY, _PROBE)
+        self.assertEqual(info.video_identity, _IDENTITY)
+        self.assertEqual(info.duration, 62.5)
+        self.assertAlmostEqual(info.frame_rate, 29.97, places=2)
+        self.assertEqual(info.GetVideoStream()["codec_name"], "h264")
+        self.assertEqual([stream["tags"]["title"] for stream in info.GetAudioStreams()], ["Game", "Mic"])
+        self.assertEqual(info.keyframes, [])
+
+    def test_missing_audio_streams(self):
+        info = ParseProbe(_IDENTITY, {"streams": _PROBE["streams"][:1], "format": _PROBE["format"]})
+        self.assertEqual(info.GetAudioStreams(), [])
+        self.assertEqual(info.GetVideoStream()["tags"], {})
+
+    def test_duration_only_in_format(self):
+        # streams of some containers carry no duration of their own
+        info = ParseProbe(_IDENTITY, {"streams": [{"codec_type": "video", "avg_frame_rate": "25/1"}], "format": {"duration": "10.0"}})
+        self.assertEqual(info.duration, 10.0)
+        self.assertEqual(info.frame_rate, 25.0)
+
+    def test_nothing_probed(self):
+        info = ParseProbe(_IDENTITY, {})
+        self.assertEqual((info.streams, info.duration, info.frame_rate), ([], 0.0, 0.0))
+        self.assertIsNone(info.GetVideoStream())
+        self.assertEqual(ParseProbe(_IDENTITY, {"streams": [{"codec_type": "video", "avg_frame_rate": "0/0"}]}).frame_rate, 0.0)
+
+class MediaInfoCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.video_path = os.path.join(self.directory.name, "video.mp4")
+        with open(self.video_path, 'wb') as video_file:
+            video_file.write(b"\0" * 100)
+        self.database = ProjectDatabase(":memory:")
+        self.cache = MediaInfoCache(self.database)
+
+    def tearDown(self):
+        self.database.Close()
+        self.directory.cleanup()
+
+    def _Put(self):
+        info = ParseProbe(GetVideoIdentity(self.video_path), _PROBE)
+        info.keyframes = [0.0, 2.0]
+        self.cache.Put(info)
+
+    def test_hit(self):
+        self.assertIsNone(self.cache.Get(self.video_path))
+        self._Put()
+        info = self.cache.Get(self.video_path)
+        self.assertIsInstance(info, MediaInfo)
+        self.assertEqual((info.duration, info.keyframes), (62.5, [0.0, 2.0]))
+        self.assertEqual(len(info.GetAudioStreams()), 2)
+
+    def test_size_change_invalidates(self):
+        self._Put()
+        with open(self.video_path, 'ab') as video_file:
+            video_file.write(b"\0")
+        self.assertIsNone(self.cache.Get(self.video_path))
+
+    def test_mtime_change_invalidates(self):
+        self._Put()
+        stat = os.stat(self.video_path)
+        os.utime(self.video_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+        self.assertIsNone(self.cache.Get(self.video_path))
+
+    def test_missing_video(self):
+        self._Put()
+        os.remove(self.video_path)
+        self.assertIsNone(self.cache.Get(self.video_path))
+
+if __name__ == '__main__':
+    unittest.main()
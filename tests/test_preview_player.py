@@ -0,0 +1,78 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from PySide6.QtCore import QCoreApplication
+from PySide6.QtNetwork import QLocalServer
+
+from hyperedit_gui.media.preview_player import BuildSegmentCommands, PreviewPlayer
+
+class _RunningProcess:
+    def poll(self):
+        return None
+
+class PreviewPlayerTest(unittest.TestCase):
+
+    def test_first_segment_loads_file(self):
+        commands = BuildSegmentCommands("video.mkv", 12.5, 14.0, True)
+        self.assertIn(["loadfile", "video.mkv", "replace"], commands)
+        self.assertIn(["set_property", "start", "12.5"], commands)
+        self.assertEqual(commands[-1], ["set_property", "pause", False])
+
+    def test_later_segments_seek(self):
+        commands = BuildSegmentCommands("video.mkv", 30.0, 31.5, False)
+        self.assertNotIn("loadfile", [command[0] for command in commands])
+        self.assertIn(["seek", 30.0, "absolute+exact"], commands)
+        self.assertIn(["set_property", "ab-loop-b", 31.5], commands)
+
+class PreviewPlayerIpcTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.player = PreviewPlayer()
+        self.player.ipc_path = os.path.join(self.directory.name, "mpv.sock")
+        # as if mpv had just been started and has not opened its socket yet
+        self.player._process = _RunningProcess()
+        self.player._connect_deadline = time.monotonic() + 5
+        self.server = QLocalServer()
+        self.received = b""
+
+    def tearDown(self):
+        self.player._CloseSocket()
+        self.server.close()
+        self.directory.cleanup()
+
+    def _OnNewConnection(self):
+        connection = self.server.nextPendingConnection()
+        def OnReadyRead():
+            self.received += bytes(connection.readAll())
+            connection.write(b'{"error": "success"}\n')
+        connection.readyRead.connect(OnReadyRead)
+
+    def _Receive(self, count, timeout=5):
+        deadline = time.time() + timeout
+        while self.received.count(b"\n") < count and time.time() < deadline:
+            QCoreApplication.processEvents()
+            time.sleep(0.01)
+        return [json.loads(line)["command"] for line in self.received.splitlines()]
+
+    def test_commands_queue_until_mpv_listens(self):
+        began = time.monotonic()
+        self.player._Send([["set_property", "pause", False]])
+        self.player._Send([["seek", 3.0, "absolute+exact"]])
+        # nothing is listening, yet sending did not wait
+        self.assertLess(time.monotonic() - began, 0.5)
+        self.server.newConnection.connect(self._OnNewConnection)
+        self.assertTrue(self.server.listen(self.player.ipc_path))
+        self.assertEqual(self._Receive(2), [["set_property", "pause", False], ["seek", 3.0, "absolute+exact"]])
+        self.player._Send([["quit"]])
+        self.assertEqual(self._Receive(3)[-1], ["quit"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from hyperedit_gui.model.project_database import ProjectDatabase, DEFAULT_EDIT_SET_NAME
+from hyperedit_gui.model.edit_journal import OP_EDIT, OP_UNDO
+from hyperedit_gui.model.edit_set_diff import EditSetDiff
+
+_SRTS = [("1", 0.0, 1.0, "one"), ("2", 1.5, 2.5, "two"), ("3", 3.0, 4.0, "three")]
+
+class ProjectDatabaseTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.database_path = os.path.join(self.directory.name, "project.db")
+        self.database = ProjectDatabase(self.database_path)
+
+    def tearDown(self):
+        self.database.Close()
+        self.directory.cleanup()
+
+    def _Reopen(self):
+        self.database.Close()
+        self.database = ProjectDatabase(self.database_path)
+
+    def test_project_values(self):
+        self.assertTrue(self.database.IsEmpty())
+        self.database.SetProjectValues({"name": "test", "tracks": [True, False]})
+        self.database.SetProjectValues({"tracks": [False, True]})
+        self._Reopen()
+        self.assertFalse(self.database.IsEmpty())
+        self.assertEqual(self.database.GetProjectValues(), {"name": "test", "tracks": [False, True]})
+
+    def test_wal_mode(self):
+        journal_mode = self.database._connection.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(journal_mode, "wal")
+
+    def test_media_identity(self):
+        self.database.PutMedia(["video.mp4", 10, 20], {"duration": 1})
+        self.assertEqual(self.database.GetMedia(["video.mp4", 10, 20]), {"duration": 1})
+        self.assertIsNone(self.database.GetMedia(["video.mp4", 11, 20]))
+
+    def test_transcript_keeps_id_and_edits_when_replaced(self):
+        edit_set_id = self.database.PutTranscript("1.srt", 5, _SRTS)
+        edit_set_id = self.database.GetActiveEditSet(edit_set_id)
+        self.assertEqual(self.database.GetEditSets(edit_set_id), [(edit_set_id, DEFAULT_EDIT_SET_NAME)])
+        self.database.PutEdits(edit_set_id, {"2": (None, None, False)})
+        self.assertEqual(self.database.PutTranscript("1.srt", 6, _SRTS[:2]), edit_set_id)
+        self.assertEqual(self.database.GetTranscript("1.srt"), (edit_set_id, 6))
+        self.assertEqual(self.database.GetSegments(edit_set_id), _SRTS[:2])
+        self.assertEqual(self.database.GetActiveEditSet(edit_set_id), edit_set_id)
+        self.assertEqual(self.database.GetEdits(edit_set_id), {"2": (None, None, False)})
+
+    def test_unedited_rows_are_not_stored(self):
+        edit_set_id = self.database.GetActiveEditSet(self.database.PutTranscript("1.srt", 5, _SRTS))
+        self.database.ApplyEdits(edit_set_id, OP_EDIT, {"1": (None, None, True)}, {"1": (0.5, None, True)})
+        self.assertEqual(self.database.GetEdits(edit_set_id), {"1": (0.5, None, True)})
+        self.database.ApplyEdits(edit_set_id, OP_UNDO, {"1": (0.5, None, True)}, {"1": (None, None, True)})
+        self.assertEqual(self.database.GetEdits(edit_set_id), {})
+        self.assertEqual(self.database.GetEditLog(edit_set_id), [
+            (OP_EDIT, {"1": (None, None, True)}, {"1": (0.5, None, True)}),
+            (OP_UNDO, {"1": (0.5, None, True)}, {"1": (None, None, True)}),
+        ])
+        self.database.ClearEditLog(edit_set_id)
+        self.assertEqual(self.database.GetEditLogLength(edit_set_id), 0)
+
+    def test_edit_sets_are_sparse_copies(self):
+        transcript_id = self.database.PutTranscript("1.srt", 5, _SRTS)
+        full = self.database.GetActiveEditSet(transcript_id)
+        self.database.PutEdits(full, {"1": (0.5, None, True)})
+        short = self.database.AddEditSet(transcript_id, "short", copy_from=full)
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.database.AddEditSet(transcript_id, "short")
+        self.database.PutEdits(short, {"2": (None, None, False), "3": (3.5, None, True)})
+        self.database.PutEdits(full, {"3": (None, None, False)})
+        self.assertEqual(self.database.GetEdits(short), {"1": (0.5, None, True), "2": (None, None, False), "3": (3.5, None, True)})
+
+        changes = self.database.GetEditSetDiff(full, short)
+        self.assertEqual(changes, {"2": ((None, None, True), (None, None, False)), "3": ((None, None, False), (3.5, None, True))})
+        diff = EditSetDiff(changes)
+        self.assertEqual((diff.enabled, diff.disabled, diff.retimed), (["3"], ["2"], []))
+        self.assertEqual(diff.GetRenderIds(), ["3"])
+        self.assertEqual(EditSetDiff(self.database.GetEditSetDiff(short, full)).disabled, ["3"])
+
+        self.database.SetActiveEditSet(transcript_id, short)
+        self.database.RemoveEditSet(full)
+        self.assertEqual(self.database.GetEditSets(transcript_id), [(short, "short")])
+        self.assertEqual(self.database.GetEdits(full), {})
+
+    def test_transcript_current(self):
+        self.assertFalse(self.database.IsTranscriptCurrent("3.srt", 3))
+        self.database.PutTranscript("3.srt", 5, _SRTS)
+        # no recorded source, so it is trusted
+        self.assertTrue(self.database.IsTranscriptCurrent("3.srt", 3))
+        self.database.PutTrackSet(3, [100, 1])
+        self.database.SetTranscriptSource("3.srt", 3, [100, 1])
+        self.assertTrue(self.database.IsTrackSetMerged(3))
+        self.assertTrue(self.database.IsTranscriptCurrent("3.srt", 3))
+        # merged again after transcribing
+        self.database.PutTrackSet(3, [100, 2])
+        self.assertFalse(self.database.IsTranscriptCurrent("3.srt", 3))
+
+    def test_render_artifacts(self):
+        self.database.PutRenderArtifact("key", "render-key.mp4", 6)
+        self.assertEqual(self.database.GetRenderArtifact("key"), ("render-key.mp4", 6))
+        self.database.RemoveRenderArtifact("key")
+        self.assertIsNone(self.database.GetRenderArtifact("key"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+from hyperedit_gui.model.recent_project_index import RecentProjectIndex, ReadRecentProjectEntry, ReadRecentProjectEntries, \
+    RECENT_PROJECT_PENDING, RECENT_PROJECT_OK, RECENT_PROJECT_MISSING, RECENT_PROJECT_INVALID, RECENT_PROJECT_VIDEO_MISSING
+
+class _Job:
+    def __init__(self):
+        self.partials = []
+
+    def SetProgress(self, fraction, message=""):
+        pass
+
+    def EmitPartial(self, result):
+        self.partials.append(result)
+
+class RecentProjectIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.video_path = os.path.join(self.directory, "video.mp4")
+        with open(self.video_path, 'wb') as video_file:
+            video_file.write(b"\0")
+        self.project_path = self._WriteProject("project", "alpha", self.video_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _WriteProject(self, directory, name, video_path):
+        project_path = os.path.join(self.directory, directory, "project.json")
+        os.makedirs(os.path.dirname(project_path), exist_ok=True)
+        with open(project_path, 'w') as project_file:
+            json.dump({"name": name, "video_file": video_path, "tracks": None}, project_file)
+        return project_path
+
+    def test_read_entry(self):
+        entry = ReadRecentProjectEntry(self.project_path)
+        self.assertEqual((entry.name, entry.video_path, entry.status), ("alpha", self.video_path, RECENT_PROJECT_OK))
+        self.assertTrue(entry.IsOpenable())
+
+        os.remove(self.video_path)
+        self.assertEqual(ReadRecentProjectEntry(self.project_path, entry).status, RECENT_PROJECT_VIDEO_MISSING)
+
+        os.remove(self.project_path)
+        missing = ReadRecentProjectEntry(self.project_path, entry)
+        self.assertEqual((missing.name, missing.status), ("alpha", RECENT_PROJECT_MISSING))
+        self.assertFalse(missing.IsOpenable())
+
+        with open(self.project_path, 'w') as project_file:
+            project_file.write("{")
+        self.assertEqual(ReadRecentProjectEntry(self.project_path, entry).status, RECENT_PROJECT_INVALID)
+
+    def test_unchanged_project_is_not_parsed(self):
+        entry = ReadRecentProjectEntry(self.project_path)
+        entry.name = "cached"
+        self.assertEqual(ReadRecentProjectEntry(self.project_path, entry).name, "cached")
+
+        stat = os.stat(self.project_path)
+        os.utime(self.project_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+        self.assertEqual(ReadRecentProjectEntry(self.project_path, entry).name, "alpha")
+
+    def test_read_entries_emits_each(self):
+        other_path = self._WriteProject("other", "beta", self.video_path)
+        index = RecentProjectIndex(os.path.join(self.directory, "index.json"))
+        paths = [self.project_path, other_path, os.path.join(self.directory, "gone", "project.json")]
+        job = _Job()
+        entries = ReadRecentProjectEntries(job, [index.Get(path) for path in paths])
+        self.assertEqual(len(job.partials), 3)
+        self.assertEqual({entry.project_path: entry.status for entry in entries},
+                         {self.project_path: RECENT_PROJECT_OK, other_path: RECENT_PROJECT_OK, paths[2]: RECENT_PROJECT_MISSING})
+
+    def test_index_round_trip(self):
+        index_path = os.path.join(self.directory, "cache", "index.json")
+        index = RecentProjectIndex(index_path)
+        self.assertEqual(index.Get(self.project_path).status, RECENT_PROJECT_PENDING)
+        index.Put(ReadRecentProjectEntry(self.project_path))
+        index.Put(ReadRecentProjectEntry(os.path.join(self.directory, "dropped.json")))
+        index.Save([self.project_path])
+
+        reloaded = RecentProjectIndex(index_path)
+        self.assertEqual(reloaded.Get(self.project_path).name, "alpha")
+        self.assertEqual(reloaded.Get(os.path.join(self.directory, "dropped.json")).status, RECENT_PROJECT_PENDING)
+
+        with open(index_path, 'w') as index_file:
+            index_file.write("[")
+        self.assertEqual(RecentProjectIndex(index_path).Get(self.project_path).status, RECENT_PROJECT_PENDING)
+
+if __name__ == '__main__':
+    unittest.main()
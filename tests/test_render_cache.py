@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+
+from hyperedit_gui.model.project_database import ProjectDatabase
+from hyperedit_gui.render.render_cache import RenderCache, GetRenderKey, ReadRenderIndexFile
+
+class RenderCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.clip_directory = self.directory.name
+        self.video_path = os.path.join(self.clip_directory, "source.mkv")
+        with open(self.video_path, 'wb') as video_file:
+            video_file.write(b"video")
+        self.database = ProjectDatabase(":memory:")
+
+    def tearDown(self):
+        self.database.Close()
+        self.directory.cleanup()
+
+    def _WriteOutput(self, name, content=b"render"):
+        output_path = os.path.join(self.clip_directory, name)
+        with open(output_path, 'wb') as output_file:
+            output_file.write(content)
+        return output_path
+
+    def test_key_depends_on_settings(self):
+        key = GetRenderKey("hash", self.video_path, ["encode", True, "apple"])
+        self.assertEqual(key, GetRenderKey("hash", self.video_path, ["encode", True, "apple"]))
+        self.assertNotEqual(key, GetRenderKey("hash", self.video_path, ["encode", False, "apple"]))
+        self.assertNotEqual(key, GetRenderKey("hash", self.video_path, ["encode", True, None]))
+        self.assertNotEqual(key, GetRenderKey("other", self.video_path, ["encode", True, "apple"]))
+
+    def test_put_and_get(self):
+        cache = RenderCache(self.clip_directory, self.database)
+        self.assertIsNone(cache.Get("key"))
+
+        cached_path = cache.Put("key", self._WriteOutput("final.mp4"))
+        self.assertTrue(cached_path.endswith(".mp4"))
+        self.assertEqual(cache.Get("key"), cached_path)
+
+        # a new cache instance reads the index back
+        self.assertEqual(RenderCache(self.clip_directory, self.database).Get("key"), cached_path)
+
+    def test_changed_output_is_evicted(self):
+        cache = RenderCache(self.clip_directory, self.database)
+        cached_path = cache.Put("key", self._WriteOutput("final.mp4"))
+        with open(cached_path, 'ab') as output_file:
+            output_file.write(b"truncated render")
+        self.assertIsNone(cache.Get("key"))
+        self.assertIsNone(self.database.GetRenderArtifact("key"))
+
+    def test_read_index_file(self):
+        self.assertEqual(ReadRenderIndexFile(self.clip_directory), {})
+        with open(os.path.join(self.clip_directory, "render_cache.json"), 'w') as index_file:
+            index_file.write('{"key": {"file": "render-key.mp4", "size": 6}}')
+        self.assertEqual(ReadRenderIndexFile(self.clip_directory), {"key": ("render-key.mp4", 6)})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+import os
+import subprocess
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from hyperedit_gui.job.jobs import Job
+from hyperedit_gui.media.media_info import MediaInfo
+from hyperedit_gui.render.renderer import GetClipSpecs, GetJoinCommands, RenderSrts, RenderSettings, RENDER_MODE_ENCODE, RENDER_MODE_SMART
+
+_SRTS = [("1", 1.5, 6.5, "one")]
+_MEDIA_INFO = MediaInfo(["video.mp4", 1, 2], [{"codec_type": "video", "codec_name": "h264", "pix_fmt": "yuv420p"}], 10.0, 25.0, [0.0, 2.0, 4.0, 6.0, 8.0])
+
+def _GetArg(args, name):
+    return args[args.index(name) + 1]
+
+def _DescribeClip(clip_path, start, end):
+    return {"size": os.path.getsize(clip_path), "mtime": os.stat(clip_path).st_mtime_ns, "duration": end - start, "checksum": ""}
+
+class _StubFfmpegJob(Job):
+    """
+    Runs ffmpeg commands by writing their output after a delay given per clip start. Clips hold their
+    start, and the job records how many ran at once and the clips the concat list held
+    """
+    def __init__(self, delays, failing_start=None) -> None:
+        super().__init__("render", None)
+        self.delays = delays
+        self.failing_start = failing_start
+        self.started = []
+        self.finished = []
+        self.running = 0
+        self.most_running = 0
+        self.concatenated = None
+        self._stub_lock = threading.Lock()
+
+    def Run(self, cmd, **kwargs):
+        output_path = cmd[-1]
+        if "concat" in cmd:
+            with open(_GetArg(cmd, "-i")) as concat_file:
+                self.concatenated = [line.split("'")[1] for line in concat_file]
+        else:
+            start = float(_GetArg(cmd, "-ss"))
+            with self._stub_lock:
+                self.started.append(start)
+                self.running += 1
+                self.most_running = max(self.most_running, self.running)
+            try:
+                deadline = time.time() + self.delays.get(start, 0)
+                while time.time() < deadline:
+                    self.CheckCancelled()
+                    time.sleep(0.005)
+                if start == self.failing_start:
+                    raise subprocess.CalledProcessError(1, cmd)
+                with open(output_path, 'w') as output_file:
+                    output_file.write(str(start))
+                self.finished.append(start)
+            finally:
+                with self._stub_lock:
+                    self.running -= 1
+            return 0
+        with open(output_path, 'w') as output_file:
+            output_file.write("render")
+        return 0
+
+class RendererTest(unittest.TestCase):
+
+    def test_smart_pieces_are_mpegts_in_the_source_codec(self):
+        clip_specs = GetClipSpecs(_SRTS, RenderSettings(RENDER_MODE_SMART), _MEDIA_INFO)
+        self.assertEqual([(start, end) for start, end, _ in clip_specs], [(1.5, 2.0), (2.0, 6.0), (6.0, 6.5)])
+        self.assertEqual([_GetArg(args, "-c:v") for _, _, args in clip_specs], ["libx264", "copy", "libx264"])
+        self.assertEqual([_GetArg(args, "-f") for _, _, args in clip_specs], ["mpegts"] * 3)
+        self.assertEqual(_GetArg(clip_specs[0][2], "-pix_fmt"), "yuv420p")
+
+    def test_smart_pieces_are_joined_as_mpegts_then_remuxed(self):
+        concat, remux = GetJoinCommands("list.txt", "joined.ts", "output.mp4", RenderSettings(RENDER_MODE_SMART), _MEDIA_INFO)
+        self.assertEqual(_GetArg(concat, "-i"), "list.txt")
+        self.assertEqual(_GetArg(concat, "-c"), "copy")
+        self.assertEqual(concat[-3:], ["-f", "mpegts", "joined.ts"])
+        self.assertEqual(_GetArg(remux, "-i"), "joined.ts")
+        self.assertEqual(_GetArg(remux, "-c"), "copy")
+        # parameter sets may change in band
+        self.assertEqual(_GetArg(remux, "-tag:v"), "avc3")
+        self.assertEqual(remux[-1], "output.mp4")
+
+        hevc = MediaInfo(["video.mp4", 1, 2], [{"codec_type": "video", "codec_name": "hevc"}], 10.0, 25.0, [])
+        _, remux = GetJoinCommands("list.txt", "joined.ts", "output.mp4", RenderSettings(RENDER_MODE_SMART), hevc)
+        self.assertEqual(_GetArg(remux, "-tag:v"), "hev1")
+
+    def test_encoded_clips_are_concatenated_directly(self):
+        commands = GetJoinCommands("list.txt", "joined.ts", "output.mp4", RenderSettings(RENDER_MODE_ENCODE))
+        self.assertEqual(len(commands), 1)
+        self.assertEqual(commands[0][-1], "output.mp4")
+        self.assertNotIn("mpegts", commands[0])
+
+@mock.patch("hyperedit_gui.render.renderer.DescribeClip", _DescribeClip)
+class EncodeClipsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.video_path = os.path.join(self.directory.name, "video.mp4")
+        with open(self.video_path, 'w') as video_file:
+            video_file.write("video")
+        self.srts = [(str(i), float(i), i + 0.5, "") for i in range(6)]
+        self.output_path = os.path.join(self.directory.name, "render.part.mp4")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _Render(self, job, workers=2):
+        return RenderSrts(job, self.srts, self.video_path, self.directory.name, RenderSettings(RENDER_MODE_ENCODE, workers=workers, threads=1), self.output_path)
+
+    def test_at_most_workers_encodes_at_once(self):
+        job = _StubFfmpegJob({float(i): 0.05 for i in range(6)})
+        self._Render(job, workers=2)
+        self.assertEqual(len(job.started), 6)
+        self.assertEqual(job.most_running, 2)
+
+    def test_clips_are_concatenated_in_srt_order(self):
+        # the first clips take longest, so they finish last
+        job = _StubFfmpegJob({0.0: 0.2, 1.0: 0.15, 2.0: 0.1})
+        self.assertEqual(self._Render(job, workers=3), self.output_path)
+        self.assertNotEqual(job.finished, sorted(job.finished))
+        starts = []
+        for clip_path in job.concatenated:
+            with open(clip_path) as clip_file:
+                starts.append(float(clip_file.read()))
+        self.assertEqual(starts, [0.0, 1.0, 2.0, 3.0, 4.0, 5.0])
+
+    def test_failed_clip_cancels_the_rest(self):
+        job = _StubFfmpegJob({0.0: 5.0}, failing_start=1.0)
+        began = time.time()
+        with self.assertRaises(subprocess.CalledProcessError):
+            self._Render(job, workers=2)
+        # the slow clip was stopped rather than waited for, and no queued clip was started
+        self.assertLess(time.time() - began, 2.0)
+        self.assertTrue(job.IsCancelled())
+        self.assertEqual(sorted(job.started), [0.0, 1.0])
+        self.assertIsNone(job.concatenated)
+
+if __name__ == '__main__':
+    unittest.main()
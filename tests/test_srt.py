@@ -0,0 +1,69 @@
+import sqlite3
+import unittest
+from unittest import mock
+
+from hyperedit_gui.model import srt
+from hyperedit_gui.model.project_database import ProjectDatabase
+
+_SRTS = [("1", 0.0, 1.0, "one"), ("2", 1.5, 2.5, "two"), ("3", 3.0, 4.0, "three")]
+# the transcript is read from the database, the file itself is never opened
+_SRT_FILE_PATH = "/nonexistent/1.srt"
+
+class SrtTest(unittest.TestCase):
+
+    def setUp(self):
+        self.database = ProjectDatabase(":memory:")
+        self.database.PutTranscript("1.srt", 5, _SRTS)
+        srt.SetSrtDatabase(self.database)
+        srt.LoadSrts(_SRT_FILE_PATH)
+
+    def tearDown(self):
+        srt.SetSrtDatabase(None)
+        self.database.Close()
+
+    def test_switching_to_a_project_without_srts_clears_them(self):
+        other_database = ProjectDatabase(":memory:")
+        try:
+            srt.SetSrtDatabase(other_database)
+            self.assertEqual(len(srt.GetSrts()), 0)
+            self.assertFalse(srt.IsSrtsEditable())
+            self.assertIsNone(srt.GetLoadedSrtFilePath())
+            self.assertEqual(srt.UndoEdit(), [])
+        finally:
+            srt.SetSrtDatabase(None)
+            other_database.Close()
+
+    def test_failed_write_leaves_srts_and_history(self):
+        srt.EditSrts({"1": (None, None, False)})
+        self.database.Close()
+        with self.assertRaises(sqlite3.ProgrammingError):
+            srt.EditSrts({"2": (None, None, False)})
+        self.assertTrue(srt.GetSrtById("2").enabled)
+        with self.assertRaises(sqlite3.ProgrammingError):
+            srt.UndoEdit()
+        self.assertFalse(srt.GetSrtById("1").enabled)
+        self.assertEqual(srt._HISTORY_SINGLETON.PeekUndo(), ({"1": (None, None, True)}, {"1": (None, None, False)}))
+
+    def test_edits_are_stored(self):
+        srt.EditSrts({"1": (None, None, False)})
+        self.assertEqual(self.database.GetEdits(self.database.GetActiveEditSet(1)), {"1": (None, None, False)})
+        self.assertEqual(srt.UndoEdit(), ["1"])
+        self.assertTrue(srt.GetSrtById("1").enabled)
+        self.assertEqual(srt.RedoEdit(), ["1"])
+        self.assertFalse(srt.GetSrtById("1").enabled)
+
+    def test_compacted_log_keeps_newest_undo(self):
+        with mock.patch.object(srt, "_COMPACT_THRESHOLD", 4):
+            for i in range(5):
+                srt.EditSrts({"1": (float(i), None, True)})
+            edit_set_id = self.database.GetActiveEditSet(1)
+            self.assertLess(self.database.GetEditLogLength(edit_set_id), 4)
+            srt.LoadSrts(_SRT_FILE_PATH)
+        self.assertEqual(srt.GetSrtById("1").to_edit(), (4.0, None, True))
+        self.assertEqual(srt.UndoEdit(), ["1"])
+        self.assertEqual(srt.GetSrtById("1").to_edit(), (3.0, None, True))
+        self.assertEqual(srt.RedoEdit(), ["1"])
+        self.assertEqual(srt.GetSrtById("1").to_edit(), (4.0, None, True))
+
+if __name__ == '__main__':
+    unittest.main()
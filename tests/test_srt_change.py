@@ -0,0 +1,35 @@
+import unittest
+
+from hyperedit_gui.model.srt_change import SrtChange, GetRowRanges, MergeRowRanges, CoalesceSrtChanges, SRT_CHANGE_REPLACED, SRT_CHANGE_APPENDED, SRT_CHANGE_ENABLED, SRT_CHANGE_TIMES
+
+class SrtChangeTest(unittest.TestCase):
+
+    def test_row_ranges(self):
+        self.assertEqual(GetRowRanges([5, 1, 2, 3, 7, 6, 2]), [(1, 3), (5, 7)])
+        self.assertEqual(GetRowRanges([]), [])
+        self.assertEqual(MergeRowRanges([(5, 9), (0, 2), (3, 4), (7, 12), (20, 20)]), [(0, 12), (20, 20)])
+
+    def test_coalesce_merges_ranges_per_kind(self):
+        changes = [
+            SrtChange(SRT_CHANGE_ENABLED, 10, 20),
+            SrtChange(SRT_CHANGE_TIMES, 3, 3),
+            SrtChange(SRT_CHANGE_ENABLED, 21, 25),
+            SrtChange(SRT_CHANGE_ENABLED, 0, 1),
+            SrtChange(SRT_CHANGE_ENABLED, 12, 14),
+            SrtChange(SRT_CHANGE_APPENDED, 30, 39),
+            SrtChange(SRT_CHANGE_APPENDED, 40, 49),
+        ]
+        self.assertEqual(CoalesceSrtChanges(changes), [
+            SrtChange(SRT_CHANGE_APPENDED, 30, 49),
+            SrtChange(SRT_CHANGE_ENABLED, 0, 1),
+            SrtChange(SRT_CHANGE_ENABLED, 10, 25),
+            SrtChange(SRT_CHANGE_TIMES, 3, 3),
+        ])
+
+    def test_replace_swallows_everything(self):
+        changes = [SrtChange(SRT_CHANGE_ENABLED, 0, 1000), SrtChange(SRT_CHANGE_REPLACED), SrtChange(SRT_CHANGE_TIMES, 4, 4)]
+        self.assertEqual(CoalesceSrtChanges(changes), [SrtChange(SRT_CHANGE_REPLACED)])
+        self.assertEqual(CoalesceSrtChanges([]), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+
+from hyperedit_gui.model.srt_search import SrtSearchIndex, Tokenize
+
+_TEXTS = [
+    "The quick brown fox",
+    "jumps over the lazy dog.",
+    "Don't stop the music",
+    "Quickly, the fox ran away",
+    "the dog barked at the fox",
+]
+
+class SrtSearchIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.index = SrtSearchIndex(_TEXTS)
+
+    def test_tokenize(self):
+        self.assertEqual(Tokenize("Don't STOP, the music."), ["don't", "stop", "the", "music"])
+
+    def test_words_match_case_insensitively_and_all_have_to_match(self):
+        self.assertEqual(self.index.Search("FOX"), [0, 3, 4])
+        self.assertEqual(self.index.Search("fox dog"), [4])
+        self.assertEqual(self.index.Search("don't"), [2])
+        self.assertEqual(self.index.Search("cat"), [])
+
+    def test_prefix(self):
+        self.assertEqual(self.index.Search("quick*"), [0, 3])
+        self.assertEqual(self.index.Search("ba*"), [4])
+
+    def test_fuzzy(self):
+        # a replaced, missing, extra and swapped letter
+        self.assertEqual(self.index.Search("jumbs~"), [1])
+        self.assertEqual(self.index.Search("lazzy~ dog"), [1])
+        self.assertEqual(self.index.Search("musics~"), [2])
+        self.assertEqual(self.index.Search("brwon~"), [0])
+        # two edits away
+        self.assertEqual(self.index.Search("brwn0~"), [])
+        # short words only match exactly
+        self.assertEqual(self.index.Search("fix~"), [])
+
+    def test_phrase(self):
+        self.assertEqual(self.index.Search('"the fox"'), [3, 4])
+        self.assertEqual(self.index.Search('"fox the"'), [])
+        self.assertEqual(self.index.Search('"the fox" barked'), [4])
+        # still being typed
+        self.assertEqual(self.index.Search('"lazy do'), [])
+        self.assertEqual(self.index.Search('"lazy dog'), [1])
+
+    def test_empty_query_matches_every_row(self):
+        self.assertEqual(self.index.Search(""), [0, 1, 2, 3, 4])
+        self.assertEqual(self.index.Search(' "" * '), [0, 1, 2, 3, 4])
+
+    def test_append(self):
+        self.index.Search("fxo~")
+        self.index.Search("qu*")
+        self.index.Append(["a quiet fox"])
+        self.assertEqual(len(self.index), 6)
+        self.assertEqual(self.index.Search("qu*"), [0, 3, 5])
+        self.assertEqual(self.index.Search("quite~"), [5])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+
+from hyperedit_gui.model.srt_store import SrtStore
+
+class SrtStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.srts = SrtStore([
+            ("1", 1.0, 2.0, "one"),
+            ("2", 3.0, 5.0, "two"),
+            ("4", 6.0, 6.5, "four"),
+        ])
+
+    def test_views_read_columns(self):
+        self.assertEqual(len(self.srts), 3)
+        srt = self.srts[1]
+        self.assertEqual((srt.id, srt.original_start_time, srt.original_end_time, srt.text), ("2", 3.0, 5.0, "two"))
+        self.assertEqual(srt.to_edit(), (None, None, True))
+        self.assertFalse(srt.is_edited())
+        self.assertEqual([srt.id for srt in self.srts], ["1", "2", "4"])
+        self.assertEqual(self.srts.GetById("4").row, 2)
+
+    def test_edits_change_views_and_totals(self):
+        self.assertAlmostEqual(self.srts.GetEnabledDuration(), 3.5)
+        self.srts.SetEdit("2", (3.5, None, True))
+        self.srts.SetEdit("4", (None, None, False))
+
+        self.assertEqual(self.srts[1].to_primitive(), ("2", 3.5, 5.0, "two"))
+        self.assertEqual(self.srts[1].to_edit_json(), {"edited_start_time": 3.5, "edited_end_time": None, "enabled": True})
+        self.assertAlmostEqual(self.srts.GetEnabledDuration(), 2.5)
+        self.assertEqual(self.srts.GetEditedRows().tolist(), [1, 2])
+        self.assertEqual(self.srts.GetPrimitiveSrts(enabled_only=True), [("1", 1.0, 2.0, "one"), ("2", 3.5, 5.0, "two")])
+        self.assertEqual(self.srts.GetPrimitiveSrts(rows=[2, 0], enabled_only=True), [("1", 1.0, 2.0, "one")])
+
+        self.srts.SetEdit("2", (None, None, True))
+        self.assertEqual(self.srts[1].to_primitive(), ("2", 3.0, 5.0, "two"))
+
+    def test_append(self):
+        self.srts.Append([("5", 7.0, 8.0, "five")])
+        self.assertEqual(self.srts[-1].id, "5")
+        self.assertTrue(self.srts.GetById("5").enabled)
+        with self.assertRaises(IndexError):
+            self.srts[4]
+
+    def test_search_follows_append(self):
+        self.assertEqual(self.srts.Search("f*"), [2])
+        self.srts.Append([("5", 7.0, 8.0, "five")])
+        self.assertEqual(self.srts.Search("f*"), [2, 3])
+
+    def test_stats_follow_edits(self):
+        stats = self.srts.GetStats()
+        self.assertEqual(stats.count, 3)
+        self.assertAlmostEqual(stats.average, 3.5 / 3)
+        self.assertAlmostEqual(stats.longest_gap, 1.0)
+
+        # times are read before and after the edit, so the totals must match a full recount
+        self.srts.GetTimes()
+        self.srts.SetEdit("2", (None, 4.0, False))
+        self.srts.SetEdit("4", (6.2, None, True))
+        stats = self.srts.GetStats()
+        self.assertEqual(stats.count, 2)
+        self.assertAlmostEqual(stats.duration, 1.3)
+        self.assertAlmostEqual(stats.longest_gap, 4.2)
+        starts, ends = self.srts.GetTimes()
+        self.assertEqual(starts.tolist(), [1.0, 3.0, 6.2])
+        self.assertEqual(ends.tolist(), [2.0, 4.0, 6.5])
+
+        self.srts.SetEdit("4", (None, None, False))
+        self.srts.SetEdit("1", (None, None, False))
+        stats = self.srts.GetStats()
+        self.assertEqual((stats.count, stats.duration, stats.average, stats.longest_gap), (0, 0.0, 0.0, 0.0))
+
+    def test_primitives_with_edits_leave_store_unchanged(self):
+        self.srts.SetEdit("1", (1.5, None, True))
+        edits = {"1": (None, None, True), "2": (None, None, False), "4": (None, 6.25, True), "9": (None, None, False)}
+        self.assertEqual(self.srts.GetPrimitiveSrtsWithEdits(edits, enabled_only=True), [("1", 1.0, 2.0, "one"), ("4", 6.0, 6.25, "four")])
+        self.assertEqual(self.srts.GetPrimitiveSrts(enabled_only=True), [("1", 1.5, 2.0, "one"), ("2", 3.0, 5.0, "two"), ("4", 6.0, 6.5, "four")])
+
+if __name__ == '__main__':
+    unittest.main()
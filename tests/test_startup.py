@@ -0,0 +1,60 @@
+import os
+import sys
+import unittest
+import subprocess
+import importlib.util
+
+# loaded on first use, never before the project list is shown
+_DEFERRED_MODULES = [
+    "numpy",
+    "hyperedit",
+    "hyperedit_gui.model.srt_store",
+    "hyperedit_gui.model.deaggress",
+    "hyperedit_gui.media.audio_cache",
+    "hyperedit_gui.media.track_analysis",
+    "hyperedit_gui.media.transcription",
+    "hyperedit_gui.view.tracks_window",
+    "hyperedit_gui.view.srt_window",
+]
+
+# Qt has to load whatever we do, so it and the standard library it pulls in are not counted
+_UNCOUNTED_PACKAGES = {"PySide6", "shiboken6", "shibokensupport"}
+# microseconds of import time allowed for everything else. Wall clock times vary too much between
+# machines to check by default, set it to about twice what startup takes locally to catch a heavy
+# new import
+_IMPORT_BUDGET_VARIABLE = "HYPEREDIT_IMPORT_BUDGET"
+
+def _GetImportTimes(module) -> dict:
+    """
+    Self time in microseconds of every module loaded by importing module in a fresh interpreter
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        fields = line.removeprefix("import time:").split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        times[fields[2].strip()] = int(fields[0])
+    return times
+
+@unittest.skipUnless(importlib.util.find_spec("common_py"), "common_py is not installed")
+class StartupTest(unittest.TestCase):
+
+    def setUp(self):
+        self.times = _GetImportTimes("hyperedit_gui.main")
+
+    def test_heavy_modules_are_deferred(self):
+        self.assertIn("hyperedit_gui.controller", self.times)
+        loaded = [module for module in _DEFERRED_MODULES if module in self.times]
+        self.assertEqual(loaded, [])
+
+    @unittest.skipUnless(os.environ.get(_IMPORT_BUDGET_VARIABLE), f"{_IMPORT_BUDGET_VARIABLE} is not set")
+    @unittest.skipUnless(hasattr(sys, "stdlib_module_names"), "needs Python 3.10 to tell the standard library apart")
+    def test_import_budget(self):
+        uncounted = _UNCOUNTED_PACKAGES | set(sys.stdlib_module_names)
+        counted = {module: time for module, time in self.times.items() if module.split(".")[0] not in uncounted}
+        slowest = sorted(counted, key=counted.get, reverse=True)[:5]
+        self.assertLess(sum(counted.values()), int(os.environ[_IMPORT_BUDGET_VARIABLE]), f"slowest imports: {slowest}")
+
+if __name__ == '__main__':
+    unittest.main()
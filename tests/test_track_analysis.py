@@ -0,0 +1,34 @@
+import unittest
+
+import numpy as np
+
+from hyperedit_gui.media.track_analysis import AnalyzeSamples
+
+_SAMPLE_RATE = 16000
+
+def _Tone(hz, seconds, amplitude=0.3):
+    t = np.arange(int(seconds * _SAMPLE_RATE)) / _SAMPLE_RATE
+    return (amplitude * 32767 * np.sin(2 * np.pi * hz * t)).astype(np.int16)
+
+class TrackAnalysisTest(unittest.TestCase):
+
+    def test_speech_band_tone_with_pauses_is_voice(self):
+        samples = np.concatenate([_Tone(1000, 2.0), np.zeros(_SAMPLE_RATE * 2, dtype=np.int16)])
+        score = AnalyzeSamples(samples, _SAMPLE_RATE)
+        self.assertAlmostEqual(score.silence, 0.5, delta=0.02)
+        self.assertGreater(score.speech_ratio, 0.95)
+        self.assertAlmostEqual(score.loudness, 20 * np.log10(0.3 / np.sqrt(2)), delta=0.5)
+        self.assertTrue(score.IsLikelyVoice())
+
+    def test_low_rumble_is_not_voice(self):
+        score = AnalyzeSamples(_Tone(80, 4.0), _SAMPLE_RATE)
+        self.assertLess(score.speech_ratio, 0.1)
+        self.assertFalse(score.IsLikelyVoice())
+
+    def test_silent_track(self):
+        score = AnalyzeSamples(np.zeros(_SAMPLE_RATE, dtype=np.int16), _SAMPLE_RATE)
+        self.assertEqual(score.silence, 1.0)
+        self.assertFalse(score.IsLikelyVoice())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+
+from hyperedit_gui.media.transcript_cache import TranscriptCache, GetTranscriptKey, GetAudioIdentity, ReadTranscriptSource
+from hyperedit_gui.media.transcription import TranscribeWithCache, GetTranscriptionSettings
+from hyperedit_gui.render.clips import GetChecksum
+
+class _Job:
+    def SetProgress(self, fraction, message=""):
+        pass
+
+    def CheckCancelled(self):
+        pass
+
+class TranscriptCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.audio_path = self._Write("3.wav", b"audio")
+        self.srt_path = os.path.join(self.directory.name, "3.srt")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _Write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'wb') as output_file:
+            output_file.write(content)
+        return path
+
+    def test_key_depends_on_settings(self):
+        key = GetTranscriptKey("checksum", {"model": "small"})
+        self.assertEqual(key, GetTranscriptKey("checksum", {"model": "small"}))
+        self.assertNotEqual(key, GetTranscriptKey("checksum", {"model": "large"}))
+        self.assertNotEqual(key, GetTranscriptKey("other", {"model": "small"}))
+
+    def test_identical_audio_is_copied_from_cache(self):
+        key = GetTranscriptKey(GetChecksum(self.audio_path), GetTranscriptionSettings())
+        shared_cache = TranscriptCache(os.path.join(self.directory.name, "shared"))
+        shared_cache.Put(key, self._Write("other.srt", b"1\n00:00:00,000 --> 00:00:01,000\nhello\n"))
+        project_cache = TranscriptCache(os.path.join(self.directory.name, "project"))
+
+        # would raise on a miss, as there is no speech model here
+        TranscribeWithCache(_Job(), self.audio_path, self.srt_path, 1, [project_cache, shared_cache])
+        with open(self.srt_path, 'r') as srt_file:
+            self.assertIn("hello", srt_file.read())
+        self.assertIsNotNone(project_cache.Get(key))
+        self.assertEqual(ReadTranscriptSource(self.srt_path), GetAudioIdentity(self.audio_path))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import pickle
+import unittest
+
+import numpy as np
+
+from hyperedit_gui.media.transcription import FindChunkBoundaries, StitchChunk, _TranscribeChunk
+
+_SAMPLE_RATE = 16000
+
+class TranscriptionTest(unittest.TestCase):
+
+    def test_cuts_at_pauses(self):
+        rng = np.random.default_rng(0)
+        samples = (rng.standard_normal(_SAMPLE_RATE * 100) * 3000).astype(np.int16)
+        # pauses at 23s and 61s, near targets of 20s chunks
+        for pause in (23, 61):
+            samples[pause * _SAMPLE_RATE:(pause + 1) * _SAMPLE_RATE] = 0
+        boundaries = FindChunkBoundaries(samples, _SAMPLE_RATE, chunk_seconds=20)
+
+        self.assertEqual(boundaries[0], 0)
+        self.assertEqual(boundaries[-1], len(samples))
+        self.assertEqual(boundaries, sorted(boundaries))
+        cuts = [boundary / _SAMPLE_RATE for boundary in boundaries[1:-1]]
+        self.assertTrue(any(23 < cut < 24 for cut in cuts))
+        self.assertTrue(any(61 < cut < 62 for cut in cuts))
+
+    def test_short_audio_is_one_chunk(self):
+        samples = np.ones(_SAMPLE_RATE * 10, dtype=np.int16)
+        self.assertEqual(FindChunkBoundaries(samples, _SAMPLE_RATE, chunk_seconds=20), [0, len(samples)])
+
+    def test_stitch_offsets_and_numbers(self):
+        stitched = StitchChunk([("1", 0.5, 1.0, "a"), ("2", 2.0, 3.25, "b")], 300.0, 7)
+        self.assertEqual(stitched, [("7", 300.5, 301.0, "a"), ("8", 302.0, 303.25, "b")])
+
+    def test_chunk_worker_is_importable(self):
+        # spawned workers find the function by name, they do not inherit it
+        self.assertIs(pickle.loads(pickle.dumps(_TranscribeChunk)), _TranscribeChunk)
+
+if __name__ == '__main__':
+    unittest.main()